@@ -0,0 +1,36 @@
+# archive_history.py - Move old Sales, Inventory_Log and Expenses rows to the archive
+#
+# Usage: python archive_history.py [--before YYYY-MM-DD | --months N]
+import argparse
+
+from config import config
+from modules.archive import DEFAULT_ARCHIVE_MONTHS, archive_cutoff
+from modules.database import InventoryDB
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Archive history rows of closed periods to compressed monthly files")
+    parser.add_argument('--before', help="Archive rows dated before this day (YYYY-MM-DD)")
+    parser.add_argument('--months', type=int,
+                        default=config.get('archive_after_months', DEFAULT_ARCHIVE_MONTHS),
+                        help="Keep this many whole months live (default from config.json)")
+    args = parser.parse_args()
+
+    cutoff = args.before or archive_cutoff(args.months)
+    db = InventoryDB(config['excel_file'],
+                     storage=config.get('storage_backend', 'excel'),
+                     sqlite_file=config.get('sqlite_file'))
+    try:
+        archived = db.archive_history(cutoff)
+    finally:
+        db.close()
+
+    if archived is None:
+        print("❌ Archiving failed; no live rows were removed from the failed tab")
+    else:
+        print(f"✅ Archive folder: {db.archive.folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# benchmarks/dataset.py - Synthetic bakery datasets at configurable scale
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.database import InventoryDB
+from modules.reporting import build_sales_rollup
+from modules.schema import SCHEMA, empty_tab, tab_columns
+from modules.sequences import format_id
+
+# Named sizes: a small shop, a busy bakery, a multi-year chain store
+SCALES = {
+    'small': {'products': 30, 'ingredients': 60, 'recipe_lines': 5, 'years': 1,
+              'sales_per_day': 40, 'expenses_per_day': 2},
+    'medium': {'products': 80, 'ingredients': 150, 'recipe_lines': 6, 'years': 2,
+               'sales_per_day': 150, 'expenses_per_day': 4},
+    'large': {'products': 200, 'ingredients': 400, 'recipe_lines': 8, 'years': 5,
+              'sales_per_day': 400, 'expenses_per_day': 8}
+}
+
+PRODUCT_CATEGORIES = ['Bread', 'Pastry', 'Cake', 'Cookies', 'Drinks']
+INGREDIENT_UNITS = {'Flour': 'kg', 'Dairy': 'L', 'Sweetener': 'kg', 'Fruit': 'kg',
+                    'Packaging': 'pcs', 'Spice': 'g'}
+EXPENSE_TYPES = ['Purchase', 'Utilities', 'Rent', 'Salaries', 'Marketing', 'Maintenance']
+EXPENSE_CATEGORIES = ['Operating', 'Administrative', 'Marketing', 'Personnel', 'Facility']
+PAYMENT_METHODS = ['Cash', 'Credit Card', 'Bank Transfer', 'Digital Wallet']
+
+
+def generate_dataset(products=30, ingredients=60, recipe_lines=5, years=1,
+                     sales_per_day=40, expenses_per_day=2, end_date=None, seed=7):
+    """
+    Generate every tab of a bakery's database
+
+    Sales are spread over `years` years up to end_date, with busier
+    weekends; every sale deducts its recipe from stock and leaves one
+    Inventory_Log row per recipe line, as process_checkout does.
+
+    Args:
+        products: Number of products
+        ingredients: Number of ingredients
+        recipe_lines: Ingredients per product recipe
+        years: Years of Sales, Inventory_Log and Expenses history
+        sales_per_day: Average sale lines per day
+        expenses_per_day: Average expenses per day
+        end_date: Last day of history (default: today)
+        seed: Random seed, so equal arguments give equal datasets
+
+    Returns:
+        Dictionary of {tab_name: DataFrame} in the app's layout
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end_date or pd.Timestamp.now()).normalize()
+    days = pd.date_range(end - pd.DateOffset(years=years) + pd.Timedelta(days=1), end, freq='D')
+    recipe_lines = min(recipe_lines, ingredients)
+
+    # Ingredients: plenty of stock, so benchmarked sales never run out
+    ingredient_ids = [format_id('ING', n) for n in range(1, ingredients + 1)]
+    ingredient_categories = rng.choice(list(INGREDIENT_UNITS), ingredients)
+    cost_per_unit = rng.uniform(0.5, 40.0, ingredients).round(2)
+    ingredients_df = pd.DataFrame({
+        'Ingredient_ID': ingredient_ids,
+        'Ingredient_Name': [f"{category} {n}" for n, category in enumerate(ingredient_categories, 1)],
+        'Unit': [INGREDIENT_UNITS[category] for category in ingredient_categories],
+        'Category': ingredient_categories,
+        'Current_Stock': rng.uniform(1e6, 2e6, ingredients).round(1),
+        'Min_Stock_Level': rng.uniform(5, 50, ingredients).round(1),
+        'Cost_Per_Unit': cost_per_unit,
+        'Supplier': [f"Supplier {n}" for n in rng.integers(1, 16, ingredients)],
+        'Description': '',
+        'Active': 'Yes',
+        'Last_Updated': end.strftime("%Y-%m-%d %H:%M:%S")
+    })
+
+    # Recipes: recipe_lines distinct ingredients per product
+    recipe_rows = []
+    product_cost = np.zeros(products)
+    for p in range(products):
+        product_id = format_id('PROD', p + 1)
+        chosen = rng.choice(ingredients, recipe_lines, replace=False)
+        amounts = rng.uniform(0.01, 0.5, recipe_lines).round(3)
+        product_cost[p] = float((cost_per_unit[chosen] * amounts).sum())
+        for line, (i, amount) in enumerate(zip(chosen, amounts), 1):
+            recipe_rows.append({'Recipe_ID': f"{product_id}-{format_id('REC', line)}",
+                                'Product_ID': product_id,
+                                'Ingredient_ID': ingredient_ids[i],
+                                'Quantity_Required': amount})
+    recipes_df = pd.DataFrame(recipe_rows, columns=tab_columns('Recipes'))
+
+    product_ids = [format_id('PROD', n) for n in range(1, products + 1)]
+    product_categories = rng.choice(PRODUCT_CATEGORIES, products)
+    selling_price = (product_cost * rng.uniform(1.6, 3.0, products) + 5).round(2)
+    products_df = pd.DataFrame({
+        'Product_ID': product_ids,
+        'Product_Name': [f"{category} {n}" for n, category in enumerate(product_categories, 1)],
+        'Category': product_categories,
+        'Selling_Price': selling_price,
+        'Active': 'Yes',
+        'Cost_Price': product_cost.round(2),
+        'Profit_Margin': (selling_price - product_cost).round(2),
+        'Margin_Percentage': ((selling_price - product_cost) / selling_price * 100).round(2),
+        'Notes': ''
+    })
+
+    # Sales: Poisson lines per day, 30% more on weekends, popular products sell more
+    weekend = np.asarray(days.dayofweek >= 5)
+    per_day = rng.poisson(sales_per_day * np.where(weekend, 1.3, 1.0))
+    sale_days = np.repeat(days.to_numpy(), per_day)
+    sales_count = len(sale_days)
+    popularity = 1.0 / (rng.permutation(products) + 1)
+    product_index = rng.choice(products, sales_count, p=popularity / popularity.sum())
+    quantity = rng.integers(1, 6, sales_count).astype(float)
+    seconds = rng.integers(7 * 3600, 20 * 3600, sales_count)
+    sale_dates = pd.DatetimeIndex(sale_days)
+    sales_df = pd.DataFrame({
+        'Sale_ID': [format_id('SALE', n) for n in range(1, sales_count + 1)],
+        'Product_ID': np.asarray(product_ids)[product_index],
+        'Quantity': quantity,
+        'Sale_Date': sale_dates.strftime("%Y-%m-%d"),
+        'Sale_Time': pd.to_datetime(seconds, unit='s').strftime("%H:%M:%S"),
+        'Total_Amount': (quantity * selling_price[product_index]).round(2)
+    })
+
+    # Inventory_Log: one SALE_DEDUCTION row per recipe line of every sale
+    recipe_by_product = recipes_df.groupby('Product_ID', sort=False)
+    lines = recipe_by_product.size().reindex(product_ids).to_numpy()
+    log_sale = np.repeat(np.arange(sales_count), lines[product_index])
+    log_recipe = np.concatenate([recipe_by_product.indices[product_ids[p]] for p in product_index]) \
+        if sales_count else np.array([], dtype=int)
+    log_df = pd.DataFrame({
+        'Log_ID': [format_id('LOG', n) for n in range(1, len(log_sale) + 1)],
+        'Ingredient_ID': recipes_df['Ingredient_ID'].to_numpy()[log_recipe],
+        'Change_Type': 'SALE_DEDUCTION',
+        'Quantity': -(recipes_df['Quantity_Required'].to_numpy()[log_recipe] * quantity[log_sale]),
+        'Date': sales_df['Sale_Date'].to_numpy()[log_sale],
+        'Notes': [f"Product {product_ids[product_index[s]]} x{int(quantity[s])}" for s in log_sale]
+    })
+
+    # Expenses
+    expense_days = np.repeat(days.to_numpy(), rng.poisson(expenses_per_day, len(days)))
+    expense_count = len(expense_days)
+    expense_types = rng.choice(EXPENSE_TYPES, expense_count)
+    expenses_df = pd.DataFrame({
+        'Expense_ID': [format_id('EXP', n) for n in range(1, expense_count + 1)],
+        'Expense_Date': pd.DatetimeIndex(expense_days).strftime("%Y-%m-%d"),
+        'Expense_Type': expense_types,
+        'Description': [f"{expense_type} #{n}" for n, expense_type in enumerate(expense_types, 1)],
+        'Amount': rng.gamma(2.0, 400.0, expense_count).round(2),
+        'Category': rng.choice(EXPENSE_CATEGORIES, expense_count),
+        'Payment_Method': rng.choice(PAYMENT_METHODS, expense_count),
+        'Notes': ''
+    })
+
+    tabs = {tab_name: empty_tab(tab_name) for tab_name in SCHEMA}
+    tabs.update({
+        'Products': products_df,
+        'Ingredients': ingredients_df,
+        'Recipes': recipes_df,
+        'Sales': sales_df,
+        'Sales_Daily': build_sales_rollup(sales_df),
+        'Inventory_Log': log_df,
+        'Expenses': expenses_df
+    })
+    return tabs
+
+
+def create_dataset_db(excel_file, tabs, storage='excel', sqlite_file=None):
+    """
+    Create a new store holding a generated dataset
+
+    Args:
+        excel_file: Workbook path (Excel backend), must not exist yet
+        tabs: Dictionary of {tab_name: DataFrame} from generate_dataset
+        storage: 'excel' or 'sqlite'
+        sqlite_file: Database path for the SQLite backend
+
+    Returns:
+        InventoryDB opened on the new store
+    """
+    db = InventoryDB(excel_file, storage=storage, sqlite_file=sqlite_file)
+    db.storage.write_tabs(tabs)
+    db.storage.reset_sequences()
+    db.invalidate_cache()
+    return db
+
+
+def dataset_summary(tabs):
+    """Row counts of a dataset, e.g. 'Products 30, Sales 14,600, ...'"""
+    return ", ".join(f"{tab_name} {len(df):,}" for tab_name, df in tabs.items())
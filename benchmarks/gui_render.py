@@ -0,0 +1,280 @@
+# benchmarks/gui_render.py - Render time and widget count of the heavy screens on a synthetic dataset
+#
+# Needs an X display; without one it starts Xvfb itself (or run it under `xvfb-run -a`).
+# Timings depend on fonts and screen, so compare results from the same machine.
+#
+# Usage: python benchmarks/gui_render.py [--scale small|medium|large] [--backend excel]
+#                                        [--repeat 5] [--output results.json]
+#                                        [--compare baseline.json] [--threshold 1.25]
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.dataset import SCALES, create_dataset_db, dataset_summary, generate_dataset
+from benchmarks.suite import compare
+
+XVFB_SCREEN = '1280x1024x24'
+
+
+def _open(show):
+    """Setup that opens a screen in the app's main content area"""
+    return lambda app: show(app)(app.main_content)
+
+
+def _show_history_range(days):
+    """Setup that opens the Sales screen with the history filtered to the last `days` days (None: all)"""
+    def setup(app):
+        app.sales_gui.show_sales(app.main_content)
+        today = pd.Timestamp.now().normalize()
+        app.sales_gui.from_date_var.set((today - pd.Timedelta(days=days - 1)).strftime("%Y-%m-%d") if days else "")
+        app.sales_gui.to_date_var.set(today.strftime("%Y-%m-%d") if days else "")
+    return setup
+
+
+def _load_history(app):
+    app.sales_gui.load_sales_history(app.sales_gui.sales_history_frame.master)
+
+
+def _filter_products(search_text):
+    """Timed call that types a search into the sale grid and filters it right away"""
+    def call(app):
+        app.sales_gui.sale_search_var.set(search_text)
+        app.sales_gui.filter_sale_products()
+    return call
+
+
+# (name, setup or None, timed call); setup runs once before the timed runs and is not timed
+SCREENS = [
+    ('InventoryGUI.show_dashboard', None, lambda app: app.show_dashboard()),
+    ('ProductsGUI.refresh_products_table',
+     _open(lambda app: app.products_gui.show_products_management),
+     lambda app: app.products_gui.refresh_products_table()),
+    ('IngredientsGUI.refresh_ingredients_table',
+     _open(lambda app: app.ingredients_gui.show_ingredients_management),
+     lambda app: app.ingredients_gui.refresh_ingredients_table()),
+    ('RecipesGUI.refresh_recipes_view',
+     _open(lambda app: app.recipes_gui.show_recipes),
+     lambda app: app.recipes_gui.refresh_recipes_view()),
+    ('SalesGUI.load_sales_history[30 days]', _show_history_range(30), _load_history),
+    ('SalesGUI.load_sales_history[all]', _show_history_range(None), _load_history),
+    ('SalesGUI.filter_sale_products[all]',
+     _open(lambda app: app.sales_gui.show_sales), _filter_products("")),
+    ('SalesGUI.filter_sale_products[search]',
+     _open(lambda app: app.sales_gui.show_sales), _filter_products("cake 1")),
+]
+
+
+def start_virtual_display():
+    """
+    Start Xvfb on a free display number when no display is set
+
+    Returns:
+        Xvfb process to terminate afterwards, or None when a display is already available
+    """
+    if os.environ.get('DISPLAY'):
+        return None
+    if shutil.which('Xvfb') is None:
+        raise RuntimeError("No DISPLAY set and Xvfb not found (install xvfb or run under xvfb-run -a)")
+
+    for number in range(99, 199):
+        if os.path.exists(f'/tmp/.X11-unix/X{number}') or os.path.exists(f'/tmp/.X{number}-lock'):
+            continue
+        process = subprocess.Popen(['Xvfb', f':{number}', '-screen', '0', XVFB_SCREEN, '-nolisten', 'tcp'],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and process.poll() is None:
+            if os.path.exists(f'/tmp/.X11-unix/X{number}'):
+                os.environ['DISPLAY'] = f':{number}'
+                return process
+            time.sleep(0.05)
+        process.kill()
+    raise RuntimeError("Could not start Xvfb")
+
+
+def count_widgets(widget):
+    """Number of Tk widgets below a widget (CustomTkinter widgets count their inner canvas and labels too)"""
+    children = widget.winfo_children()
+    return len(children) + sum(count_widgets(child) for child in children)
+
+
+def time_screen(app, setup, call, repeat):
+    """
+    Render one screen `repeat` times
+
+    A run lasts until Tk has processed every pending layout and redraw,
+    so the timings are what the user waits for, not just the Python calls.
+
+    Returns:
+        Timings in milliseconds and the widget count of the window after the
+        last run (the whole window, since the sale grid's pooled cards live
+        outside the main content area)
+    """
+    window = app.window
+    if setup is not None:
+        setup(app)
+    window.update()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call(app)
+        window.update()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'runs': len(timings),
+        'widgets': count_widgets(window)
+    }
+
+
+def run_backend(backend, tabs, repeat, only=None):
+    """Load the dataset into a new store, open the app on it and render every screen"""
+    import customtkinter as ctk
+    from config import Config
+    from modules.gui_builder import InventoryGUI
+
+    workdir = tempfile.mkdtemp(prefix=f'gui_bench_{backend}_')
+    results = {}
+    try:
+        excel_file = os.path.join(workdir, 'inventory.xlsx')
+        db = create_dataset_db(excel_file, tabs, storage=backend,
+                               sqlite_file=os.path.join(workdir, 'inventory.db'))
+        app_config = dict(Config().default_config, excel_file=excel_file)
+
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("blue")
+        window = ctk.CTk()
+        try:
+            start = time.perf_counter()
+            app = InventoryGUI(window, db, app_config)
+            window.update()
+            print(f"  🚀 App opened in {time.perf_counter() - start:.1f}s")
+
+            for name, setup, call in SCREENS:
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                results[name] = time_screen(app, setup, call, repeat)
+                print(f"  {name:<44} median {results[name]['median_ms']:10.2f} ms | "
+                      f"{results[name]['widgets']:6,} widgets")
+            app.async_db.shutdown()
+        finally:
+            window.destroy()
+            db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare_widgets(baseline, current):
+    """
+    Print widget counts that changed against a baseline results file
+
+    Returns:
+        Number of screens that build more widgets than in the baseline
+    """
+    grown = 0
+    for backend, results in current['results'].items():
+        base_results = baseline.get('results', {}).get(backend, {})
+        changes = [(name, base_results[name].get('widgets'), result['widgets'])
+                   for name, result in results.items()
+                   if name in base_results and base_results[name].get('widgets') != result['widgets']]
+        if not changes:
+            continue
+        print(f"\n🧱 {backend}: widget counts vs baseline")
+        for name, before, after in changes:
+            flag = '  ⚠️ more' if before is not None and after > before else ''
+            grown += bool(flag)
+            print(f"  {name:<44} {before} -> {after}{flag}")
+    return grown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time how long the heavy screens take to render")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small',
+                        help="Dataset size preset (default: small)")
+    for option in ('products', 'ingredients', 'recipe-lines', 'years', 'sales-per-day', 'expenses-per-day'):
+        parser.add_argument(f'--{option}', type=int, help="Override the preset's value")
+    parser.add_argument('--seed', type=int, default=7, help="Random seed of the dataset")
+    parser.add_argument('--backend', default='excel',
+                        help="Comma-separated storage backends to run (default: excel)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed renders per screen")
+    parser.add_argument('--only', help="Comma-separated name fragments of the screens to run")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON file from an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio reported as a regression (default: 1.25)")
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+
+    start = time.perf_counter()
+    tabs = generate_dataset(seed=args.seed, **params)
+    print(f"📊 Dataset '{args.scale}' generated in {time.perf_counter() - start:.1f}s: {dataset_summary(tabs)}")
+
+    try:
+        xvfb = start_virtual_display()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if xvfb is not None:
+        print(f"🖥️ Started Xvfb on {os.environ['DISPLAY']}")
+
+    only = [pattern.strip() for pattern in args.only.split(',')] if args.only else None
+    results = {}
+    try:
+        for backend in [name.strip() for name in args.backend.split(',') if name.strip()]:
+            print(f"\n⏱️ {backend} backend ({args.repeat} renders per screen)")
+            results[backend] = run_backend(backend, tabs, args.repeat, only)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'display': 'xvfb' if xvfb is not None else os.environ.get('DISPLAY'),
+        'dataset': {'scale': args.scale, 'seed': args.seed, **params,
+                    'rows': {tab_name: len(df) for tab_name, df in tabs.items()}},
+        'repeat': args.repeat,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('dataset', {}).get('rows') != report['dataset']['rows']:
+            print("⚠️ Baseline was measured on a different dataset; ratios are not comparable")
+        regressions = compare(baseline, report, args.threshold)
+        grown = compare_widgets(baseline, report)
+        if regressions or grown:
+            print(f"\n❌ {regressions} screen(s) slower than {args.threshold:g}x baseline, "
+                  f"{grown} screen(s) with more widgets")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
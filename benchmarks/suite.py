@@ -0,0 +1,189 @@
+# benchmarks/suite.py - Timings of the public InventoryDB methods on a synthetic dataset
+#
+# Usage: python benchmarks/suite.py [--scale small|medium|large] [--backend excel,sqlite]
+#                                   [--repeat 5] [--output results.json]
+#                                   [--compare baseline.json] [--threshold 1.25]
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.dataset import SCALES, create_dataset_db, dataset_summary, generate_dataset
+
+
+def _drop_cache(db, context):
+    db.invalidate_cache()
+
+
+def _cart(context, size):
+    """The first `size` products as a checkout cart"""
+    return [{'product_id': product_id, 'quantity': 1, 'unit_price': 10.0}
+            for product_id in context['product_ids'][:size]]
+
+
+# (name, setup or None, timed call); setup runs before every timed call and is not timed
+BENCHMARKS = [
+    ('read_tab[Sales] cold', _drop_cache, lambda db, c: db.read_tab('Sales')),
+    ('read_tab[Sales] warm', None, lambda db, c: db.read_tab('Sales')),
+    ('read_tab[Inventory_Log] cold', _drop_cache, lambda db, c: db.read_tab('Inventory_Log')),
+    ('save_tab[Products]', None, lambda db, c: db.save_tab('Products', c['products'])),
+    ('save_tab[Sales]', None, lambda db, c: db.save_tab('Sales', c['sales'])),
+    ('add_sale', None, lambda db, c: db.add_sale(c['product_ids'][0], 2, 10.0)),
+    ('process_checkout[3 items]', None, lambda db, c: db.process_checkout(_cart(c, 3))),
+    ('update_inventory_from_sale', None,
+     lambda db, c: db.update_inventory_from_sale(c['product_ids'][0], 1)),
+    ('update_all_product_costs', None, lambda db, c: db.update_all_product_costs()),
+    ('get_expenses[30 days]', None, lambda db, c: db.get_expenses(c['month_ago'], c['today'])),
+    ('get_expenses[all]', None, lambda db, c: db.get_expenses()),
+    ('get_inventory_logs[30 days]', None, lambda db, c: db.get_inventory_logs(30)),
+]
+
+
+def time_benchmark(db, context, setup, call, repeat):
+    """Run one benchmark `repeat` times; returns timings in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup(db, context)
+        start = time.perf_counter()
+        call(db, context)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'runs': len(timings)
+    }
+
+
+def run_backend(backend, tabs, repeat, only=None):
+    """Load the dataset into a new store of one backend and run every benchmark on it"""
+    workdir = tempfile.mkdtemp(prefix=f'bench_{backend}_')
+    results = {}
+    try:
+        excel_file = os.path.join(workdir, 'inventory.xlsx')
+        start = time.perf_counter()
+        db = create_dataset_db(excel_file, tabs, storage=backend,
+                               sqlite_file=os.path.join(workdir, 'inventory.db'))
+        print(f"  💾 Loaded dataset in {time.perf_counter() - start:.1f}s")
+        today = pd.Timestamp.now().normalize()
+        context = {
+            'product_ids': tabs['Products']['Product_ID'].tolist(),
+            'products': tabs['Products'],
+            'sales': tabs['Sales'],
+            'today': today,
+            'month_ago': today - pd.Timedelta(days=29)
+        }
+        try:
+            for name, setup, call in BENCHMARKS:
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                results[name] = time_benchmark(db, context, setup, call, repeat)
+                print(f"  {name:<32} median {results[name]['median_ms']:10.2f} ms | "
+                      f"min {results[name]['min_ms']:10.2f} ms")
+        finally:
+            db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(baseline, current, threshold):
+    """
+    Print median timings against a baseline results file
+
+    Returns:
+        Number of benchmarks whose median got slower than threshold x baseline
+    """
+    regressions = 0
+    for backend, results in current['results'].items():
+        base_results = baseline.get('results', {}).get(backend, {})
+        print(f"\n📈 {backend}: median vs baseline")
+        for name, result in results.items():
+            base = base_results.get(name)
+            if base is None:
+                print(f"  {name:<32} {result['median_ms']:10.2f} ms   (new)")
+                continue
+            ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+            flag = ''
+            if ratio > threshold:
+                flag = '  ⚠️ slower'
+                regressions += 1
+            elif ratio < 1 / threshold:
+                flag = '  ✅ faster'
+            print(f"  {name:<32} {base['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms "
+                  f"({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time InventoryDB methods on a synthetic bakery dataset")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small',
+                        help="Dataset size preset (default: small)")
+    for option in ('products', 'ingredients', 'recipe-lines', 'years', 'sales-per-day', 'expenses-per-day'):
+        parser.add_argument(f'--{option}', type=int, help="Override the preset's value")
+    parser.add_argument('--seed', type=int, default=7, help="Random seed of the dataset")
+    parser.add_argument('--backend', default='excel,sqlite',
+                        help="Comma-separated storage backends to run (default: excel,sqlite)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument('--only', help="Comma-separated name fragments of the benchmarks to run")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON file from an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio reported as a regression (default: 1.25)")
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+
+    start = time.perf_counter()
+    tabs = generate_dataset(seed=args.seed, **params)
+    print(f"📊 Dataset '{args.scale}' generated in {time.perf_counter() - start:.1f}s: {dataset_summary(tabs)}")
+
+    only = [pattern.strip() for pattern in args.only.split(',')] if args.only else None
+    results = {}
+    for backend in [name.strip() for name in args.backend.split(',') if name.strip()]:
+        print(f"\n⏱️ {backend} backend ({args.repeat} runs per benchmark)")
+        results[backend] = run_backend(backend, tabs, args.repeat, only)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'dataset': {'scale': args.scale, 'seed': args.seed, **params,
+                    'rows': {tab_name: len(df) for tab_name, df in tabs.items()}},
+        'repeat': args.repeat,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('dataset', {}).get('rows') != report['dataset']['rows']:
+            print("⚠️ Baseline was measured on a different dataset; ratios are not comparable")
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n❌ {regressions} benchmark(s) slower than {args.threshold:g}x baseline")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
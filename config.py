@@ -12,7 +12,14 @@ class Config:
             'date_format': "%Y-%m-%d",
             'low_stock_warning': 20,
             'excel_file': 'data/inventory.xlsx',
+            'storage_backend': 'excel',
+            'sqlite_file': 'data/inventory.db',
+            'write_mode': 'sync',
+            'flush_interval': 2.0,
+            'lock_timeout': 10.0,
+            'slow_operation_ms': 200.0,
             'tax_rate': 12.0,
+            'archive_after_months': 12,
             'business_address': "123 Business Street\nCity, Country"
         }
         self.config = self._load_config()
@@ -41,12 +48,12 @@ class Config:
         """Update configuration with new settings"""
         for key, value in new_settings.items():
             # Special handling for numeric fields
-            if key == 'low_stock_warning':
+            if key in ('low_stock_warning', 'archive_after_months'):
                 try:
                     self.config[key] = int(value)
                 except ValueError:
                     self.config[key] = self.default_config[key]
-            elif key == 'tax_rate':
+            elif key in ('tax_rate', 'slow_operation_ms'):
                 try:
                     self.config[key] = float(value)
                 except ValueError:
@@ -36,8 +36,14 @@ def main():
         print(f"🏢 Business: {app_config.get('business_name', 'Unknown')}")
         
         # Initialize database
-        db = InventoryDB(app_config['excel_file'])
-        print(f"💾 Database: {app_config['excel_file']}")
+        db = InventoryDB(app_config['excel_file'],
+                         storage=app_config.get('storage_backend', 'excel'),
+                         sqlite_file=app_config.get('sqlite_file'),
+                         write_mode=app_config.get('write_mode', 'sync'),
+                         flush_interval=app_config.get('flush_interval', 2.0),
+                         lock_timeout=app_config.get('lock_timeout', 10.0),
+                         slow_operation_ms=app_config.get('slow_operation_ms', 200.0))
+        print(f"💾 Database: {db.storage.path} ({db.storage.name}, {db.write_mode} writes)")
         
         # Store config in db for SettingsGUI to access
         db.config = config  # Store the Config object
@@ -60,6 +66,9 @@ def main():
         
         # Start application
         window.mainloop()
+        # Let queued background writes finish before closing the database
+        app.async_db.shutdown()
+        db.close()
         
     except FileNotFoundError as e:
         print(f"\n❌ FILE ERROR: {e}")
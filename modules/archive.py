@@ -0,0 +1,140 @@
+# modules/archive.py - Compressed monthly archives of closed history periods
+import os
+import re
+import shutil
+
+import pandas as pd
+
+from modules.atomic_file import atomic_write
+from modules.partitions import UNDATED, partition_keys
+from modules.schema import COLUMN_TYPES, NUMBER
+from modules.storage import TAB_KEYS
+
+# Tabs whose old rows can be moved to the archive
+ARCHIVED_TABS = ('Sales', 'Inventory_Log', 'Expenses')
+
+# Default age of the rows "Archive Old Records" moves, in whole months
+DEFAULT_ARCHIVE_MONTHS = 12
+
+
+def archive_dir(data_file):
+    """Archive folder kept next to the data file (data/inventory.archive/)"""
+    return os.path.splitext(data_file)[0] + '.archive'
+
+
+class HistoryArchive:
+    """
+    Rows of closed periods moved out of the live store
+
+    Each month of a tab is one gzip-compressed CSV file
+    (Sales.2024-01.csv.gz). Archived rows no longer cost anything on saves;
+    they are only read back by date-range queries that reach into them.
+    """
+
+    def __init__(self, data_file):
+        self.folder = archive_dir(data_file)
+
+    def months(self, tab_name):
+        """Archived months of a tab ('YYYY-MM'), oldest first"""
+        try:
+            names = os.listdir(self.folder)
+        except OSError:
+            return []
+        pattern = re.compile(rf'{re.escape(tab_name)}\.(\d{{4}}-\d{{2}})\.csv\.gz$')
+        return sorted(match.group(1) for match in map(pattern.match, names) if match)
+
+    def read(self, tab_name, first_month=None, last_month=None):
+        """
+        Read the archived rows of a tab within a range of months
+
+        Args:
+            first_month: First 'YYYY-MM' to include, or None for no lower bound
+            last_month: Last 'YYYY-MM' to include, or None for no upper bound
+
+        Returns:
+            DataFrame of the archived rows, oldest month first (empty if none)
+        """
+        parts = [self._read_month(tab_name, month) for month in self.months(tab_name)
+                 if (first_month is None or month >= first_month)
+                 and (last_month is None or month <= last_month)]
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, ignore_index=True)
+
+    def add(self, tab_name, df, date_column):
+        """
+        Add rows to the monthly archive files of a tab
+
+        Rows already archived under the same key are replaced, so an archive
+        run that was interrupted before the live rows were removed can
+        simply be repeated.
+
+        Returns:
+            Number of rows archived (rows without a readable date are skipped)
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        key = TAB_KEYS.get(tab_name)
+        archived = 0
+        for month, rows in df.groupby(partition_keys(df[date_column])):
+            if month == UNDATED:
+                continue
+            archived += len(rows)
+            path = self._path(tab_name, month)
+            if os.path.exists(path):
+                rows = pd.concat([self._read_month(tab_name, month), rows], ignore_index=True)
+                if key in rows.columns:
+                    rows = rows.drop_duplicates(subset=key, keep='last')
+            with atomic_write(path) as tmp_path:
+                rows.to_csv(tmp_path, index=False, compression='gzip')
+        return archived
+
+    def remove(self, tab_name, keys):
+        """Drop rows from a tab's archive by key (undoes an add whose live save failed)"""
+        key = TAB_KEYS.get(tab_name)
+        keys = set(keys)
+        for month in self.months(tab_name):
+            rows = self._read_month(tab_name, month)
+            if key not in rows.columns or not rows[key].isin(keys).any():
+                continue
+            rows = rows[~rows[key].isin(keys)]
+            if rows.empty:
+                os.remove(self._path(tab_name, month))
+                continue
+            with atomic_write(self._path(tab_name, month)) as tmp_path:
+                rows.to_csv(tmp_path, index=False, compression='gzip')
+
+    def clear(self, tab_name):
+        """Delete every archived month of a tab"""
+        for month in self.months(tab_name):
+            os.remove(self._path(tab_name, month))
+        if os.path.isdir(self.folder) and not os.listdir(self.folder):
+            os.rmdir(self.folder)
+
+    def copy_to(self, data_file):
+        """Copy the archive next to another data file (backups); returns the folder or None if empty"""
+        if not os.path.isdir(self.folder) or not os.listdir(self.folder):
+            return None
+        target = archive_dir(data_file)
+        shutil.copytree(self.folder, target, dirs_exist_ok=True)
+        return target
+
+    def keys(self, tab_name):
+        """Every archived key of a tab (used to keep ID counters past archived IDs)"""
+        key = TAB_KEYS.get(tab_name)
+        parts = [pd.read_csv(self._path(tab_name, month), usecols=[key], dtype=str, compression='gzip')[key]
+                 for month in self.months(tab_name)]
+        return pd.concat(parts, ignore_index=True) if parts else pd.Series(dtype='object')
+
+    def _read_month(self, tab_name, month):
+        # IDs, dates and text stay strings; NUMBER columns are parsed as floats
+        dtypes = {col: str for col, (col_type, _) in COLUMN_TYPES.get(tab_name, {}).items()
+                  if col_type != NUMBER}
+        return pd.read_csv(self._path(tab_name, month), dtype=dtypes, compression='gzip')
+
+    def _path(self, tab_name, month):
+        return os.path.join(self.folder, f"{tab_name}.{month}.csv.gz")
+
+
+def archive_cutoff(months=DEFAULT_ARCHIVE_MONTHS):
+    """First day of the month `months` months ago; rows dated before it are archived"""
+    return (pd.Timestamp.now().normalize().replace(day=1) - pd.DateOffset(months=months))
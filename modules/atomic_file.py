@@ -0,0 +1,80 @@
+# modules/atomic_file.py - Crash-safe file replacement (temp file + fsync + rename)
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+def backup_path(path):
+    """Rolling backup of the previous version of a file (data/inventory.xlsx.bak)"""
+    return path + '.bak'
+
+
+@contextmanager
+def atomic_write(path, keep_backup=False):
+    """
+    Write a new version of a file without ever leaving a partial one behind
+
+    Yields the path of a temp file in the same folder. When the block
+    finishes, the temp file is fsynced and renamed over path in one step,
+    so after a crash path holds either the old or the new version. If the
+    block raises, the temp file is removed and path is untouched.
+
+    Args:
+        path: File to replace (need not exist yet)
+        keep_backup: Keep the version being replaced as backup_path(path)
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    name, extension = os.path.splitext(os.path.basename(path))
+    # Keep the extension last: writers such as pd.ExcelWriter pick the format from it
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=f".tmp{extension}", dir=folder)
+    os.close(fd)
+    try:
+        yield tmp_path
+        fsync_file(tmp_path)
+        if keep_backup and os.path.exists(path):
+            _replace_backup(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_dir(folder)
+
+
+def _replace_backup(path):
+    """Point backup_path(path) at the current version of path"""
+    backup = backup_path(path)
+    tmp_backup = backup + '.tmp'
+    try:
+        if os.path.exists(tmp_backup):
+            os.remove(tmp_backup)
+        # A hard link costs nothing; the old contents live on once path is replaced
+        os.link(path, tmp_backup)
+    except OSError:
+        shutil.copy2(path, tmp_backup)
+    os.replace(tmp_backup, backup)
+
+
+def fsync_file(path):
+    """Flush a file's contents to disk"""
+    with open(path, 'rb+') as written:
+        os.fsync(written.fileno())
+
+
+def fsync_dir(folder):
+    """Flush a folder's entries (renames) to disk where the OS supports it"""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
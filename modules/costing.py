@@ -0,0 +1,55 @@
+# modules/costing.py - Recipe cost engine (all products in one pass)
+import pandas as pd
+
+
+def compute_product_costs(recipes_df, ingredients_df):
+    """
+    Compute the recipe cost of every product at once
+
+    Recipes are joined to Ingredients once, each line costs
+    Quantity_Required x Cost_Per_Unit, and lines are summed per product.
+
+    Args:
+        recipes_df: Recipes tab (Product_ID, Ingredient_ID, Quantity_Required)
+        ingredients_df: Ingredients tab (Ingredient_ID, Cost_Per_Unit)
+
+    Returns:
+        Series of cost indexed by Product_ID (products without a recipe are absent)
+    """
+    recipe_columns = {'Product_ID', 'Ingredient_ID', 'Quantity_Required'}
+    if recipes_df.empty or not recipe_columns.issubset(recipes_df.columns):
+        return pd.Series(dtype='float64', name='Cost_Price')
+
+    lines = recipes_df[['Product_ID', 'Ingredient_ID', 'Quantity_Required']]
+    if not ingredients_df.empty and {'Ingredient_ID', 'Cost_Per_Unit'}.issubset(ingredients_df.columns):
+        # One price per ingredient, so the join cannot multiply recipe lines
+        prices = ingredients_df.drop_duplicates('Ingredient_ID')[['Ingredient_ID', 'Cost_Per_Unit']]
+        lines = lines.merge(prices, on='Ingredient_ID', how='left')
+    else:
+        lines = lines.assign(Cost_Per_Unit=0.0)
+
+    quantity = pd.to_numeric(lines['Quantity_Required'], errors='coerce').fillna(0.0)
+    price = pd.to_numeric(lines['Cost_Per_Unit'], errors='coerce').fillna(0.0)
+    line_cost = (quantity * price).rename('Cost_Price')
+    return line_cost.groupby(lines['Product_ID']).sum()
+
+
+def apply_product_costs(products_df, costs):
+    """
+    Set Cost_Price, Profit_Margin and Margin_Percentage from computed costs
+
+    Args:
+        products_df: Products tab
+        costs: Series of cost indexed by Product_ID
+
+    Returns:
+        Updated copy of products_df
+    """
+    products_df = products_df.copy()
+    products_df['Cost_Price'] = products_df['Product_ID'].map(costs).fillna(0.0).astype('float64')
+
+    if 'Selling_Price' in products_df.columns:
+        products_df['Profit_Margin'] = products_df['Selling_Price'] - products_df['Cost_Price']
+        products_df['Margin_Percentage'] = (products_df['Profit_Margin'] /
+                                            products_df['Selling_Price'] * 100).round(2)
+    return products_df
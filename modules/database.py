@@ -1,169 +1,291 @@
 # modules/database.py - COMPLETE VERSION WITH ALL METHODS
 import pandas as pd
 import os
+import shutil
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from modules.storage import create_storage, apply_updates, TAB_KEYS
+from modules.costing import compute_product_costs, apply_product_costs
+from modules.sequences import SEQUENCES, format_id, max_id_number
+from modules.schema import SCHEMA, coerce_tab, empty_tab, empty_tabs
+from modules.reporting import build_sales_rollup, rollup_key
+from modules.partitions import PARTITIONED_TABS, range_mask, to_day
+from modules.archive import ARCHIVED_TABS, HistoryArchive
+from modules.file_lock import StoreLock, lock_path
+from modules.metrics import MetricsRegistry, instrument
+from modules.search_index import ProductSearchIndex
+
+
+# Durability modes: 'sync' writes every save_tab before returning; 'behind'
+# keeps saved tabs in memory and writes them together every flush_interval
+WRITE_MODES = ('sync', 'behind')
 
 
 class InventoryDB:
-    def __init__(self, excel_file):
+    def __init__(self, excel_file, storage='excel', sqlite_file=None,
+                 write_mode='sync', flush_interval=2.0, lock_timeout=10.0,
+                 slow_operation_ms=200.0):
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode: {write_mode}")
+        # Timing and I/O of every public method (see get_metrics)
+        self.metrics = MetricsRegistry(slow_operation_ms)
         self.excel_file = excel_file
+        self.storage = create_storage(storage, excel_file, sqlite_file)
+        # Parsed tabs: {tab_name: (storage_stamp, DataFrame)}
+        self._tab_cache = {}
+        self.cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        # Recipe cost per product: ((Recipes, Ingredients) cache entries, Series)
+        self._cost_cache = None
+        # Reverse recipe index: (cached Recipes DataFrame, {Ingredient_ID: set of Product_IDs})
+        self._recipe_index = None
+        # Primary-key index per tab: {tab_name: (cached DataFrame, {key: row position})}
+        self._key_indexes = {}
+        # Search index of the active products: (cached Products frame, ProductSearchIndex)
+        self._product_search = None
+        # Guards the caches above: the GUI thread, AsyncDB's threads and the
+        # flush timer all read and refresh them
+        self._cache_lock = threading.RLock()
+        # Serializes storage writes from the GUI and background threads
+        self._write_lock = threading.RLock()
+        # Serializes read-modify-write cycles with other processes sharing the store
+        self.store_lock = StoreLock(lock_path(self.storage.path), lock_timeout)
+        # Monthly archive files of closed periods (see archive_history)
+        self.archive = HistoryArchive(self.storage.path)
+        # Write-behind: tabs saved but not yet written ({tab_name: DataFrame})
+        self.write_mode = write_mode
+        self.flush_interval = flush_interval
+        self._pending_saves = {}
+        self._flush_timer = None
+        self.write_stats = {'tab_saves': 0, 'storage_writes': 0}
         self.ensure_tabs_exist()
 
     # ===== FILE AND TAB MANAGEMENT =====
     def ensure_tabs_exist(self):
-        """Make sure all necessary tabs exist in Excel"""
+        """Make sure all necessary tabs exist in the database"""
         try:
-            if not os.path.exists(self.excel_file):
-                self.create_new_database()
-            else:
-                self.add_missing_tabs()
+            with self._store_write():
+                if not self.storage.exists():
+                    self.create_new_database()
+                else:
+                    self.add_missing_tabs()
         except Exception as e:
-            print(f"⚠️ Warning creating Excel tabs: {e}")
+            print(f"⚠️ Warning creating database tabs: {e}")
+
+    def reload(self):
+        """Drop cached data and re-check the database structure"""
+        self.flush()
+        self.invalidate_cache()
+        self.ensure_tabs_exist()
+
+    def close(self):
+        """Write pending saves, fold pending journal rows and release the storage backend"""
+        self.flush()
+        self.compact_journal()
+        self.storage.close()
+        self.store_lock.close()
 
     def create_new_database(self):
-        """Create a new Excel file with all required tabs"""
-        default_tabs = {
-            'Products': pd.DataFrame(columns=[
-                'Product_ID', 'Product_Name', 'Category', 'Selling_Price', 'Active',
-                'Cost_Price', 'Profit_Margin', 'Margin_Percentage', 'Notes'
-            ]),
-            'Ingredients': pd.DataFrame(columns=[
-                'Ingredient_ID', 'Ingredient_Name', 'Unit', 'Category', 
-                'Current_Stock', 'Min_Stock_Level', 'Cost_Per_Unit', 'Supplier',
-                'Description', 'Active', 'Last_Updated'
-            ]),
-            'Recipes': pd.DataFrame(columns=[
-                'Recipe_ID', 'Product_ID', 'Ingredient_ID', 'Quantity_Required'
-            ]),
-            'Sales': pd.DataFrame(columns=[
-                'Sale_ID', 'Product_ID', 'Quantity', 'Sale_Date', 
-                'Sale_Time', 'Total_Amount'
-            ]),
-            'Inventory_Log': pd.DataFrame(columns=[
-                'Log_ID', 'Ingredient_ID', 'Change_Type', 'Quantity', 
-                'Date', 'Notes'
-            ]),
-            'Expenses': pd.DataFrame(columns=[
-                'Expense_ID', 'Expense_Date', 'Expense_Type', 'Description',
-                'Amount', 'Category', 'Payment_Method', 'Notes'
-            ])
-        }
-        
-        with pd.ExcelWriter(self.excel_file, engine='openpyxl') as writer:
-            for tab_name, df in default_tabs.items():
-                df.to_excel(writer, sheet_name=tab_name, index=False)
-        print(f"✅ Created new Excel file: {self.excel_file}")
+        """Create a new database with all required tabs"""
+        self.storage.create(empty_tabs())
+        print(f"✅ Created new database: {self.storage.path}")
+        
+        # First start on a non-Excel backend: bring over the existing workbook
+        if self.storage.name != 'excel' and os.path.exists(self.excel_file):
+            self.import_from_excel(self.excel_file)
 
     def add_missing_tabs(self):
-        """Add missing tabs to existing Excel file"""
+        """Add missing tabs to the existing database"""
         try:
-            existing_tabs = pd.ExcelFile(self.excel_file).sheet_names
+            existing_tabs = self.storage.tab_names()
         except:
             existing_tabs = []
         
-        default_tabs = {
-            'Products': pd.DataFrame(columns=['Product_ID', 'Product_Name', 'Category', 
-                                            'Selling_Price', 'Active', 'Cost_Price',
-                                            'Profit_Margin', 'Margin_Percentage', 'Notes']),
-            'Ingredients': pd.DataFrame(columns=['Ingredient_ID', 'Ingredient_Name', 'Unit', 
-                                               'Category', 'Current_Stock', 'Min_Stock_Level', 
-                                               'Cost_Per_Unit', 'Supplier', 'Description', 
-                                               'Active', 'Last_Updated']),
-            'Recipes': pd.DataFrame(columns=['Recipe_ID', 'Product_ID', 'Ingredient_ID', 
-                                           'Quantity_Required']),
-            'Sales': pd.DataFrame(columns=['Sale_ID', 'Product_ID', 'Quantity', 
-                                         'Sale_Date', 'Sale_Time', 'Total_Amount']),
-            'Inventory_Log': pd.DataFrame(columns=['Log_ID', 'Ingredient_ID', 'Change_Type', 
-                                                 'Quantity', 'Date', 'Notes']),
-            'Expenses': pd.DataFrame(columns=['Expense_ID', 'Expense_Date', 'Expense_Type', 
-                                            'Description', 'Amount', 'Category', 
-                                            'Payment_Method', 'Notes'])
-        }
-        
-        with pd.ExcelWriter(self.excel_file, engine='openpyxl', mode='a', 
-                          if_sheet_exists='overlay') as writer:
-            for tab_name, df in default_tabs.items():
-                if tab_name not in existing_tabs:
-                    df.to_excel(writer, sheet_name=tab_name, index=False)
-                    print(f"➕ Added missing tab: {tab_name}")
+        missing_tabs = {tab_name: empty_tab(tab_name) for tab_name in SCHEMA
+                        if tab_name not in existing_tabs}
+        if missing_tabs:
+            self.storage.add_tabs(missing_tabs)
+            for tab_name in missing_tabs:
+                print(f"➕ Added missing tab: {tab_name}")
+            # Databases created before the rollup existed: fill it from history
+            if 'Sales_Daily' in missing_tabs and 'Sales' not in missing_tabs:
+                self.rebuild_sales_rollup()
+
+    # ===== TAB CACHE =====
+    def invalidate_cache(self, tab_name=None):
+        """Drop one cached tab, or every cached tab when tab_name is None"""
+        with self._cache_lock:
+            if tab_name is None:
+                self.cache_stats['invalidations'] += len(self._tab_cache)
+                self._tab_cache.clear()
+                self._key_indexes.clear()
+                self._recipe_index = None
+            elif self._tab_cache.pop(tab_name, None) is not None:
+                self.cache_stats['invalidations'] += 1
+                self._key_indexes.pop(tab_name, None)
+
+    def get_cache_stats(self):
+        """Get tab cache hit/miss counters"""
+        with self._cache_lock:
+            stats = dict(self.cache_stats)
+            cached_tabs = sorted(self._tab_cache.keys())
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] / lookups * 100) if lookups else 0.0
+        stats['cached_tabs'] = cached_tabs
+        return stats
 
     def read_tab(self, tab_name):
-        """Read data from an Excel tab"""
-        try:
-            df = pd.read_excel(self.excel_file, sheet_name=tab_name)
-            
-            # Define numeric columns for each sheet
-            numeric_columns_map = {
-                'Ingredients': ['Current_Stock', 'Cost_Per_Unit', 'Min_Stock_Level'],
-                'Products': ['Selling_Price', 'Cost_Price', 'Profit_Margin', 'Margin_Percentage'],
-                'Sales': ['Quantity', 'Total_Amount'],
-                'Expenses': ['Amount'],
-                'Recipes': ['Quantity_Required'],
-                'Inventory_Log': ['Quantity']
-            }
-            
-            # Convert numeric columns to float64
-            if tab_name in numeric_columns_map:
-                for col in numeric_columns_map[tab_name]:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0).astype('float64')
-            
-            # Convert text columns to string and fill NaN with empty string
-            text_columns = ['Product_Name', 'Category', 'Notes', 'Description', 
-                          'Ingredient_Name', 'Supplier', 'Unit', 'Active',
-                          'Expense_Type', 'Payment_Method', 'Change_Type']
-            
-            for col in text_columns:
-                if col in df.columns:
-                    df[col] = df[col].astype(str).fillna('')
-            
+        """Read data from a tab (served from cache while the store is unchanged)"""
+        self.metrics.count(read_tab_calls=1)
+        return self._cached_tab(tab_name).copy()
+
+    def _cached_tab(self, tab_name):
+        """Get the cached frame of a tab, loading it if needed (callers must not modify it)"""
+        pending = self._pending_saves.get(tab_name)
+        if pending is not None:
+            with self._cache_lock:
+                self.cache_stats['hits'] += 1
+            return pending
+        
+        stamp = self.storage.stamp()
+        with self._cache_lock:
+            cached = self._tab_cache.get(tab_name)
+            if cached is not None and stamp is not None and cached[0] == stamp:
+                self.cache_stats['hits'] += 1
+                return cached[1]
+            self.cache_stats['misses'] += 1
+        
+        # Storage reads wait for writes of other threads (the stamp does not
+        # change on our own SQLite commits, so a frame read while a write
+        # refreshed the cache would be cached as current); cached tabs stay
+        # available to other threads meanwhile
+        with self._write_lock:
+            pending = self._pending_saves.get(tab_name)
+            if pending is not None:
+                return pending
+            with self._cache_lock:
+                cached = self._tab_cache.get(tab_name)
+            try:
+                with self.store_lock.shared():
+                    stamp = self.storage.stamp()
+                    if cached is not None and stamp is not None and cached[0] == stamp:
+                        # Loaded by another thread while this one waited
+                        return cached[1]
+                    df = self._normalize_tab(tab_name, self.storage.read(tab_name))
+                self.metrics.count(storage_reads=1, rows_read=len(df))
+            except Exception as e:
+                print(f"⚠️ Could not read tab '{tab_name}': {e}")
+                # Return empty dataframe with correct columns
+                return empty_tab(tab_name) if tab_name in SCHEMA else pd.DataFrame()
+            
+            # Stamp was taken before reading, so a change by another process only causes a re-read
+            if stamp is not None:
+                with self._cache_lock:
+                    self._tab_cache[tab_name] = (stamp, df)
             return df
+
+    def read_range(self, tab_name, start_date=None, end_date=None):
+        """
+        Read the rows of a history tab dated within a range of days
+        
+        Only the monthly partitions the range covers are loaded, so recent
+        periods cost the same however many years of history the tab holds.
+        Archived rows within the range are included.
+        
+        Args:
+            tab_name: Tab listed in PARTITIONED_TABS ('Sales', 'Inventory_Log', 'Expenses')
+            start_date: First day to include (date, datetime or 'YYYY-MM-DD'), or None
+            end_date: Last day to include, or None
+        
+        Returns:
+            DataFrame of the matching rows in storage order
+        """
+        if tab_name not in PARTITIONED_TABS:
+            raise ValueError(f"Tab '{tab_name}' is not partitioned by date")
+        start, end = to_day(start_date), to_day(end_date)
+        self._flush_if_pending([tab_name])
+        
+        try:
+            with self._write_lock, self.store_lock.shared():
+                df = self.storage.read_range(tab_name, start, end)
+            self.metrics.count(storage_reads=1, rows_read=len(df))
         except Exception as e:
             print(f"⚠️ Could not read tab '{tab_name}': {e}")
-            # Return empty dataframe with correct columns
-            if tab_name == 'Ingredients':
-                return pd.DataFrame(columns=['Ingredient_ID', 'Ingredient_Name', 'Unit', 'Category', 
-                                           'Current_Stock', 'Min_Stock_Level', 'Cost_Per_Unit', 
-                                           'Supplier', 'Description', 'Active', 'Last_Updated'])
-            elif tab_name == 'Products':
-                return pd.DataFrame(columns=['Product_ID', 'Product_Name', 'Category', 'Selling_Price', 
-                                           'Active', 'Cost_Price', 'Profit_Margin', 'Margin_Percentage', 'Notes'])
-            else:
-                return pd.DataFrame()
+            return empty_tab(tab_name)
+        df = self._normalize_tab(tab_name, df)
+        if tab_name in ARCHIVED_TABS:
+            df = self._with_archived_rows(tab_name, df, start, end)
+        return df
+
+    def _with_archived_rows(self, tab_name, live_df, start, end):
+        """Put the archived rows of a date range in front of the live ones"""
+        months = self.archive.months(tab_name)
+        first_month = start.strftime("%Y-%m") if start is not None else None
+        last_month = end.strftime("%Y-%m") if end is not None else None
+        if (not months or (first_month is not None and first_month > months[-1])
+                or (last_month is not None and last_month < months[0])):
+            return live_df
+        
+        try:
+            archived_df = self.archive.read(tab_name, first_month, last_month)
+        except Exception as e:
+            print(f"⚠️ Could not read archived '{tab_name}' rows: {e}")
+            return live_df
+        date_column = PARTITIONED_TABS[tab_name]
+        archived_df = archived_df[range_mask(archived_df[date_column], start, end).to_numpy()]
+        if archived_df.empty:
+            return live_df
+        return pd.concat([self._normalize_tab(tab_name, archived_df), live_df], ignore_index=True)
+
+    def _normalize_tab(self, tab_name, df):
+        """Bring the column types of freshly loaded rows to the tab schema"""
+        return coerce_tab(tab_name, df)
+
+    def _extend_frame(self, tab_name, df, rows):
+        """
+        Append new rows to a cached frame the way a fresh read would return them
+
+        Returns:
+            (added, extended): the typed new rows (with every column of df)
+            and df followed by them
+        """
+        columns = list(df.columns) + [col for col in rows.columns if col not in df.columns]
+        added = self._normalize_tab(tab_name, rows.reindex(columns=columns))
+        extended = self._normalize_tab(tab_name, pd.concat([df, added], ignore_index=True))
+        return added, extended
 
     def save_tab(self, tab_name, data_df):
-        """Save data to an Excel tab with lock handling"""
+        """Save data to a tab with lock handling"""
+        self.write_stats['tab_saves'] += 1
+        self.metrics.count(save_tab_calls=1)
+        if self.write_mode == 'behind':
+            self._defer_save(tab_name, data_df)
+            if tab_name == 'Sales':
+                self.rebuild_sales_rollup()
+            return True
+        
         max_retries = 3
         retry_delay = 1
         
         for attempt in range(max_retries):
             try:
-                if self.is_file_locked(self.excel_file):
+                if self.is_file_locked(self.storage.path):
                     if attempt == max_retries - 1:
-                        raise PermissionError(f"File is locked: {self.excel_file}")
+                        raise PermissionError(f"File is locked: {self.storage.path}")
                     print(f"⚠️ File locked, retrying... (Attempt {attempt + 1}/{max_retries})")
                     time.sleep(retry_delay)
                     continue
                 
-                # Read all existing tabs
-                all_tabs = {}
-                try:
-                    excel_file = pd.ExcelFile(self.excel_file)
-                    for sheet in excel_file.sheet_names:
-                        if sheet != tab_name:
-                            all_tabs[sheet] = pd.read_excel(self.excel_file, sheet_name=sheet)
-                except:
-                    pass
-                
-                # Add/update our tab
-                all_tabs[tab_name] = data_df
-                
-                # Write all tabs back
-                with pd.ExcelWriter(self.excel_file, engine='openpyxl') as writer:
-                    for sheet_name, sheet_data in all_tabs.items():
-                        sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
-                
+                with self._store_write():
+                    stamp_before = self.storage.stamp()
+                    self.storage.write(tab_name, data_df)
+                    self.write_stats['storage_writes'] += 1
+                    self.metrics.count(storage_writes=1, rows_written=len(data_df))
+                    self._refresh_cache_after_save(tab_name, stamp_before)
+                # Sales rewritten as a whole (import, clear data): regenerate the rollup
+                if tab_name == 'Sales':
+                    self.rebuild_sales_rollup()
                 return True
                 
             except PermissionError as e:
@@ -178,6 +300,117 @@ class InventoryDB:
         
         return False
 
+    def _refresh_cache_after_save(self, tab_name, stamp_before):
+        """Keep cached copies of untouched tabs valid after our own write"""
+        stamp_after = self.storage.stamp()
+        with self._cache_lock:
+            self.invalidate_cache(tab_name)
+            for name, (stamp, df) in list(self._tab_cache.items()):
+                if stamp == stamp_before:
+                    self._tab_cache[name] = (stamp_after, df)
+                else:
+                    self.invalidate_cache(name)
+
+    # ===== WRITE-BEHIND =====
+    # In 'behind' mode save_tab only records the new frame; reads are served
+    # from it, and flush() writes every pending tab in one storage write.
+    # Anything that reads or writes a pending tab in storage directly
+    # (appends, commits, row-level operations, range reads) flushes first.
+    def _defer_save(self, tab_name, data_df):
+        """Record a tab save for the next flush"""
+        pending = self._normalize_tab(tab_name, data_df.copy())
+        with self._write_lock:
+            self._pending_saves[tab_name] = pending
+            self.invalidate_cache(tab_name)
+            if self._flush_timer is None:
+                self._start_flush_timer()
+
+    def _start_flush_timer(self):
+        """Flush in the background after flush_interval (call with the write lock held)"""
+        self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def flush(self):
+        """
+        Write all pending saves to storage in one write
+        
+        Returns:
+            True if nothing is left pending, False if the write failed (the
+            tabs stay pending and are retried after flush_interval)
+        """
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending_saves:
+                return True
+            
+            tabs = dict(self._pending_saves)
+            stamp_before = self.storage.stamp()
+            try:
+                if self.is_file_locked(self.storage.path):
+                    raise PermissionError(f"File is locked: {self.storage.path}")
+                with self.store_lock.exclusive():
+                    self.storage.write_tabs(tabs)
+            except Exception as e:
+                print(f"❌ Error saving tabs {', '.join(tabs)}: {e}")
+                self._start_flush_timer()
+                return False
+            self.write_stats['storage_writes'] += 1
+            self.metrics.count(storage_writes=1, rows_written=sum(len(df) for df in tabs.values()))
+            
+            # Written tabs are re-read like after a synchronous save; other cached tabs stay valid
+            stamp_after = self.storage.stamp()
+            with self._cache_lock:
+                for name, (stamp, df) in list(self._tab_cache.items()):
+                    if name in tabs or stamp != stamp_before:
+                        self.invalidate_cache(name)
+                    else:
+                        self._tab_cache[name] = (stamp_after, df)
+            for name in tabs:
+                del self._pending_saves[name]
+            return True
+
+    def _flush_if_pending(self, tab_names):
+        """Flush before storage is accessed directly for any of the given tabs"""
+        if any(name in self._pending_saves for name in tab_names):
+            self.flush()
+
+    def get_write_stats(self):
+        """Get save_tab calls vs. physical storage writes of whole tabs"""
+        stats = dict(self.write_stats)
+        stats['write_mode'] = self.write_mode
+        stats['pending_tabs'] = sorted(self._pending_saves)
+        return stats
+
+    # ===== CROSS-PROCESS LOCKING =====
+    # Several terminals may share one store. Reads from storage hold the
+    # store lock shared; every read-modify-write cycle holds it exclusively,
+    # so the rows it reads are still current when it writes.
+    @contextmanager
+    def _store_write(self):
+        """Hold the write lock and the exclusive store lock (raises TimeoutError)"""
+        with self._write_lock, self.store_lock.exclusive():
+            yield
+
+    def get_lock_stats(self):
+        """Get store lock acquisitions, waits for other processes and timeouts"""
+        return self.store_lock.get_stats()
+
+    # ===== METRICS =====
+    def get_metrics(self):
+        """Get per-method timings, per-caller totals and the slow operations log"""
+        metrics = self.metrics.snapshot()
+        metrics['cache'] = self.get_cache_stats()
+        metrics['writes'] = self.get_write_stats()
+        metrics['locks'] = self.get_lock_stats()
+        return metrics
+
+    def reset_metrics(self):
+        """Start collecting method timings from scratch"""
+        self.metrics.reset()
+
     def is_file_locked(self, filepath):
         """Check if a file is locked by another process"""
         if not os.path.exists(filepath):
@@ -190,52 +423,447 @@ class InventoryDB:
         except IOError:
             return True
 
-    # ===== PRODUCT MANAGEMENT =====
-    def generate_product_id(self):
-        """Generate a new unique product ID"""
-        products_df = self.read_tab('Products')
+    # ===== PRIMARY KEY INDEX =====
+    # Each cached frame gets a {str(key): row position} index on first use.
+    # Frames that keep their rows in place and only gain new ones (appends,
+    # value updates) hand their index on; any other change rebuilds it.
+    def _read_indexed(self, tab_name):
+        """
+        Read a tab together with its primary-key index
+
+        Returns:
+            Tuple: (cached DataFrame, not to be modified; index dictionary,
+            or None when the key column is missing or holds duplicates)
+        """
+        df = self._cached_tab(tab_name)
+        return df, self._key_index(tab_name, df)
+
+    def _key_index(self, tab_name, df):
+        """Get the primary-key index of a cached frame, building it if needed"""
+        with self._cache_lock:
+            entry = self._key_indexes.get(tab_name)
+        if entry is not None and entry[0] is df:
+            return entry[1]
+        
+        key_column = TAB_KEYS.get(tab_name)
+        index = None
+        if key_column in df.columns:
+            keys = df[key_column].astype(str).tolist()
+            index = dict(zip(keys, range(len(keys))))
+            if len(index) != len(keys):
+                # Duplicate keys: lookups fall back to scanning the column
+                index = None
+        with self._cache_lock:
+            self._key_indexes[tab_name] = (df, index)
+        return index
+
+    def _locate(self, df, key_index, key_column, key):
+        """Row position of the first row whose key_column equals key, or None"""
+        if key_index is not None:
+            return key_index.get(str(key))
+        matches = (df[key_column] == key).to_numpy().nonzero()[0]
+        return int(matches[0]) if len(matches) else None
+
+    def _carry_key_index(self, tab_name, old_df, new_df, appended=None, updates=None):
+        """
+        Hand the index of a replaced cached frame on to its successor
+
+        Args:
+            old_df: Frame being replaced in the cache
+            new_df: old_df's rows at the same positions, then the appended rows
+            appended: Rows added after old_df's rows
+            updates: {key: {column: value}} applied to old_df's rows
+        """
+        with self._cache_lock:
+            entry = self._key_indexes.pop(tab_name, None)
+            if entry is None or entry[0] is not old_df or entry[1] is None:
+                return
+            
+            index = entry[1]
+            key_column = TAB_KEYS[tab_name]
+            if updates and any(key_column in values for values in updates.values()):
+                return
+            if appended is not None and len(appended):
+                if key_column not in appended.columns:
+                    return
+                for position, key in enumerate(appended[key_column].astype(str).tolist(), len(old_df)):
+                    if index.setdefault(key, position) != position:
+                        return
+            self._key_indexes[tab_name] = (new_df, index)
+
+    # ===== ROW OPERATIONS =====
+    # Backends with row-level writes (SQLite) touch only the affected rows;
+    # the Excel backend falls back to read-modify-save of the whole tab.
+    def _row_write(self, tab_name, operation, *args):
+        """Run a row-level storage write and keep the cache in sync"""
+        try:
+            with self._store_write():
+                self._flush_if_pending([tab_name])
+                stamp_before = self.storage.stamp()
+                result = operation(tab_name, *args)
+                self.metrics.count(storage_writes=1, rows_written=result if isinstance(result, int) else 0)
+                self._refresh_cache_after_save(tab_name, stamp_before)
+                return result
+        except Exception as e:
+            print(f"❌ Error saving tab '{tab_name}': {e}")
+            return None
+
+    def _find_rows(self, tab_name, key_column, key):
+        """Get the rows of a tab whose key_column equals key"""
+        if self.storage.row_level_writes and tab_name not in self._pending_saves:
+            try:
+                rows = self._normalize_tab(tab_name, self.storage.find(tab_name, key_column, key))
+                self.metrics.count(storage_reads=1, rows_read=len(rows))
+                return rows
+            except Exception as e:
+                print(f"⚠️ Could not read tab '{tab_name}': {e}")
+                return pd.DataFrame()
         
-        if products_df.empty or 'Product_ID' not in products_df.columns:
-            return "PROD001"
+        df, key_index = self._read_indexed(tab_name)
+        if df.empty or key_column not in df.columns:
+            return pd.DataFrame(columns=df.columns)
+        if key_column == TAB_KEYS.get(tab_name):
+            position = self._locate(df, key_index, key_column, key)
+            return df.iloc[[] if position is None else [position]].copy()
+        return df[df[key_column] == key].copy()
+
+    def _row_count(self, tab_name):
+        """Number of rows in a tab"""
+        if self.storage.row_level_writes and tab_name not in self._pending_saves:
+            try:
+                return self.storage.count(tab_name)
+            except Exception:
+                return 0
+        return len(self.read_tab(tab_name))
+
+    def _append_rows(self, tab_name, rows):
+        """Append a list of row dictionaries to a tab"""
+        new_rows = pd.DataFrame(rows)
+        try:
+            with self._store_write():
+                if self.storage.supports_append(tab_name):
+                    self._flush_if_pending([tab_name])
+                    cached = self._tab_cache.get(tab_name)
+                    stamp_before = self.storage.stamp()
+                    if self._row_write(tab_name, self.storage.append, new_rows) is None:
+                        return False
+                    
+                    # Extend the cached frame instead of re-reading the whole tab
+                    if cached is not None and cached[0] == stamp_before:
+                        added, extended = self._extend_frame(tab_name, cached[1], new_rows)
+                        stamp_after = self.storage.stamp()
+                        with self._cache_lock:
+                            self._tab_cache[tab_name] = (stamp_after, extended)
+                            self._carry_key_index(tab_name, cached[1], extended, appended=added)
+                    
+                    if self.storage.needs_compaction():
+                        self.compact_journal()
+                    return True
+                
+                tab_df = self.read_tab(tab_name)
+                tab_df = pd.concat([tab_df, new_rows], ignore_index=True)
+                return self.save_tab(tab_name, tab_df)
+        except TimeoutError as e:
+            print(f"❌ Error saving tab '{tab_name}': {e}")
+            return False
+
+    def _update_rows(self, tab_name, key_column, updates):
+        """Apply {key: {column: value}} updates to a tab in one write"""
+        if self.storage.row_level_writes:
+            return self._row_write(tab_name, self.storage.update, key_column, updates) is not None
+        
+        try:
+            with self._store_write():
+                tab_df, key_index = self._read_indexed(tab_name)
+                if key_column != TAB_KEYS.get(tab_name):
+                    key_index = None
+                return self.save_tab(tab_name, apply_updates(tab_df, key_column, updates, key_index))
+        except TimeoutError as e:
+            print(f"❌ Error saving tab '{tab_name}': {e}")
+            return False
+
+    def _delete_rows(self, tab_name, key_column, key):
+        """Delete rows matching key; returns the number deleted, or None on failure"""
+        if self.storage.row_level_writes:
+            return self._row_write(tab_name, self.storage.delete, key_column, key)
+        
+        try:
+            with self._store_write():
+                tab_df = self.read_tab(tab_name)
+                if tab_df.empty or key_column not in tab_df.columns:
+                    return 0
+                
+                initial_count = len(tab_df)
+                tab_df = tab_df[tab_df[key_column] != key]
+                deleted = initial_count - len(tab_df)
+                if deleted == 0:
+                    return 0
+                return deleted if self.save_tab(tab_name, tab_df) else None
+        except TimeoutError as e:
+            print(f"❌ Error saving tab '{tab_name}': {e}")
+            return None
+
+    def _replace_rows(self, tab_name, key_column, key, rows):
+        """Replace the rows matching key with new row dictionaries"""
+        new_rows = pd.DataFrame(rows)
+        if self.storage.row_level_writes:
+            return self._row_write(tab_name, self.storage.replace_rows,
+                                   key_column, key, new_rows) is not None
+        
+        try:
+            with self._store_write():
+                tab_df = self.read_tab(tab_name)
+                if not tab_df.empty and key_column in tab_df.columns:
+                    tab_df = tab_df[tab_df[key_column] != key]
+                tab_df = pd.concat([tab_df, new_rows], ignore_index=True)
+                return self.save_tab(tab_name, tab_df)
+        except TimeoutError as e:
+            print(f"❌ Error saving tab '{tab_name}': {e}")
+            return False
+
+    def _commit(self, appends=None, updates=None):
+        """
+        Apply changes to several tabs as one atomic storage write
+
+        Args:
+            appends: Dictionary of {tab_name: [row dictionaries]}
+            updates: Dictionary of {tab_name: {key: {column: value}}}
+
+        Returns:
+            True if every change was stored, False if none was
+        """
+        appends = {tab: pd.DataFrame(rows) for tab, rows in (appends or {}).items() if rows}
+        updates = {tab: changes for tab, changes in (updates or {}).items() if changes}
         
-        prod_numbers = []
-        for pid in products_df['Product_ID'].dropna():
-            if isinstance(pid, str) and pid.startswith('PROD'):
+        try:
+            with self._store_write():
+                self._flush_if_pending(set(appends) | set(updates))
+                stamp_before = self.storage.stamp()
                 try:
-                    num = int(pid[4:])
-                    prod_numbers.append(num)
-                except:
-                    pass
+                    self.storage.commit(appends, updates)
+                    self.metrics.count(storage_writes=1,
+                                       rows_written=sum(map(len, appends.values())) + sum(map(len, updates.values())))
+                except Exception as e:
+                    print(f"❌ Error committing changes to {', '.join(set(appends) | set(updates))}: {e}")
+                    self.invalidate_cache()
+                    return False
+                
+                # Apply the same changes to cached frames instead of re-reading the tabs
+                stamp_after = self.storage.stamp()
+                with self._cache_lock:
+                    for name, (stamp, df) in list(self._tab_cache.items()):
+                        if stamp != stamp_before:
+                            self.invalidate_cache(name)
+                            continue
+                        if name not in appends and name not in updates:
+                            self._tab_cache[name] = (stamp_after, df)
+                            continue
+                    
+                        if name in appends:
+                            added, extended = self._extend_frame(name, df, appends[name])
+                            self._carry_key_index(name, df, extended, appended=added)
+                            df = extended
+                        if name in updates:
+                            updated = apply_updates(df, TAB_KEYS[name], updates[name],
+                                                    self._key_index(name, df))
+                            self._carry_key_index(name, df, updated, updates=updates[name])
+                            df = updated
+                        self._tab_cache[name] = (stamp_after, df)
+                
+                if self.storage.needs_compaction():
+                    self.compact_journal()
+                return True
+        except TimeoutError as e:
+            print(f"❌ Error committing changes to {', '.join(set(appends) | set(updates))}: {e}")
+            return False
+
+    def compact_journal(self):
+        """Fold journaled changes into the base tabs"""
+        try:
+            with self._store_write():
+                stamp_before = self.storage.stamp()
+                try:
+                    folded = self.storage.compact()
+                except Exception as e:
+                    print(f"⚠️ Journal compaction failed: {e}")
+                    return 0
+                
+                if folded:
+                    self.metrics.count(storage_writes=1)
+                    # Compaction does not change tab contents, only where rows live
+                    stamp_after = self.storage.stamp()
+                    with self._cache_lock:
+                        for name, (stamp, df) in list(self._tab_cache.items()):
+                            if stamp == stamp_before:
+                                self._tab_cache[name] = (stamp_after, df)
+                    print(f"🗜️ Compacted {folded} journaled rows into {self.storage.path}")
+                return folded
+        except TimeoutError as e:
+            print(f"⚠️ Journal compaction failed: {e}")
+            return 0
+
+    # ===== ID SEQUENCES =====
+    # Counters live in the store (sidecar file / _sequences table); a counter
+    # is seeded from the highest ID in its tab, archived rows included, the
+    # first time it is used.
+    def reserve_ids(self, prefix, count=1):
+        """
+        Reserve a block of consecutive IDs
+
+        Args:
+            prefix: ID prefix (PROD, ING, EXP, SALE, LOG, REC)
+            count: Number of IDs to reserve
+
+        Returns:
+            List of IDs, e.g. ['SALE0012', 'SALE0013']
+        """
+        if count <= 0:
+            return []
+        # Other processes reserve from the same counters
+        with self._store_write():
+            floor = 0
+            if self.storage.sequence_value(prefix) is None:
+                floor = self._highest_id_number(prefix)
+            first = self.storage.reserve_sequence(prefix, count, floor)
+        return [format_id(prefix, number) for number in range(first, first + count)]
+
+    def next_id(self, prefix):
+        """Reserve and return a single new ID"""
+        return self.reserve_ids(prefix)[0]
+
+    def peek_id(self, prefix):
+        """The ID next_id would return, without reserving it"""
+        last = self.storage.sequence_value(prefix)
+        if last is None:
+            last = self._highest_id_number(prefix)
+        return format_id(prefix, last + 1)
+
+    def _highest_id_number(self, prefix):
+        tab_name, column, _ = SEQUENCES[prefix]
+        tab_df = self.read_tab(tab_name)
+        highest = 0
+        if not tab_df.empty and column in tab_df.columns:
+            highest = max_id_number(tab_df[column], prefix)
+        if tab_name in ARCHIVED_TABS:
+            highest = max(highest, max_id_number(self.archive.keys(tab_name), prefix))
+        return highest
+
+    # ===== IMPORT / EXPORT =====
+    def export_to_excel(self, filepath=None):
+        """Export every tab to an Excel workbook (history tabs with their archived rows)"""
+        filepath = filepath or self.excel_file
+        if self.storage.name == 'excel' and os.path.abspath(filepath) == os.path.abspath(self.storage.path):
+            return False, "Cannot export the database onto itself"
         
-        next_num = max(prod_numbers) + 1 if prod_numbers else 1
-        return f"PROD{next_num:03d}"
+        try:
+            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+                for tab_name in self.storage.tab_names():
+                    tab_df = self.read_tab(tab_name)
+                    if tab_name in ARCHIVED_TABS:
+                        tab_df = self._with_archived_rows(tab_name, tab_df, None, None)
+                    tab_df.to_excel(writer, sheet_name=tab_name, index=False)
+            print(f"📤 Exported database to {filepath}")
+            return True, f"Exported database to {filepath}"
+        except Exception as e:
+            print(f"❌ Error exporting database: {e}")
+            return False, f"Error exporting database: {str(e)}"
+
+    def import_from_excel(self, filepath=None):
+        """Replace the contents of every tab with the sheets of an Excel workbook"""
+        filepath = filepath or self.excel_file
+        if self.storage.name == 'excel' and os.path.abspath(filepath) == os.path.abspath(self.storage.path):
+            return False, "Cannot import the database onto itself"
+        
+        try:
+            sheets = pd.read_excel(filepath, sheet_name=None)
+        except Exception as e:
+            print(f"❌ Error importing database: {e}")
+            return False, f"Error importing database: {str(e)}"
+        
+        imported = []
+        for tab_name, df in sheets.items():
+            if tab_name == 'Sales_Daily':
+                continue
+            key_column = TAB_KEYS.get(tab_name)
+            if key_column in df.columns:
+                duplicated = df[key_column].notna() & df.duplicated(key_column, keep='first')
+                if duplicated.any():
+                    print(f"⚠️ Skipped {duplicated.sum()} duplicate {key_column} rows in '{tab_name}'")
+                    df = df[~duplicated]
+            if self.save_tab(tab_name, df):
+                imported.append(tab_name)
+                # Exports carry the archived rows too; they are live again now
+                if tab_name in ARCHIVED_TABS and key_column in df.columns:
+                    self.archive.remove(tab_name, df[key_column].dropna())
+        
+        # Imported IDs may be ahead of the stored counters
+        self.storage.reset_sequences()
+        print(f"📥 Imported {len(imported)} tabs from {filepath}")
+        return True, f"Imported {len(imported)} tabs from {filepath}"
+
+    def backup(self, backup_file):
+        """
+        Write a copy of the current data to an Excel backup file
+        
+        The Excel store is copied together with its archive folder
+        (backup_file's .archive/); other stores are exported with the
+        archived rows included in their tabs.
+        """
+        if self.storage.name == 'excel':
+            self.flush()
+            self.compact_journal()
+            shutil.copy2(self.storage.path, backup_file)
+            archive_copy = self.archive.copy_to(backup_file)
+            if archive_copy:
+                return True, f"Backup saved as {backup_file} (archive in {archive_copy})"
+            return True, f"Backup saved as {backup_file}"
+        return self.export_to_excel(backup_file)
+
+    def clear_tabs(self, tab_names):
+        """
+        Delete every row of some tabs, archived rows included
+        
+        Args:
+            tab_names: Tabs to empty (their columns are kept)
+        
+        Returns:
+            Tuple: (success, message)
+        """
+        try:
+            with self._store_write():
+                for tab_name in tab_names:
+                    if not self.save_tab(tab_name, empty_tab(tab_name)):
+                        return False, f"Failed to clear {tab_name}"
+                    if tab_name in ARCHIVED_TABS:
+                        self.archive.clear(tab_name)
+                if 'Sales' in tab_names:
+                    # Saving the empty Sales tab rolled up the archive that was still there
+                    self.rebuild_sales_rollup()
+        except TimeoutError as e:
+            print(f"❌ Clearing data failed: {e}")
+            return False, f"Clearing data failed: {e}"
+        print(f"🗑️ Cleared {', '.join(tab_names)}")
+        return True, f"Cleared {len(tab_names)} tabs"
+
+    # ===== PRODUCT MANAGEMENT =====
+    def generate_product_id(self):
+        """The ID the next added product will get (not reserved; for display)"""
+        return self.peek_id('PROD')
 
     def add_product(self, product_data):
-        """Add a new product to the database"""
+        """Add a new product to the database (its Product_ID is assigned here)"""
         try:
             # Validate required fields
-            required_fields = ['Product_ID', 'Product_Name', 'Selling_Price', 'Active']
+            required_fields = ['Product_Name', 'Selling_Price', 'Active']
             for field in required_fields:
                 if field not in product_data:
                     return False, f"Missing required field: {field}"
             
-            products_df = self.read_tab('Products')
-            
-            # Check if product ID already exists
-            if not products_df.empty and 'Product_ID' in products_df.columns:
-                if product_data['Product_ID'] in products_df['Product_ID'].values:
-                    return False, f"Product ID {product_data['Product_ID']} already exists"
-            
-            # Ensure all columns exist
+            # Prepare new row with all default columns
             default_columns = ['Product_ID', 'Product_Name', 'Category', 'Selling_Price', 
                              'Active', 'Cost_Price', 'Profit_Margin', 'Margin_Percentage', 'Notes']
-            for col in default_columns:
-                if col not in products_df.columns:
-                    products_df[col] = None
-            
-            # Prepare new row
             new_row = {}
-            for col in products_df.columns:
+            for col in default_columns:
                 if col in product_data:
                     new_row[col] = product_data[col]
                 elif col == 'Cost_Price':
@@ -251,14 +879,19 @@ class InventoryDB:
                 else:
                     new_row[col] = None
             
-            # Add product
-            products_df = pd.concat([products_df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            # Save and update costs
-            if self.save_tab('Products', products_df):
-                self.update_all_product_costs()
+            # Reserve the ID and write the row under one store lock
+            with self._store_write():
+                product_id = self.next_id('PROD')
+                new_row['Product_ID'] = product_id
+                if not self._find_rows('Products', 'Product_ID', product_id).empty:
+                    return False, f"Product ID {product_id} already exists"
+                saved = self._append_rows('Products', [new_row])
+            
+            # Add product, then update costs
+            if saved:
+                self.update_product_costs([product_id])
                 print(f"✅ Added product: {product_data['Product_Name']}")
-                return True, f"Product '{product_data['Product_Name']}' added successfully"
+                return True, f"Product '{product_data['Product_Name']}' added successfully (ID: {product_id})"
             return False, "Failed to save product"
             
         except Exception as e:
@@ -268,24 +901,16 @@ class InventoryDB:
     def update_product(self, product_id, updated_data):
         """Update an existing product"""
         try:
-            products_df = self.read_tab('Products')
-            
-            if products_df.empty or 'Product_ID' not in products_df.columns:
-                return False, f"Product {product_id} not found"
-            
-            mask = products_df['Product_ID'] == product_id
-            if not mask.any():
+            product_rows = self._find_rows('Products', 'Product_ID', product_id)
+            if product_rows.empty:
                 return False, f"Product {product_id} not found"
             
-            idx = products_df[mask].index[0]
-            
             # Update fields
-            for key, value in updated_data.items():
-                if key in products_df.columns:
-                    products_df.at[idx, key] = value
+            values = {key: value for key, value in updated_data.items()
+                      if key in product_rows.columns}
             
             # Save
-            if self.save_tab('Products', products_df):
+            if self._update_rows('Products', 'Product_ID', {product_id: values}):
                 print(f"✅ Updated product: {product_id}")
                 return True, f"Product {product_id} updated successfully"
             return False, "Failed to save changes"
@@ -305,22 +930,17 @@ class InventoryDB:
     def delete_product_permanently(self, product_id):
         """Permanently delete a product and its recipes"""
         try:
-            # Delete from Products
-            products_df = self.read_tab('Products')
-            initial_count = len(products_df)
-            products_df = products_df[products_df['Product_ID'] != product_id]
-            
-            if len(products_df) == initial_count:
+            if self._find_rows('Products', 'Product_ID', product_id).empty:
                 return False, f"Product {product_id} not found"
             
             # Delete associated recipes
-            recipes_df = self.read_tab('Recipes')
-            if not recipes_df.empty and 'Product_ID' in recipes_df.columns:
-                recipes_df = recipes_df[recipes_df['Product_ID'] != product_id]
-                self.save_tab('Recipes', recipes_df)
+            with self._store_write():
+                recipes_before = self._current_frame('Recipes')
+                if self._delete_rows('Recipes', 'Product_ID', product_id) is not None:
+                    self._index_recipe(product_id, [], recipes_before)
             
-            # Save updated products
-            if self.save_tab('Products', products_df):
+            # Delete from Products
+            if self._delete_rows('Products', 'Product_ID', product_id):
                 print(f"✅ Permanently deleted product: {product_id}")
                 return True, f"Product {product_id} permanently deleted"
             return False, "Failed to save changes"
@@ -331,16 +951,12 @@ class InventoryDB:
 
     def get_product_recipes(self, product_id):
         """Get all ingredients for a specific product"""
-        recipes_df = self.read_tab('Recipes')
-        ingredients_df = self.read_tab('Ingredients')
-        
-        if recipes_df.empty or 'Product_ID' not in recipes_df.columns:
-            return pd.DataFrame()
-        
-        product_recipes = recipes_df[recipes_df['Product_ID'] == product_id].copy()
+        product_recipes = self._find_rows('Recipes', 'Product_ID', product_id).copy()
         if product_recipes.empty:
             return pd.DataFrame()
         
+        ingredients_df = self.read_tab('Ingredients')
+        
         if not ingredients_df.empty and 'Ingredient_ID' in ingredients_df.columns:
             merged = pd.merge(product_recipes, ingredients_df, 
                             on='Ingredient_ID', how='left')
@@ -349,19 +965,27 @@ class InventoryDB:
         
         return product_recipes
 
-    def calculate_product_cost(self, product_id):
-        """Calculate total cost of a product based on its recipe"""
-        recipe_items = self.get_product_recipes(product_id)
-        
-        if recipe_items.empty:
-            return 0
+    def get_product_costs(self):
+        """Get the recipe cost of every product as a Series indexed by Product_ID"""
+        recipes_df = self.read_tab('Recipes')
+        ingredients_df = self.read_tab('Ingredients')
         
-        total_cost = 0
-        for _, item in recipe_items.iterrows():
-            cost = item.get('Cost_Per_Unit', 0) * item.get('Quantity_Required', 0)
-            total_cost += cost
+        # Reuse the result while both tabs are served from the same cache entries
+        with self._cache_lock:
+            sources = (self._tab_cache.get('Recipes'), self._tab_cache.get('Ingredients'))
+            cost_cache = self._cost_cache
+        if cost_cache is not None and None not in sources and \
+                all(old is new for old, new in zip(cost_cache[0], sources)):
+            return cost_cache[1]
         
-        return total_cost
+        costs = compute_product_costs(recipes_df, ingredients_df)
+        with self._cache_lock:
+            self._cost_cache = (sources, costs)
+        return costs
+
+    def calculate_product_cost(self, product_id):
+        """Calculate total cost of a product based on its recipe"""
+        return float(self.get_product_costs().get(product_id, 0.0))
 
     def update_all_product_costs(self):
         """Update costs for all products based on current ingredient prices"""
@@ -371,53 +995,136 @@ class InventoryDB:
             if products_df.empty:
                 return pd.DataFrame()
             
-            # Calculate cost for each product
-            costs = []
-            for _, product in products_df.iterrows():
-                cost = self.calculate_product_cost(product['Product_ID'])
-                costs.append(cost)
-            
-            # Update cost columns
-            products_df['Cost_Price'] = costs
+            updated_df = apply_product_costs(products_df, self.get_product_costs())
             
-            if 'Selling_Price' in products_df.columns:
-                products_df['Profit_Margin'] = products_df['Selling_Price'] - products_df['Cost_Price']
-                products_df['Margin_Percentage'] = (products_df['Profit_Margin'] / 
-                                                  products_df['Selling_Price'] * 100).round(2)
+            # Skip the write when no product cost or margin changed
+            cost_columns = [col for col in ['Cost_Price', 'Profit_Margin', 'Margin_Percentage']
+                            if col in updated_df.columns]
+            if all(col in products_df.columns for col in cost_columns) and \
+                    updated_df[cost_columns].equals(products_df[cost_columns]):
+                return updated_df
             
             # Save updated products
-            self.save_tab('Products', products_df)
-            print(f"✅ Updated costs for {len(products_df)} products")
-            return products_df
+            self.save_tab('Products', updated_df)
+            print(f"✅ Updated costs for {len(updated_df)} products")
+            return updated_df
         except Exception as e:
             print(f"❌ Error updating product costs: {e}")
             return pd.DataFrame()
 
-    # ===== INGREDIENT MANAGEMENT =====
-    def generate_ingredient_id(self):
-        """Generate a new unique ingredient ID"""
-        ingredients_df = self.read_tab('Ingredients')
+    def update_product_costs(self, product_ids):
+        """
+        Recompute cost and margins for the given products only
+
+        Args:
+            product_ids: Iterable of Product_IDs
+
+        Returns:
+            Number of products updated
+        """
+        product_ids = set(product_ids)
+        if not product_ids:
+            return 0
+        try:
+            products_df = self.read_tab('Products')
+            if products_df.empty:
+                return 0
+            products_df = products_df[products_df['Product_ID'].isin(product_ids)]
+            if products_df.empty:
+                return 0
+            
+            recipes_df = self.read_tab('Recipes')
+            if not recipes_df.empty and 'Product_ID' in recipes_df.columns:
+                recipes_df = recipes_df[recipes_df['Product_ID'].isin(product_ids)]
+            costs = compute_product_costs(recipes_df, self.read_tab('Ingredients'))
+            updated_df = apply_product_costs(products_df, costs)
+            
+            cost_columns = [col for col in ['Cost_Price', 'Profit_Margin', 'Margin_Percentage']
+                            if col in updated_df.columns]
+            updates = {row['Product_ID']: {col: row[col] for col in cost_columns}
+                       for row in updated_df.to_dict('records')}
+            if not self._update_rows('Products', 'Product_ID', updates):
+                return 0
+            print(f"✅ Updated costs for {len(updates)} products")
+            return len(updates)
+        except Exception as e:
+            print(f"❌ Error updating product costs: {e}")
+            return 0
+
+    # ===== RECIPE INDEX =====
+    def _get_recipe_index(self):
+        """Reverse recipe index: {Ingredient_ID: set of Product_IDs using it}"""
+        recipes_df = self._cached_tab('Recipes')
+        with self._cache_lock:
+            entry = self._recipe_index
+        if entry is not None and entry[0] is recipes_df:
+            return entry[1]
         
-        if ingredients_df.empty or 'Ingredient_ID' not in ingredients_df.columns:
-            return "ING001"
+        # Built for this cached frame only; a reload or replaced frame rebuilds it
+        recipe_index = {}
+        if not recipes_df.empty and {'Product_ID', 'Ingredient_ID'}.issubset(recipes_df.columns):
+            for product_id, ingredient_id in zip(recipes_df['Product_ID'], recipes_df['Ingredient_ID']):
+                recipe_index.setdefault(ingredient_id, set()).add(product_id)
+        with self._cache_lock:
+            self._recipe_index = (recipes_df, recipe_index)
+        return recipe_index
+
+    def _current_frame(self, tab_name):
+        """The frame a read of a tab would return now, or None if it would load from storage"""
+        pending = self._pending_saves.get(tab_name)
+        if pending is not None:
+            return pending
+        stamp = self.storage.stamp()
+        with self._cache_lock:
+            cached = self._tab_cache.get(tab_name)
+        if cached is not None and stamp is not None and cached[0] == stamp:
+            return cached[1]
+        return None
+
+    def _index_recipe(self, product_id, ingredient_ids, recipes_before):
+        """
+        Point the reverse index of one product at its new recipe ingredients
         
-        ing_numbers = []
-        for iid in ingredients_df['Ingredient_ID'].dropna():
-            if isinstance(iid, str) and iid.startswith('ING'):
-                try:
-                    num = int(iid[3:])
-                    ing_numbers.append(num)
-                except:
-                    pass
+        Call with the store write lock held, right after the Recipes write.
+        
+        Args:
+            recipes_before: Recipes frame that was current before the write
+                            (from _current_frame); the index is only carried
+                            over if it was built for that frame
+        """
+        with self._cache_lock:
+            entry = self._recipe_index
+            self._recipe_index = None
+            if entry is None or recipes_before is None or entry[0] is not recipes_before:
+                return
+            recipe_index = entry[1]
+            for ingredient_id in list(recipe_index):
+                products = recipe_index[ingredient_id]
+                products.discard(product_id)
+                if not products:
+                    del recipe_index[ingredient_id]
+            for ingredient_id in ingredient_ids:
+                recipe_index.setdefault(ingredient_id, set()).add(product_id)
         
-        next_num = max(ing_numbers) + 1 if ing_numbers else 1
-        return f"ING{next_num:03d}"
+        recipes_df = self._cached_tab('Recipes')
+        with self._cache_lock:
+            if self._recipe_index is None:
+                self._recipe_index = (recipes_df, recipe_index)
+
+    def get_products_using_ingredient(self, ingredient_id):
+        """Get the Product_IDs whose recipes use an ingredient"""
+        recipe_index = self._get_recipe_index()
+        with self._cache_lock:
+            return sorted(recipe_index.get(ingredient_id, set()))
+
+    # ===== INGREDIENT MANAGEMENT =====
+    def generate_ingredient_id(self):
+        """The ID the next added ingredient will get (not reserved; for display)"""
+        return self.peek_id('ING')
 
     def add_ingredient(self, ingredient_data):
-        """Add a new ingredient to the database"""
+        """Add a new ingredient to the database (its Ingredient_ID is assigned here)"""
         try:
-            ingredients_df = self.read_tab('Ingredients')
-            
             # Format all fields properly
             processed_data = {}
             for key, value in ingredient_data.items():
@@ -442,10 +1149,13 @@ class InventoryDB:
             # Add timestamp
             processed_data['Last_Updated'] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
             
-            # Add the ingredient
-            ingredients_df = pd.concat([ingredients_df, pd.DataFrame([processed_data])], ignore_index=True)
+            # Reserve the ID and write the row under one store lock
+            with self._store_write():
+                processed_data['Ingredient_ID'] = self.next_id('ING')
+                saved = self._append_rows('Ingredients', [processed_data])
             
-            if self.save_tab('Ingredients', ingredients_df):
+            # Add the ingredient
+            if saved:
                 print(f"✅ Added ingredient: {processed_data['Ingredient_ID']}")
                 return True, f"Added ingredient: {processed_data['Ingredient_ID']}"
             return False, "Failed to save ingredient"
@@ -457,20 +1167,14 @@ class InventoryDB:
     def update_ingredient(self, ingredient_id, updated_data):
         """Update an existing ingredient in the database"""
         try:
-            ingredients_df = self.read_tab('Ingredients')
-            
-            if ingredients_df.empty or 'Ingredient_ID' not in ingredients_df.columns:
+            ingredient_rows = self._find_rows('Ingredients', 'Ingredient_ID', ingredient_id)
+            if ingredient_rows.empty:
                 return False, f"Ingredient {ingredient_id} not found"
             
-            mask = ingredients_df['Ingredient_ID'] == ingredient_id
-            if not mask.any():
-                return False, f"Ingredient {ingredient_id} not found"
-            
-            idx = ingredients_df[mask].index[0]
-            
             # Update each field with proper type handling
+            values = {}
             for key, value in updated_data.items():
-                if key in ingredients_df.columns:
+                if key in ingredient_rows.columns:
                     # Handle empty/None values first
                     if value == '' or value is None:
                         if key in ['Current_Stock', 'Cost_Per_Unit', 'Min_Stock_Level']:
@@ -489,15 +1193,19 @@ class InventoryDB:
                         except (ValueError, TypeError):
                             value = 0.0
                     
-                    # Update the value - ensure column dtype is correct
-                    ingredients_df.at[idx, key] = value
+                    values[key] = value
             
             # Update timestamp
-            ingredients_df.at[idx, 'Last_Updated'] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+            values['Last_Updated'] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            old_cost = ingredient_rows['Cost_Per_Unit'].iloc[0] if 'Cost_Per_Unit' in ingredient_rows.columns else None
             
             # Save to database
-            if self.save_tab('Ingredients', ingredients_df):
+            if self._update_rows('Ingredients', 'Ingredient_ID', {ingredient_id: values}):
                 print(f"✅ Updated ingredient: {ingredient_id}")
+                # Refresh margins of the products that use this ingredient
+                if 'Cost_Per_Unit' in values and values['Cost_Per_Unit'] != old_cost:
+                    self.update_product_costs(self.get_products_using_ingredient(ingredient_id))
                 return True, f"Updated ingredient: {ingredient_id}"
             return False, "Failed to save changes"
             
@@ -505,29 +1213,64 @@ class InventoryDB:
             print(f"❌ Error updating ingredient: {e}")
             return False, f"Error updating ingredient: {str(e)}"
 
-    def update_ingredient_stock(self, ingredient_id, new_stock, operation="set", amount=0, reason=""):
-        """Update ingredient stock with tracking"""
+    def update_ingredient_prices(self, prices):
+        """
+        Update the Cost_Per_Unit of many ingredients in one write
+
+        Args:
+            prices: Dictionary of {ingredient_id: cost_per_unit}
+
+        Returns:
+            Tuple: (success, message)
+        """
         try:
             ingredients_df = self.read_tab('Ingredients')
+            known = set(ingredients_df['Ingredient_ID']) if 'Ingredient_ID' in ingredients_df.columns else set()
+            unknown = [ingredient_id for ingredient_id in prices if ingredient_id not in known]
+            if unknown:
+                return False, f"Ingredients not found: {', '.join(map(str, unknown))}"
+            
+            timestamp = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+            updates = {ingredient_id: {'Cost_Per_Unit': float(price), 'Last_Updated': timestamp}
+                       for ingredient_id, price in prices.items()}
+            if not self._update_rows('Ingredients', 'Ingredient_ID', updates):
+                return False, "Failed to save changes"
+            
+            # Recompute only the products that use a repriced ingredient
+            affected = set()
+            for ingredient_id in prices:
+                affected.update(self.get_products_using_ingredient(ingredient_id))
+            self.update_product_costs(affected)
+            
+            print(f"✅ Updated prices for {len(prices)} ingredients")
+            return True, f"Updated {len(prices)} prices, {len(affected)} products recosted"
             
-            mask = ingredients_df['Ingredient_ID'] == ingredient_id
-            if not mask.any():
+        except Exception as e:
+            print(f"❌ Error updating ingredient prices: {e}")
+            return False, f"Error updating ingredient prices: {str(e)}"
+
+    def update_ingredient_stock(self, ingredient_id, new_stock, operation="set", amount=0, reason=""):
+        """Update ingredient stock with tracking"""
+        try:
+            ingredient_rows = self._find_rows('Ingredients', 'Ingredient_ID', ingredient_id)
+            if ingredient_rows.empty:
                 return False, f"Ingredient {ingredient_id} not found"
             
-            idx = ingredients_df[mask].index[0]
-            
             # Get current stock
-            current_stock = float(ingredients_df.at[idx, 'Current_Stock']) if pd.notna(ingredients_df.at[idx, 'Current_Stock']) else 0.0
+            stock_value = ingredient_rows['Current_Stock'].iloc[0]
+            current_stock = float(stock_value) if pd.notna(stock_value) else 0.0
             
             # Ensure new_stock is a float
             new_stock = float(new_stock)
             
             # Update stock
-            ingredients_df.at[idx, 'Current_Stock'] = new_stock
-            ingredients_df.at[idx, 'Last_Updated'] = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+            values = {
+                'Current_Stock': new_stock,
+                'Last_Updated': pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
             
             # Save changes
-            if self.save_tab('Ingredients', ingredients_df):
+            if self._update_rows('Ingredients', 'Ingredient_ID', {ingredient_id: values}):
                 # Log the change
                 self.log_stock_change(ingredient_id, current_stock, new_stock, operation, amount, reason)
                 return True, f"Updated stock for {ingredient_id}: {current_stock} → {new_stock}"
@@ -540,8 +1283,6 @@ class InventoryDB:
     def log_stock_change(self, ingredient_id, old_stock, new_stock, operation, amount, reason):
         """Log stock changes to Inventory_Log"""
         try:
-            logs_df = self.read_tab('Inventory_Log')
-            
             change_type = "STOCK_UPDATE"
             if operation == "add":
                 change_type = "STOCK_ADD"
@@ -549,7 +1290,7 @@ class InventoryDB:
                 change_type = "STOCK_REMOVE"
             
             new_log = {
-                'Log_ID': f"LOG{len(logs_df) + 1:06d}",
+                'Log_ID': self.next_id('LOG'),
                 'Ingredient_ID': ingredient_id,
                 'Change_Type': change_type,
                 'Quantity': new_stock - old_stock,
@@ -557,8 +1298,7 @@ class InventoryDB:
                 'Notes': f"{reason} (Operation: {operation}, Amount: {amount})"
             }
             
-            logs_df = pd.concat([logs_df, pd.DataFrame([new_log])], ignore_index=True)
-            self.save_tab('Inventory_Log', logs_df)
+            self._append_rows('Inventory_Log', [new_log])
             print(f"📝 Logged stock change for {ingredient_id}")
             
         except Exception as e:
@@ -567,29 +1307,19 @@ class InventoryDB:
     def delete_ingredient(self, ingredient_id):
         """Delete an ingredient"""
         try:
-            ingredients_df = self.read_tab('Ingredients')
-            
-            if ingredients_df.empty or 'Ingredient_ID' not in ingredients_df.columns:
-                return False, f"Ingredient {ingredient_id} not found"
-            
-            initial_count = len(ingredients_df)
-            ingredients_df = ingredients_df[ingredients_df['Ingredient_ID'] != ingredient_id]
-            
-            if len(ingredients_df) == initial_count:
+            if self._find_rows('Ingredients', 'Ingredient_ID', ingredient_id).empty:
                 return False, f"Ingredient {ingredient_id} not found"
             
             # Check if ingredient is used in recipes
-            recipes_df = self.read_tab('Recipes')
-            if not recipes_df.empty and 'Ingredient_ID' in recipes_df.columns:
-                used_in = recipes_df[recipes_df['Ingredient_ID'] == ingredient_id]
-                if not used_in.empty:
-                    product_ids = used_in['Product_ID'].unique()[:3]  # Show first 3
-                    product_list = ", ".join(product_ids)
-                    if len(used_in['Product_ID'].unique()) > 3:
-                        product_list += f" and {len(used_in['Product_ID'].unique()) - 3} more..."
-                    return False, f"Cannot delete! Used in recipes for: {product_list}"
-            
-            if self.save_tab('Ingredients', ingredients_df):
+            used_in = self._find_rows('Recipes', 'Ingredient_ID', ingredient_id)
+            if not used_in.empty:
+                product_ids = used_in['Product_ID'].unique()[:3]  # Show first 3
+                product_list = ", ".join(product_ids)
+                if len(used_in['Product_ID'].unique()) > 3:
+                    product_list += f" and {len(used_in['Product_ID'].unique()) - 3} more..."
+                return False, f"Cannot delete! Used in recipes for: {product_list}"
+            
+            if self._delete_rows('Ingredients', 'Ingredient_ID', ingredient_id):
                 print(f"✅ Deleted ingredient: {ingredient_id}")
                 return True, f"Ingredient {ingredient_id} deleted"
             return False, "Failed to save changes"
@@ -632,6 +1362,23 @@ class InventoryDB:
         active_products = products_df[products_df['Active'].astype(str).str.upper() == 'YES']
         return active_products
 
+    def get_product_search_index(self):
+        """Get the search index of the active products, rebuilt whenever the Products tab changes"""
+        products_df = self._cached_tab('Products')
+        with self._cache_lock:
+            product_search = self._product_search
+        if product_search is not None and product_search[0] is products_df:
+            return product_search[1]
+        
+        if products_df.empty or 'Active' not in products_df.columns:
+            active_products = pd.DataFrame()
+        else:
+            active_products = products_df[products_df['Active'].astype(str).str.upper() == 'YES']
+        search_index = ProductSearchIndex(active_products)
+        with self._cache_lock:
+            self._product_search = (products_df, search_index)
+        return search_index
+
     def get_all_ingredients(self):
         """Get all ingredients"""
         return self.read_tab('Ingredients')
@@ -640,10 +1387,8 @@ class InventoryDB:
     def add_sale(self, product_id, quantity, unit_price):
         """Record a new sale"""
         try:
-            sales_df = self.read_tab('Sales')
-            
             new_sale = {
-                'Sale_ID': f"SALE{len(sales_df) + 1:04d}",
+                'Sale_ID': self.next_id('SALE'),
                 'Product_ID': product_id,
                 'Quantity': quantity,
                 'Sale_Date': datetime.now().strftime("%Y-%m-%d"),
@@ -651,9 +1396,11 @@ class InventoryDB:
                 'Total_Amount': quantity * unit_price
             }
             
-            sales_df = pd.concat([sales_df, pd.DataFrame([new_sale])], ignore_index=True)
-            
-            if self.save_tab('Sales', sales_df):
+            with self._store_write():
+                rollup_rows, rollup_updates = self._sales_rollup_changes([new_sale])
+                saved = self._commit(appends={'Sales': [new_sale], 'Sales_Daily': rollup_rows},
+                                     updates={'Sales_Daily': rollup_updates})
+            if saved:
                 print(f"💰 Recorded sale: {quantity} x {product_id}")
                 return new_sale
             return None
@@ -662,6 +1409,115 @@ class InventoryDB:
             print(f"❌ Error recording sale: {e}")
             return None
 
+    def process_checkout(self, cart_items):
+        """
+        Record a whole cart as one transaction
+
+        Stock is checked against the combined needs of the cart before anything
+        is written; the Sales rows, ingredient deductions and Inventory_Log rows
+        are then committed together, so a failure leaves no partial sale behind.
+
+        Args:
+            cart_items: List of dictionaries with product_id, quantity and unit_price
+
+        Returns:
+            Tuple: (success, message, list of recorded sale dictionaries)
+        """
+        try:
+            if not cart_items:
+                return False, "Cart is empty", []
+            
+            # Stock is checked and deducted under one lock, so another terminal
+            # cannot sell the same stock in between
+            with self._store_write():
+                recipes_df = self._cached_tab('Recipes')
+                inventory_df, ingredient_index = self._read_indexed('Ingredients')
+                if inventory_df.empty:
+                    return False, "No ingredients in inventory", []
+                
+                # Recipe lines of every product in the cart, found in one pass
+                recipes = {}
+                if not recipes_df.empty and 'Product_ID' in recipes_df.columns:
+                    cart_products = {item['product_id'] for item in cart_items}
+                    cart_recipes = recipes_df[recipes_df['Product_ID'].isin(cart_products)]
+                    recipes = dict(tuple(cart_recipes.groupby('Product_ID', sort=False)))
+                
+                # Ingredient needs per cart line and for the cart as a whole
+                line_deductions = []
+                total_needed = {}
+                errors = []
+                for item in cart_items:
+                    recipe = recipes.get(item['product_id'])
+                    if recipe is None or recipe.empty:
+                        errors.append(f"No recipe found for product {item['product_id']}")
+                        line_deductions.append([])
+                        continue
+                    
+                    deductions = []
+                    for ingredient_id, quantity_required in zip(recipe['Ingredient_ID'],
+                                                                recipe['Quantity_Required']):
+                        amount = quantity_required * item['quantity']
+                        deductions.append((ingredient_id, amount))
+                        total_needed[ingredient_id] = total_needed.get(ingredient_id, 0) + amount
+                    line_deductions.append(deductions)
+                
+                current_stock = {}
+                for ingredient_id, needed in total_needed.items():
+                    position = self._locate(inventory_df, ingredient_index, 'Ingredient_ID', ingredient_id)
+                    if position is None:
+                        errors.append(f"{ingredient_id}: not in inventory")
+                        continue
+                    current_stock[ingredient_id] = inventory_df['Current_Stock'].iat[position]
+                    if current_stock[ingredient_id] < needed:
+                        name = inventory_df['Ingredient_Name'].iat[position]
+                        errors.append(f"{name}: need {needed}, have {current_stock[ingredient_id]}")
+                
+                if errors:
+                    return False, "\n".join(errors), []
+                
+                # Build every row of the transaction
+                sale_date = datetime.now().strftime("%Y-%m-%d")
+                sale_time = datetime.now().strftime("%H:%M:%S")
+                sale_ids = self.reserve_ids('SALE', len(cart_items))
+                log_ids = self.reserve_ids('LOG', sum(len(deductions) for deductions in line_deductions))
+                
+                new_sales = []
+                new_logs = []
+                for item, deductions in zip(cart_items, line_deductions):
+                    new_sales.append({
+                        'Sale_ID': sale_ids[len(new_sales)],
+                        'Product_ID': item['product_id'],
+                        'Quantity': item['quantity'],
+                        'Sale_Date': sale_date,
+                        'Sale_Time': sale_time,
+                        'Total_Amount': item['quantity'] * item['unit_price']
+                    })
+                    for ingredient_id, amount in deductions:
+                        new_logs.append({
+                            'Log_ID': log_ids[len(new_logs)],
+                            'Ingredient_ID': ingredient_id,
+                            'Change_Type': 'SALE_DEDUCTION',
+                            'Quantity': -amount,
+                            'Date': sale_date,
+                            'Notes': f"Product {item['product_id']} x{item['quantity']}"
+                        })
+                
+                stock_updates = {ingredient_id: {'Current_Stock': current_stock[ingredient_id] - needed}
+                                 for ingredient_id, needed in total_needed.items()}
+                
+                rollup_rows, rollup_updates = self._sales_rollup_changes(new_sales)
+                saved = self._commit(
+                    appends={'Sales': new_sales, 'Inventory_Log': new_logs, 'Sales_Daily': rollup_rows},
+                    updates={'Ingredients': stock_updates, 'Sales_Daily': rollup_updates})
+                if not saved:
+                    return False, "Failed to save the sale", []
+            
+            print(f"💰 Recorded checkout: {len(new_sales)} items, {len(stock_updates)} ingredients deducted")
+            return True, f"Recorded {len(new_sales)} sales", new_sales
+            
+        except Exception as e:
+            return False, f"Error processing checkout: {str(e)}", []
+
     def update_inventory_from_sale(self, product_id, quantity_sold):
         """Deduct ingredients from inventory when a product is sold"""
         try:
@@ -671,56 +1527,55 @@ class InventoryDB:
             if recipe_items.empty:
                 return False, f"No recipe found for product {product_id}"
             
-            # Get current inventory
-            inventory_df = self.read_tab('Ingredients')
-            if inventory_df.empty:
-                return False, "No ingredients in inventory"
-            
-            # Check stock and prepare deductions
-            deductions = []
-            insufficient_stock = []
-            
-            for _, recipe_item in recipe_items.iterrows():
-                ingredient_id = recipe_item['Ingredient_ID']
-                quantity_needed = recipe_item['Quantity_Required']
-                total_needed = quantity_needed * quantity_sold
+            with self._store_write():
+                # Get current inventory
+                inventory_df, ingredient_index = self._read_indexed('Ingredients')
+                if inventory_df.empty:
+                    return False, "No ingredients in inventory"
                 
-                # Find ingredient
-                ingredient_idx = inventory_df[inventory_df['Ingredient_ID'] == ingredient_id].index
-                if len(ingredient_idx) == 0:
-                    insufficient_stock.append(f"{recipe_item.get('Ingredient_Name', ingredient_id)}: not in inventory")
-                    continue
+                # Check stock and prepare deductions
+                deductions = []
+                insufficient_stock = []
                 
-                idx = ingredient_idx[0]
-                current_stock = inventory_df.at[idx, 'Current_Stock']
+                for _, recipe_item in recipe_items.iterrows():
+                    ingredient_id = recipe_item['Ingredient_ID']
+                    quantity_needed = recipe_item['Quantity_Required']
+                    total_needed = quantity_needed * quantity_sold
+                    
+                    # Find ingredient
+                    idx = self._locate(inventory_df, ingredient_index, 'Ingredient_ID', ingredient_id)
+                    if idx is None:
+                        insufficient_stock.append(f"{recipe_item.get('Ingredient_Name', ingredient_id)}: not in inventory")
+                        continue
+                    
+                    current_stock = inventory_df['Current_Stock'].iat[idx]
+                    
+                    if current_stock < total_needed:
+                        insufficient_stock.append(
+                            f"{recipe_item.get('Ingredient_Name', ingredient_id)}: "
+                            f"need {total_needed}, have {current_stock}"
+                        )
+                    else:
+                        deductions.append({
+                            'ingredient_id': ingredient_id,
+                            'ingredient_name': recipe_item.get('Ingredient_Name', ingredient_id),
+                            'deduction': total_needed,
+                            'old_stock': current_stock,
+                            'new_stock': current_stock - total_needed,
+                            'index': idx
+                        })
                 
-                if current_stock < total_needed:
-                    insufficient_stock.append(
-                        f"{recipe_item.get('Ingredient_Name', ingredient_id)}: "
-                        f"need {total_needed}, have {current_stock}"
-                    )
-                else:
-                    deductions.append({
-                        'ingredient_id': ingredient_id,
-                        'ingredient_name': recipe_item.get('Ingredient_Name', ingredient_id),
-                        'deduction': total_needed,
-                        'old_stock': current_stock,
-                        'new_stock': current_stock - total_needed,
-                        'index': idx
-                    })
-            
-            # Check if we can proceed
-            if insufficient_stock:
-                return False, f"Insufficient stock:\n" + "\n".join(insufficient_stock)
-            
-            # Apply deductions
-            for deduction in deductions:
-                idx = deduction['index']
-                inventory_df.at[idx, 'Current_Stock'] = deduction['new_stock']
-            
-            # Save inventory
-            if not self.save_tab('Ingredients', inventory_df):
-                return False, "Failed to save inventory changes"
+                # Check if we can proceed
+                if insufficient_stock:
+                    return False, f"Insufficient stock:\n" + "\n".join(insufficient_stock)
+                
+                # Apply deductions
+                stock_updates = {deduction['ingredient_id']: {'Current_Stock': deduction['new_stock']}
+                                 for deduction in deductions}
+                
+                # Save inventory
+                if not self._update_rows('Ingredients', 'Ingredient_ID', stock_updates):
+                    return False, "Failed to save inventory changes"
             
             # Log the inventory change
             self.log_inventory_change(product_id, quantity_sold, deductions)
@@ -734,49 +1589,159 @@ class InventoryDB:
     def log_inventory_change(self, product_id, quantity_sold, deductions):
         """Log inventory changes to Inventory_Log tab"""
         try:
-            logs_df = self.read_tab('Inventory_Log')
+            log_ids = self.reserve_ids('LOG', len(deductions))
             
+            new_logs = []
             for deduction in deductions:
                 new_log = {
-                    'Log_ID': f"LOG{len(logs_df) + 1:06d}",
+                    'Log_ID': log_ids[len(new_logs)],
                     'Ingredient_ID': deduction['ingredient_id'],
                     'Change_Type': 'SALE_DEDUCTION',
                     'Quantity': -deduction['deduction'],
                     'Date': datetime.now().strftime("%Y-%m-%d"),
                     'Notes': f"Product {product_id} x{quantity_sold}"
                 }
-                logs_df = pd.concat([logs_df, pd.DataFrame([new_log])], ignore_index=True)
+                new_logs.append(new_log)
             
-            self.save_tab('Inventory_Log', logs_df)
+            self._append_rows('Inventory_Log', new_logs)
             print(f"📝 Logged inventory change for {product_id}")
             
         except Exception as e:
             print(f"⚠️ Failed to log inventory change: {e}")
 
+    # ===== SALES ROLLUP =====
+    # Sales_Daily holds one row per (date, product) with quantity, revenue and
+    # number of sales. Sales are added to it in the same commit that records
+    # them, so dashboards and reports read it instead of scanning Sales.
+    def get_sales_rollup(self, start_date=None, end_date=None):
+        """
+        Get daily per-product sales totals
+
+        Args:
+            start_date: First day to include (date, datetime or 'YYYY-MM-DD')
+            end_date: Last day to include
+
+        Returns:
+            DataFrame of Sales_Daily rows (Sale_Date, Product_ID, Quantity,
+            Total_Amount, Transactions)
+        """
+        rollup_df = self.read_tab('Sales_Daily')
+        if rollup_df.empty or 'Sale_Date' not in rollup_df.columns:
+            return empty_tab('Sales_Daily')
+        
+        # Rollup dates are 'YYYY-MM-DD' text, so they compare in date order
+        if start_date is not None:
+            rollup_df = rollup_df[rollup_df['Sale_Date'] >= pd.Timestamp(start_date).strftime("%Y-%m-%d")]
+        if end_date is not None:
+            rollup_df = rollup_df[rollup_df['Sale_Date'] <= pd.Timestamp(end_date).strftime("%Y-%m-%d")]
+        return rollup_df
+
+    def rebuild_sales_rollup(self):
+        """Regenerate Sales_Daily from the full (live and archived) sales history; returns the row count"""
+        sales_df = self._with_archived_rows('Sales', self.read_tab('Sales'), None, None)
+        rollup_df = build_sales_rollup(sales_df)
+        if not self.save_tab('Sales_Daily', rollup_df):
+            return None
+        print(f"📊 Rebuilt sales rollup: {len(rollup_df)} daily rows")
+        return len(rollup_df)
+
+    def _sales_rollup_changes(self, new_sales):
+        """
+        Rollup rows to add and update for new sales (call with the write lock held)
+
+        Returns:
+            Tuple: (list of new Sales_Daily rows, {Rollup_Key: {column: new total}})
+        """
+        totals = {}
+        for sale in new_sales:
+            key = rollup_key(sale['Sale_Date'], sale['Product_ID'])
+            total = totals.setdefault(key, {'Sale_Date': sale['Sale_Date'],
+                                            'Product_ID': sale['Product_ID'],
+                                            'Quantity': 0.0, 'Total_Amount': 0.0,
+                                            'Transactions': 0.0})
+            total['Quantity'] += float(sale['Quantity'])
+            total['Total_Amount'] += float(sale['Total_Amount'])
+            total['Transactions'] += 1
+        
+        rollup_df, key_index = self._read_indexed('Sales_Daily')
+        new_rows = []
+        updates = {}
+        for key, total in totals.items():
+            position = None
+            if not rollup_df.empty and 'Rollup_Key' in rollup_df.columns:
+                position = self._locate(rollup_df, key_index, 'Rollup_Key', key)
+            if position is None:
+                new_rows.append({'Rollup_Key': key, **total})
+                continue
+            updates[key] = {column: float(rollup_df[column].iat[position]) + total[column]
+                            for column in ('Quantity', 'Total_Amount', 'Transactions')}
+        return new_rows, updates
+
+    # ===== ARCHIVE =====
+    def archive_history(self, before_date):
+        """
+        Move Sales, Inventory_Log and Expenses rows dated before a day to the archive
+        
+        Sales_Daily keeps the per-product daily totals of the archived days,
+        and read_range still returns archived rows, so reports are unchanged.
+        
+        Args:
+            before_date: Rows dated before this day are archived
+        
+        Returns:
+            Dictionary of {tab_name: rows archived}, or None if saving failed
+        """
+        last_day = to_day(before_date) - timedelta(days=1)
+        archived = {}
+        try:
+            with self._store_write():
+                for tab_name in ARCHIVED_TABS:
+                    tab_df = self.read_tab(tab_name)
+                    date_column = PARTITIONED_TABS[tab_name]
+                    if tab_df.empty or date_column not in tab_df.columns:
+                        archived[tab_name] = 0
+                        continue
+                    
+                    old_rows = range_mask(tab_df[date_column], end=last_day).to_numpy()
+                    archived[tab_name] = int(old_rows.sum())
+                    if not archived[tab_name]:
+                        continue
+                    # Write the archive first, so rows are never in neither place
+                    self.archive.add(tab_name, tab_df[old_rows], date_column)
+                    if not self.save_tab(tab_name, tab_df[~old_rows].reset_index(drop=True)):
+                        self.archive.remove(tab_name, tab_df.loc[old_rows, TAB_KEYS[tab_name]])
+                        return None
+                    self._keep_sequences_past(tab_name, tab_df.loc[old_rows, TAB_KEYS[tab_name]])
+        except TimeoutError as e:
+            print(f"❌ Archiving failed: {e}")
+            return None
+        
+        print(f"🗄️ Archived rows dated before {to_day(before_date):%Y-%m-%d}: "
+              + ", ".join(f"{tab_name} {count}" for tab_name, count in archived.items()))
+        return archived
+
+    def _keep_sequences_past(self, tab_name, archived_ids):
+        """Raise the ID counters of a tab past its archived IDs, so they are never handed out again"""
+        for prefix, (sequence_tab, _, _) in SEQUENCES.items():
+            if sequence_tab == tab_name:
+                highest = max_id_number(archived_ids, prefix)
+                if self.storage.sequence_value(prefix) is None:
+                    # Unseeded counter: seed it from the live rows too
+                    highest = max(highest, self._highest_id_number(prefix))
+                if highest:
+                    # Reserving no numbers only lifts the counter to the floor
+                    self.storage.reserve_sequence(prefix, 0, highest)
+
     # ===== EXPENSE MANAGEMENT =====
     def add_expense(self, expense_data):
         """Add a new expense record"""
         try:
-            expenses_df = self.read_tab('Expenses')
-            
             # Generate expense ID
-            exp_numbers = []
-            for exp_id in expenses_df['Expense_ID'].dropna():
-                if isinstance(exp_id, str) and exp_id.startswith('EXP'):
-                    try:
-                        num = int(exp_id[3:])
-                        exp_numbers.append(num)
-                    except:
-                        pass
-            
-            next_num = max(exp_numbers) + 1 if exp_numbers else 1
-            expense_id = f"EXP{next_num:04d}"
+            expense_id = self.next_id('EXP')
             expense_data['Expense_ID'] = expense_id
             
             # Add expense
-            expenses_df = pd.concat([expenses_df, pd.DataFrame([expense_data])], ignore_index=True)
-            
-            if self.save_tab('Expenses', expenses_df):
+            if self._append_rows('Expenses', [expense_data]):
                 print(f"✅ Added expense: {expense_data['Description']}")
                 return True, f"Expense added (ID: {expense_id})"
             return False, "Failed to save expense"
@@ -788,7 +1753,7 @@ class InventoryDB:
     def get_expenses(self, start_date=None, end_date=None):
         """Get expenses with optional date filtering"""
         try:
-            expenses_df = self.read_tab('Expenses')
+            expenses_df = self.read_range('Expenses', start_date, end_date)
             
             if expenses_df.empty or 'Expense_Date' not in expenses_df.columns:
                 return pd.DataFrame()
@@ -815,7 +1780,12 @@ class InventoryDB:
     def get_expense_summary(self, month=None, year=None):
         """Get expense summary by category"""
         try:
-            expenses_df = self.read_tab('Expenses')
+            # Only the months of the requested period (archived ones included)
+            start_date = end_date = None
+            if year:
+                start_date = datetime(year, month or 1, 1)
+                end_date = datetime(year, month or 12, 1) + pd.offsets.MonthEnd(0)
+            expenses_df = self.read_range('Expenses', start_date, end_date)
             
             if expenses_df.empty:
                 return pd.DataFrame()
@@ -852,15 +1822,12 @@ class InventoryDB:
     def delete_expense(self, expense_id):
         """Delete an expense record"""
         try:
-            expenses_df = self.read_tab('Expenses')
-            
-            initial_count = len(expenses_df)
-            expenses_df = expenses_df[expenses_df['Expense_ID'] != expense_id]
+            deleted = self._delete_rows('Expenses', 'Expense_ID', expense_id)
             
-            if len(expenses_df) == initial_count:
+            if deleted == 0:
                 return False, f"Expense {expense_id} not found"
             
-            if self.save_tab('Expenses', expenses_df):
+            if deleted:
                 print(f"✅ Deleted expense: {expense_id}")
                 return True, f"Expense {expense_id} deleted"
             return False, "Failed to save changes"
@@ -873,27 +1840,25 @@ class InventoryDB:
     def save_recipe(self, product_id, recipe_items):
         """Save or update a recipe"""
         try:
-            recipes_df = self.read_tab('Recipes')
-            
-            # Remove existing recipe for this product
-            if not recipes_df.empty and 'Product_ID' in recipes_df.columns:
-                recipes_df = recipes_df[recipes_df['Product_ID'] != product_id]
-            
-            # Add new recipe items
+            # New recipe items replace the existing recipe for this product
+            recipe_ids = self.reserve_ids('REC', len(recipe_items))
             new_records = []
             for idx, item in enumerate(recipe_items):
                 new_records.append({
-                    'Recipe_ID': f"{product_id}-REC{idx+1:03d}",
+                    'Recipe_ID': f"{product_id}-{recipe_ids[idx]}",
                     'Product_ID': product_id,
                     'Ingredient_ID': item['ingredient_id'],
                     'Quantity_Required': item['quantity']
                 })
             
-            # Add to dataframe
-            new_df = pd.DataFrame(new_records)
-            recipes_df = pd.concat([recipes_df, new_df], ignore_index=True)
+            with self._store_write():
+                recipes_before = self._current_frame('Recipes')
+                saved = self._replace_rows('Recipes', 'Product_ID', product_id, new_records)
+                if saved:
+                    self._index_recipe(product_id, [record['Ingredient_ID'] for record in new_records],
+                                       recipes_before)
             
-            if self.save_tab('Recipes', recipes_df):
+            if saved:
                 print(f"✅ Saved recipe for {product_id}")
                 return True
             return False
@@ -906,29 +1871,25 @@ class InventoryDB:
     def add_inventory_stock(self, ingredient_id, quantity_to_add, notes=""):
         """Add stock to an ingredient (purchase/replenishment)"""
         try:
-            inventory_df = self.read_tab('Ingredients')
-            
-            if inventory_df.empty or 'Ingredient_ID' not in inventory_df.columns:
-                return False, "No ingredients found"
-            
-            ingredient_idx = inventory_df[inventory_df['Ingredient_ID'] == ingredient_id].index
-            if len(ingredient_idx) == 0:
-                return False, f"Ingredient {ingredient_id} not found"
-            
-            idx = ingredient_idx[0]
-            old_stock = inventory_df.at[idx, 'Current_Stock']
-            new_stock = old_stock + quantity_to_add
-            
-            # Update stock
-            inventory_df.at[idx, 'Current_Stock'] = new_stock
-            
-            if self.save_tab('Ingredients', inventory_df):
-                # Log the addition
-                self.log_stock_change(ingredient_id, old_stock, new_stock, "add", quantity_to_add, notes)
-                ingredient_name = inventory_df.at[idx, 'Ingredient_Name']
-                print(f"📦 Added {quantity_to_add} to {ingredient_name}")
-                return True, f"Added {quantity_to_add} to {ingredient_name}"
-            return False, "Failed to save stock update"
+            with self._store_write():
+                ingredient_rows = self._find_rows('Ingredients', 'Ingredient_ID', ingredient_id)
+                if ingredient_rows.empty:
+                    return False, f"Ingredient {ingredient_id} not found"
+                
+                ingredient = ingredient_rows.iloc[0]
+                old_stock = ingredient['Current_Stock']
+                new_stock = old_stock + quantity_to_add
+                
+                # Update stock
+                stock_update = {ingredient_id: {'Current_Stock': new_stock}}
+                
+                if self._update_rows('Ingredients', 'Ingredient_ID', stock_update):
+                    # Log the addition
+                    self.log_stock_change(ingredient_id, old_stock, new_stock, "add", quantity_to_add, notes)
+                    ingredient_name = ingredient['Ingredient_Name']
+                    print(f"📦 Added {quantity_to_add} to {ingredient_name}")
+                    return True, f"Added {quantity_to_add} to {ingredient_name}"
+                return False, "Failed to save stock update"
             
         except Exception as e:
             print(f"❌ Error adding stock: {e}")
@@ -936,15 +1897,20 @@ class InventoryDB:
 
     def get_inventory_logs(self, days_back=30):
         """Get recent inventory logs"""
-        logs_df = self.read_tab('Inventory_Log')
+        cutoff_date = datetime.now() - timedelta(days=days_back)
+        logs_df = self.read_range('Inventory_Log', cutoff_date)
         
         if logs_df.empty or 'Date' not in logs_df.columns:
             return pd.DataFrame()
         
         try:
             logs_df['Date'] = pd.to_datetime(logs_df['Date'], errors='coerce')
-            cutoff_date = datetime.now() - timedelta(days=days_back)
             recent_logs = logs_df[logs_df['Date'] >= cutoff_date].copy()
             return recent_logs.sort_values('Date', ascending=False)
         except:
-            return logs_df.tail(100)
\ No newline at end of file
+            return logs_df.tail(100)
+
+
+# Diagnostics getters stay untimed so opening the diagnostics panel does not show up in it
+instrument(InventoryDB, exclude=('get_metrics', 'reset_metrics', 'get_cache_stats',
+                                 'get_write_stats', 'get_lock_stats'))
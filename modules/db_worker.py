@@ -0,0 +1,154 @@
+# modules/db_worker.py - Run InventoryDB calls off the Tk main thread
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_save(gui, on_done, func, *args):
+    """
+    Run an InventoryDB write for a GUI screen, in the background when it has an AsyncDB
+
+    The screen provides db, async_db and save_in_progress; further saves
+    from it are ignored until on_done has run.
+
+    Args:
+        gui: Screen object starting the save
+        on_done: Called on the main thread with the method's (success, message)
+        func: Name of an InventoryDB method, or a callable returning (success, message)
+    """
+    if gui.save_in_progress:
+        return
+    if isinstance(func, str):
+        func = getattr(gui.db, func)
+    if gui.async_db is None:
+        try:
+            result = func(*args)
+        except Exception as e:
+            result = (False, str(e))
+        on_done(result)
+        return
+
+    gui.save_in_progress = True
+
+    def finish(result):
+        gui.save_in_progress = False
+        on_done(result)
+
+    gui.async_db.write(func, *args, on_done=finish, on_error=lambda e: finish((False, str(e))))
+
+
+class AsyncDB:
+    """
+    Background facade over InventoryDB for the GUI
+
+    Reads run on a small thread pool; writes go through a single writer
+    thread so they are applied in the order they were submitted. Results
+    are handed back to the Tk main thread by polling with window.after,
+    so callbacks may touch widgets safely.
+
+    Reads may run while the UI thread uses the same InventoryDB; its
+    caches are guarded by a lock and its writes by the write lock.
+    """
+
+    def __init__(self, window, db, readers=2, poll_ms=30):
+        self.window = window
+        self.db = db
+        self.poll_ms = poll_ms
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='db-read')
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-write')
+        self._results = queue.SimpleQueue()
+        self._outstanding = 0
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+        self._polling = False
+        self._closed = False
+
+    # ===== SUBMIT =====
+    def read(self, func, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Run a read in the background
+
+        Args:
+            func: Name of an InventoryDB method, or any callable
+            on_done: Called on the main thread with the result
+            on_error: Called on the main thread with the exception
+
+        Returns:
+            concurrent.futures.Future of the call
+        """
+        return self._submit(self._readers, False, func, args, kwargs, on_done, on_error)
+
+    def write(self, func, *args, on_done=None, on_error=None, **kwargs):
+        """Queue a write; writes run one at a time in submission order"""
+        return self._submit(self._writer, True, func, args, kwargs, on_done, on_error)
+
+    def pending_writes(self):
+        """Number of writes queued or running"""
+        with self._lock:
+            return self._pending_writes
+
+    def _submit(self, executor, is_write, func, args, kwargs, on_done, on_error):
+        if self._closed:
+            raise RuntimeError("AsyncDB has been shut down")
+        if isinstance(func, str):
+            func = getattr(self.db, func)
+
+        with self._lock:
+            self._outstanding += 1
+            if is_write:
+                self._pending_writes += 1
+
+        def run():
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._results.put((on_error, e, True))
+                raise
+            finally:
+                if is_write:
+                    with self._lock:
+                        self._pending_writes -= 1
+            self._results.put((on_done, result, False))
+            return result
+
+        future = executor.submit(run)
+        self._schedule_poll()
+        return future
+
+    # ===== MAIN THREAD DELIVERY =====
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.window.after(self.poll_ms, self._deliver_results)
+
+    def _deliver_results(self):
+        """Run finished callbacks on the Tk thread"""
+        self._polling = False
+        while True:
+            try:
+                callback, value, failed = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._outstanding -= 1
+            if failed and callback is None:
+                print(f"❌ Background database call failed: {value}")
+                continue
+            if callback is None:
+                continue
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"⚠️ Error in database callback: {e}")
+
+        with self._lock:
+            outstanding = self._outstanding
+        if outstanding and not self._closed:
+            self._schedule_poll()
+
+    # ===== SHUTDOWN =====
+    def shutdown(self, wait=True):
+        """Stop accepting work; by default wait for queued writes to finish"""
+        self._closed = True
+        self._readers.shutdown(wait=wait, cancel_futures=True)
+        self._writer.shutdown(wait=wait)
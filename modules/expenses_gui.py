@@ -4,12 +4,17 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime, timedelta
+from modules.virtual_table import VirtualTable
+from modules.db_worker import run_save
 
 class ExpensesGUI:
-    def __init__(self, window, db, config):
+    def __init__(self, window, db, config, async_db=None):
         self.window = window
         self.db = db
         self.config = config
+        # Optional AsyncDB: saves run off the UI thread when available
+        self.async_db = async_db
+        self.save_in_progress = False
         self.main_content = None
     
     def clear_main_content(self):
@@ -207,75 +212,36 @@ class ExpensesGUI:
                         font=("Arial", 14)).pack(pady=50)
             return
         
-        # Create scrollable table
-        scroll_frame = ctk.CTkScrollableFrame(self.expenses_table_frame, width=900, height=400)
-        scroll_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Table headers
-        headers = ["Date", "Expense ID", "Type", "Description", "Category", "Amount", "Payment Method", "Actions"]
-        col_widths = [100, 100, 100, 200, 120, 120, 120, 100]
+        # Table columns (rows are rendered on demand by VirtualTable)
+        currency = self.config['currency']
         
-        for col, (header, width) in enumerate(zip(headers, col_widths)):
-            ctk.CTkLabel(scroll_frame, text=header, font=("Arial", 12, "bold"),
-                        width=width).grid(row=0, column=col, padx=5, pady=5, sticky="w")
-        
-        # Add expense rows
-        total_amount = 0
-        for row_idx, (_, expense) in enumerate(filtered_expenses.iterrows(), start=1):
-            # Date
+        def date_text(expense):
             date_str = expense.get('Expense_Date', '')
             if hasattr(date_str, 'strftime'):
                 date_str = date_str.strftime("%Y-%m-%d")
-            ctk.CTkLabel(scroll_frame, text=str(date_str)[:10], 
-                        width=col_widths[0]).grid(row=row_idx, column=0, padx=5, pady=2, sticky="w")
-            
-            # Expense ID
-            expense_id = expense.get('Expense_ID', '')
-            ctk.CTkLabel(scroll_frame, text=expense_id, 
-                        width=col_widths[1]).grid(row=row_idx, column=1, padx=5, pady=2, sticky="w")
-            
-            # Expense Type
-            expense_type = expense.get('Expense_Type', '')
-            ctk.CTkLabel(scroll_frame, text=expense_type[:15], 
-                        width=col_widths[2]).grid(row=row_idx, column=2, padx=5, pady=2, sticky="w")
-            
-            # Description
-            description = expense.get('Description', '')
-            ctk.CTkLabel(scroll_frame, text=description[:25], 
-                        width=col_widths[3]).grid(row=row_idx, column=3, padx=5, pady=2, sticky="w")
-            
-            # Category
-            category = expense.get('Category', '')
-            ctk.CTkLabel(scroll_frame, text=category[:15], 
-                        width=col_widths[4]).grid(row=row_idx, column=4, padx=5, pady=2, sticky="w")
-            
-            # Amount
-            amount = expense.get('Amount', 0)
-            total_amount += amount
-            ctk.CTkLabel(scroll_frame, text=f"{self.config['currency']}{amount:,.2f}", 
-                        width=col_widths[5], text_color="#e74c3c").grid(row=row_idx, column=5, padx=5, pady=2)
-            
-            # Payment Method
-            payment_method = expense.get('Payment_Method', '')
-            ctk.CTkLabel(scroll_frame, text=payment_method[:15], 
-                        width=col_widths[6]).grid(row=row_idx, column=6, padx=5, pady=2, sticky="w")
-            
-            # Actions
-            action_frame = ctk.CTkFrame(scroll_frame, width=col_widths[7], fg_color="transparent")
-            action_frame.grid(row=row_idx, column=7, padx=5, pady=2)
-            
-            # View button
-            ctk.CTkButton(action_frame, text="👁️ View",
-                         command=lambda eid=expense_id: self.view_expense_details(eid),
-                         width=45, height=25,
-                         font=("Arial", 10)).pack(side="left", padx=2)
-            
-            # Delete button
-            ctk.CTkButton(action_frame, text="🗑️",
-                         command=lambda eid=expense_id: self.delete_expense_confirmation(eid),
-                         width=30, height=25,
-                         fg_color="#e74c3c", hover_color="#c0392b",
-                         font=("Arial", 10)).pack(side="left", padx=2)
+            return str(date_str)[:10]
+        
+        columns = [
+            {'header': "Date", 'width': 100, 'value': date_text},
+            {'header': "Expense ID", 'width': 100, 'value': 'Expense_ID'},
+            {'header': "Type", 'width': 100, 'value': 'Expense_Type', 'max_chars': 15},
+            {'header': "Description", 'width': 200, 'value': 'Description', 'max_chars': 25},
+            {'header': "Category", 'width': 120, 'value': 'Category', 'max_chars': 15},
+            {'header': "Amount", 'width': 120, 'anchor': "center", 'text_color': "#e74c3c",
+             'value': lambda expense: f"{currency}{expense.get('Amount', 0):,.2f}"},
+            {'header': "Payment Method", 'width': 120, 'value': 'Payment_Method', 'max_chars': 15},
+            {'header': "Actions", 'width': 100, 'buttons': [
+                {'text': "👁️ View", 'width': 45,
+                 'command': lambda expense: self.view_expense_details(expense.get('Expense_ID', ''))},
+                {'text': "🗑️", 'width': 30, 'fg_color': "#e74c3c", 'hover_color': "#c0392b",
+                 'command': lambda expense: self.delete_expense_confirmation(expense.get('Expense_ID', ''))}
+            ]}
+        ]
+        
+        table = VirtualTable(self.expenses_table_frame, columns, filtered_expenses, height=400)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        total_amount = filtered_expenses['Amount'].sum() if 'Amount' in filtered_expenses.columns else 0
         
         # Summary
         summary_frame = ctk.CTkFrame(parent_frame)
@@ -449,20 +415,26 @@ class ExpensesGUI:
                                      "This action cannot be undone.")
         
         if confirm:
-            success, message = self.db.delete_expense(expense_id)
-            
-            if success:
-                messagebox.showinfo("Success", message)
-                # AUTO-REFRESH: Refresh all expense tabs
-                # Refresh View Expenses tab
-                if hasattr(self, 'view_expenses_frame'):
-                    self.refresh_expenses_table(self.view_expenses_frame)
-                
-                # Refresh Expense Reports tab
-                if hasattr(self, 'reports_expense_frame'):
-                    self.refresh_expense_reports(self.reports_expense_frame)
-            else:
-                messagebox.showerror("Error", message)
+            run_save(self, self.finish_delete_expense, 'delete_expense', expense_id)
+    
+    def finish_delete_expense(self, result):
+        """Show the outcome of deleting an expense"""
+        success, message = result
+        if success:
+            messagebox.showinfo("Success", message)
+            self.refresh_expense_tabs()
+        else:
+            messagebox.showerror("Error", message)
+    
+    def refresh_expense_tabs(self):
+        """Refresh the expense list and reports if they are on screen"""
+        # Refresh View Expenses tab
+        if hasattr(self, 'view_expenses_frame') and self.view_expenses_frame.winfo_exists():
+            self.refresh_expenses_table(self.view_expenses_frame)
+        
+        # Refresh Expense Reports tab
+        if hasattr(self, 'reports_expense_frame') and self.reports_expense_frame.winfo_exists():
+            self.refresh_expense_reports(self.reports_expense_frame)
     
     def create_expense_form(self, parent_frame):
         """Form to add new expense"""
@@ -474,26 +446,7 @@ class ExpensesGUI:
         form_frame.pack(pady=20, padx=50, fill="x")
         
         # Auto-generate expense ID
-        expenses_df = self.db.get_expenses()
-        if expenses_df.empty:
-            new_id = "EXP0001"
-        else:
-            # Find highest EXP number
-            exp_numbers = []
-            for exp_id in expenses_df['Expense_ID'].dropna():
-                if isinstance(exp_id, str) and exp_id.startswith('EXP'):
-                    try:
-                        num = int(exp_id[3:])
-                        exp_numbers.append(num)
-                    except:
-                        pass
-            
-            if exp_numbers:
-                next_num = max(exp_numbers) + 1
-            else:
-                next_num = 1
-            
-            new_id = f"EXP{next_num:04d}"
+        new_id = self.db.peek_id('EXP')
         
         ctk.CTkLabel(form_frame, text=f"Expense ID: {new_id}", 
                     font=("Arial", 14, "bold")).pack(pady=5)
@@ -644,56 +597,38 @@ class ExpensesGUI:
                     expense_data['Notes'] = notes
             
             # Save to database
-            success, message = self.db.add_expense(expense_data)
-            
-            if success:
-                self.expense_form_status.configure(text=f"✅ {message}", text_color="green")
-                
-                # AUTO-REFRESH: Refresh all expense tabs
-                # Refresh View Expenses tab if it exists
-                if hasattr(self, 'view_expenses_frame'):
-                    self.refresh_expenses_table(self.view_expenses_frame)
-                
-                # Refresh Expense Reports tab if it exists
-                if hasattr(self, 'reports_expense_frame'):
-                    self.refresh_expense_reports(self.reports_expense_frame)
-                
-                # Clear form
-                self.clear_expense_form()
-                
-                # Generate new ID
-                expenses_df = self.db.get_expenses()
-                if expenses_df.empty:
-                    new_id = "EXP0001"
-                else:
-                    exp_numbers = []
-                    for exp_id in expenses_df['Expense_ID'].dropna():
-                        if isinstance(exp_id, str) and exp_id.startswith('EXP'):
-                            try:
-                                num = int(exp_id[3:])
-                                exp_numbers.append(num)
-                            except:
-                                pass
-                    
-                    if exp_numbers:
-                        next_num = max(exp_numbers) + 1
-                    else:
-                        next_num = 1
-                    
-                    new_id = f"EXP{next_num:04d}"
-                
-                self.generated_expense_id = new_id
-                self.expense_form_status.configure(
-                    text=f"✅ {message} (Next ID: {new_id})", 
-                    text_color="green"
-                )
-                
-            else:
-                self.expense_form_status.configure(text=f"❌ {message}", text_color="red")
+            self.expense_form_status.configure(text="⏳ Saving expense...", text_color="orange")
+            run_save(self, self.finish_add_expense, 'add_expense', expense_data)
                 
         except Exception as e:
             self.expense_form_status.configure(text=f"Error: {str(e)}", text_color="red")
     
+    def finish_add_expense(self, result):
+        """Show the outcome of saving the expense form"""
+        success, message = result
+        
+        # AUTO-REFRESH: Refresh all expense tabs
+        if success:
+            self.refresh_expense_tabs()
+        
+        # The form may have been closed while saving
+        if not self.expense_form_status.winfo_exists():
+            return
+        if success:
+            # Clear form
+            self.clear_expense_form()
+            
+            # Generate new ID
+            new_id = self.db.peek_id('EXP')
+            
+            self.generated_expense_id = new_id
+            self.expense_form_status.configure(
+                text=f"✅ {message} (Next ID: {new_id})", 
+                text_color="green"
+            )
+        else:
+            self.expense_form_status.configure(text=f"❌ {message}", text_color="red")
+    
     def clear_expense_form(self):
         """Clear the expense form"""
         # Clear entries
@@ -0,0 +1,165 @@
+# modules/file_lock.py - Shared/exclusive advisory lock on a store shared by several processes
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Polling between lock attempts: starts short, doubles up to the cap
+MIN_BACKOFF = 0.001
+MAX_BACKOFF = 0.05
+
+
+def lock_path(data_file):
+    """Lock file kept next to the data file (data/inventory.lock)"""
+    return os.path.splitext(data_file)[0] + '.lock'
+
+
+class StoreLock:
+    """
+    Readers/writer lock shared by every process that opens the same store
+
+    Readers take the lock shared, writers exclusive, using flock() on a
+    lock file (msvcrt on Windows, where readers lock exclusively too).
+    Within one process the lock is held once and counted: threads of the
+    same process are serialized by InventoryDB's own write lock, so a
+    nested or concurrent acquisition only bumps a counter.
+
+    Waiting is bounded: attempts back off from MIN_BACKOFF to MAX_BACKOFF
+    and give up with TimeoutError after timeout seconds.
+    """
+
+    def __init__(self, path, timeout=10.0):
+        self.path = path
+        self.timeout = timeout
+        self.stats = {'shared': 0, 'exclusive': 0, 'contended': 0, 'timeouts': 0,
+                      'wait_seconds': 0.0, 'max_wait_seconds': 0.0}
+        self._state_lock = threading.Lock()
+        self._fd = None
+        self._shared = 0
+        self._exclusive = 0
+
+    @contextmanager
+    def shared(self):
+        """Hold the lock for reading"""
+        self._acquire(exclusive=False)
+        try:
+            yield
+        finally:
+            self._release(exclusive=False)
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the lock for a read-modify-write cycle"""
+        self._acquire(exclusive=True)
+        try:
+            yield
+        finally:
+            self._release(exclusive=True)
+
+    def get_stats(self):
+        """Get acquisition counts and time spent waiting for other processes"""
+        stats = dict(self.stats)
+        acquired = stats['shared'] + stats['exclusive']
+        stats['avg_wait_ms'] = (stats['wait_seconds'] / acquired * 1000) if acquired else 0.0
+        return stats
+
+    def close(self):
+        with self._state_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._shared = self._exclusive = 0
+
+    def _acquire(self, exclusive):
+        started = time.monotonic()
+        delay = MIN_BACKOFF
+        retries = 0
+        while True:
+            with self._state_lock:
+                if self._try_lock(exclusive):
+                    break
+            waited = time.monotonic() - started
+            if waited >= self.timeout:
+                self.stats['timeouts'] += 1
+                self.stats['wait_seconds'] += waited
+                raise TimeoutError(f"Timed out after {self.timeout:g}s waiting for lock {self.path}")
+            time.sleep(min(delay, self.timeout - waited))
+            delay = min(delay * 2, MAX_BACKOFF)
+            retries += 1
+
+        self.stats['exclusive' if exclusive else 'shared'] += 1
+        if retries:
+            waited = time.monotonic() - started
+            self.stats['contended'] += 1
+            self.stats['wait_seconds'] += waited
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+
+    def _try_lock(self, exclusive):
+        """Take the lock without blocking (call with _state_lock held); False if another process holds it"""
+        if exclusive:
+            if not self._exclusive and not self._os_lock(exclusive=True):
+                if self._shared:
+                    # A failed flock() upgrade drops the shared lock this process held
+                    self._os_lock(exclusive=False)
+                return False
+            self._exclusive += 1
+        else:
+            if not self._exclusive and not self._shared and not self._os_lock(exclusive=False):
+                return False
+            self._shared += 1
+        return True
+
+    def _release(self, exclusive):
+        with self._state_lock:
+            if exclusive:
+                self._exclusive -= 1
+                if self._exclusive:
+                    return
+                if self._shared:
+                    # Readers of this process are still inside: keep them covered
+                    self._os_downgrade()
+                    return
+            else:
+                self._shared -= 1
+                if self._shared or self._exclusive:
+                    return
+            self._os_unlock()
+
+    # ===== PLATFORM LOCKING =====
+    def _lock_fd(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        return self._fd
+
+    def _os_lock(self, exclusive):
+        fd = self._lock_fd()
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            elif not self._shared:
+                # Already locked by this process when readers are inside
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _os_downgrade(self):
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                pass
+
+    def _os_unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
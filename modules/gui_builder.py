@@ -14,6 +14,7 @@ from modules.inventory_gui import InventoryModuleGUI
 from modules.expenses_gui import ExpensesGUI
 from modules.reports_gui import ReportsGUI
 from modules.settings_gui import SettingsGUI
+from modules.db_worker import AsyncDB
 
 class InventoryGUI:
     def __init__(self, window, db, config):
@@ -21,13 +22,15 @@ class InventoryGUI:
         self.db = db
         self.config = config
         self.current_theme = ctk.get_appearance_mode()
-        self.products_gui = ProductsGUI(window, db, config)
-        self.ingredients_gui = IngredientsGUI(window, db, config)
-        self.recipes_gui = RecipesGUI(window, db, config)
-        self.sales_gui = SalesGUI(window, db, config)
+        # Background database calls for saves, checkout and the P&L report
+        self.async_db = AsyncDB(window, db)
+        self.products_gui = ProductsGUI(window, db, config, async_db=self.async_db)
+        self.ingredients_gui = IngredientsGUI(window, db, config, async_db=self.async_db)
+        self.recipes_gui = RecipesGUI(window, db, config, async_db=self.async_db)
+        self.sales_gui = SalesGUI(window, db, config, async_db=self.async_db)
         self.inventory_gui = InventoryModuleGUI(window, db, config)
-        self.expenses_gui = ExpensesGUI(window, db, config)
-        self.reports_gui = ReportsGUI(window, db, config)
+        self.expenses_gui = ExpensesGUI(window, db, config, async_db=self.async_db)
+        self.reports_gui = ReportsGUI(window, db, config, async_db=self.async_db)
         self.settings_gui = SettingsGUI(window, db, config)
 
         # Set window properties
@@ -177,17 +180,13 @@ class InventoryGUI:
         
         # Get data
         products_df = self.db.get_all_products()
-        sales_df = self.db.read_tab('Sales')
         inventory_df = self.db.get_inventory_status()
         
         # Calculate stats
         total_products = len(products_df) if not products_df.empty else 0
         
-        today = datetime.now().strftime(self.config['date_format'])
-        total_sales_today = 0
-        if not sales_df.empty and 'Sale_Date' in sales_df.columns and 'Total_Amount' in sales_df.columns:
-            today_sales = sales_df[sales_df['Sale_Date'] == today]
-            total_sales_today = today_sales['Total_Amount'].sum() if not today_sales.empty else 0
+        today = datetime.now()
+        total_sales_today = self.db.get_sales_rollup(today, today)['Total_Amount'].sum()
         
         # Check low stock
         low_stock_count = 0
@@ -357,17 +356,12 @@ class InventoryGUI:
     def get_popular_products(self, days_back=7):
         """Get popular products from recent sales"""
         try:
-            sales_df = self.db.read_tab('Sales')
             products_df = self.db.read_tab('Products')
             
-            if sales_df.empty or products_df.empty:
-                return pd.DataFrame()
-            
-            # Filter recent sales
-            cutoff_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
-            recent_sales = sales_df[sales_df['Sale_Date'] >= cutoff_date]
+            # Daily per-product totals of the recent days
+            recent_sales = self.db.get_sales_rollup(datetime.now() - timedelta(days=days_back))
             
-            if recent_sales.empty:
+            if recent_sales.empty or products_df.empty:
                 return pd.DataFrame()
             
             # Group by product
@@ -777,35 +771,18 @@ class InventoryGUI:
             # Update progress
             progress_window.update()
             
-            # Define the exact column structure for each tab
-            tab_structures = {
-                'Products': ['Product_ID', 'Product_Name', 'Category', 
-                            'Selling_Price', 'Active', 'Cost_Price',
-                            'Profit_Margin', 'Margin_Percentage', 'Notes'],
-                
-                'Ingredients': ['Ingredient_ID', 'Ingredient_Name', 'Unit', 
-                               'Category', 'Current_Stock', 'Min_Stock', 
-                               'Cost_Per_Unit', 'Notes'],
-                
-                'Recipes': ['Recipe_ID', 'Product_ID', 'Ingredient_ID', 'Quantity_Required'],
-                
-                'Sales': ['Sale_ID', 'Product_ID', 'Quantity', 
-                         'Sale_Date', 'Sale_Time', 'Total_Amount'],
-                
-                'Inventory_Log': ['Log_ID', 'Ingredient_ID', 'Change_Type', 
-                                 'Quantity', 'Date', 'Notes']
-            }
+            # Tabs to clear (columns come from the schema registry)
+            cleared_tabs = ['Products', 'Ingredients', 'Recipes', 'Sales', 'Inventory_Log']
             
             # Clear each tab
-            for i, (tab_name, columns) in enumerate(tab_structures.items(), 1):
+            for i, tab_name in enumerate(cleared_tabs, 1):
                 progress_label.configure(text=f"Clearing {tab_name}... ({i}/5)")
                 progress_window.update()
                 
-                # Create empty DataFrame with correct columns
-                empty_df = pd.DataFrame(columns=columns)
-                
-                # Save to database
-                self.db.save_tab(tab_name, empty_df)
+                # Empty the tab and its archived rows
+                success, message = self.db.clear_tabs([tab_name])
+                if not success:
+                    raise Exception(message)
                 
                 # Small delay to show progress
                 progress_window.after(100)
@@ -814,7 +791,7 @@ class InventoryGUI:
             progress_window.destroy()
             
             # Force reload the database
-            self.db.__init__(self.db.excel_file)
+            self.db.reload()
             
             # Show success message
             messagebox.showinfo("✅ Success", 
@@ -845,12 +822,11 @@ class InventoryGUI:
 
     def clear_all_data_with_backup(self):
         """Clear all data with automatic backup"""
-        import shutil
         from datetime import datetime
         
         # Check if file is locked first
         if hasattr(self.db, 'is_file_locked'):
-            if self.db.is_file_locked(self.db.excel_file):
+            if self.db.is_file_locked(self.db.storage.path):
                 messagebox.showerror("File Locked", 
                                    "❌ Cannot clear data!\n\n"
                                    "The Excel file is locked by another program.\n"
@@ -871,33 +847,19 @@ class InventoryGUI:
             # Create backup
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = f"data/backup_{timestamp}.xlsx"
-            shutil.copy2(self.db.excel_file, backup_file)
+            success, message = self.db.backup(backup_file)
+            if not success:
+                raise Exception(message)
             
             print(f"📦 Backup created: {backup_file}")
             
             # Now clear the data
-            tab_structures = {
-                'Products': ['Product_ID', 'Product_Name', 'Category', 
-                            'Selling_Price', 'Active', 'Cost_Price',
-                            'Profit_Margin', 'Margin_Percentage', 'Notes'],
-                
-                'Ingredients': ['Ingredient_ID', 'Ingredient_Name', 'Unit', 
-                               'Category', 'Current_Stock', 'Min_Stock', 
-                               'Cost_Per_Unit', 'Notes'],
-                
-                'Recipes': ['Recipe_ID', 'Product_ID', 'Ingredient_ID', 'Quantity_Required'],
-                
-                'Sales': ['Sale_ID', 'Product_ID', 'Quantity', 
-                         'Sale_Date', 'Sale_Time', 'Total_Amount'],
-                
-                'Inventory_Log': ['Log_ID', 'Ingredient_ID', 'Change_Type', 
-                                 'Quantity', 'Date', 'Notes']
-            }
+            cleared_tabs = ['Products', 'Ingredients', 'Recipes', 'Sales', 'Inventory_Log']
             
-            # Clear each tab
-            for tab_name, columns in tab_structures.items():
-                empty_df = pd.DataFrame(columns=columns)
-                self.db.save_tab(tab_name, empty_df)
+            # Empty each tab and its archived rows
+            success, message = self.db.clear_tabs(cleared_tabs)
+            if not success:
+                raise Exception(message)
             
             messagebox.showinfo("✅ Success", 
                               f"All data cleared successfully!\n\n"
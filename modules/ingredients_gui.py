@@ -3,13 +3,18 @@ import customtkinter as ctk
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, simpledialog
+from modules.virtual_table import VirtualTable
+from modules.db_worker import run_save
 
 
 class IngredientsGUI:
-    def __init__(self, window, db, config):
+    def __init__(self, window, db, config, async_db=None):
         self.window = window
         self.db = db
         self.config = config
+        # Optional AsyncDB: saves run off the UI thread when available
+        self.async_db = async_db
+        self.save_in_progress = False
         self.main_content = None
         self.sort_directions = {}  # Track sort direction for each column
         self.current_sort_column = None
@@ -147,7 +152,7 @@ class IngredientsGUI:
         ingredients_df = self.db.read_tab('Ingredients')
         
         # Update categories
-        if hasattr(self, 'category_menu'):
+        if hasattr(self, 'category_menu') and self.category_menu.winfo_exists():
             categories = ["All Categories"]
             if not ingredients_df.empty and 'Category' in ingredients_df.columns:
                 unique_cats = ingredients_df['Category'].dropna().unique()
@@ -166,7 +171,7 @@ class IngredientsGUI:
                 self.category_filter_var.set("All Categories")
         
         # Update units
-        if hasattr(self, 'unit_menu'):
+        if hasattr(self, 'unit_menu') and self.unit_menu.winfo_exists():
             units = ["All Units"]
             if not ingredients_df.empty and 'Unit' in ingredients_df.columns:
                 unique_units = ingredients_df['Unit'].dropna().unique()
@@ -204,7 +209,7 @@ class IngredientsGUI:
 
     def refresh_ingredients_table(self, low_stock_threshold=None):
         """Refresh the ingredients table with filters"""
-        if not hasattr(self, 'ingredients_table_frame'):
+        if not hasattr(self, 'ingredients_table_frame') or not self.ingredients_table_frame.winfo_exists():
             return
             
         # Update filter dropdowns first
@@ -334,210 +339,82 @@ class IngredientsGUI:
                     font=("Arial", 12),
                     text_color="black").pack(pady=8, padx=10)
 
-        # Create table with scrollable frame
-        table_container = ctk.CTkFrame(self.ingredients_table_frame)
-        table_container.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Create scrollable frame for the table
-        scroll_frame = ctk.CTkScrollableFrame(table_container, width=1100, height=500)
-        scroll_frame.pack(fill="both", expand=True)
-
-        # Configure grid for the scrollable frame
-        scroll_frame.grid_columnconfigure(0, weight=0, minsize=80)    # ID
-        scroll_frame.grid_columnconfigure(1, weight=0, minsize=180)   # Name
-        scroll_frame.grid_columnconfigure(2, weight=0, minsize=120)   # Category
-        scroll_frame.grid_columnconfigure(3, weight=0, minsize=80)    # Unit
-        scroll_frame.grid_columnconfigure(4, weight=0, minsize=100)   # Stock
-        scroll_frame.grid_columnconfigure(5, weight=0, minsize=100)   # Cost
-        scroll_frame.grid_columnconfigure(6, weight=0, minsize=80)    # Status
-        scroll_frame.grid_columnconfigure(7, weight=0, minsize=120)   # Last Updated
-        scroll_frame.grid_columnconfigure(8, weight=0, minsize=150)   # Actions
-
-        # Table headers with sort buttons
-        headers = [
-            ("ID", "Ingredient_ID"),
-            ("Ingredient Name", "Ingredient_Name"),
-            ("Category", "Category"),
-            ("Unit", "Unit"),
-            ("Current Stock", "Current_Stock"),
-            ("Cost/Unit", "Cost_Per_Unit"),
-            ("Status", "Active"),
-            ("Last Updated", "Last_Updated"),
-            ("Actions", "")
-        ]
+        # Table columns (rows are rendered on demand by VirtualTable)
+        currency = self.config['currency']
 
-        # Create header row
-        for col, (header_text, column_name) in enumerate(headers):
-            header_cell = ctk.CTkFrame(scroll_frame, height=35, corner_radius=5,
-                                      fg_color="#2c3e50" if col % 2 == 0 else "#34495e")
-            header_cell.grid(row=0, column=col, padx=1, pady=1, sticky="nsew")
-            
-            if column_name:  # Clickable header for sortable columns
-                # Add sort indicator
-                sort_indicator = ""
-                if self.current_sort_column == column_name:
-                    sort_indicator = " ↑" if self.sort_directions.get(column_name, True) else " ↓"
-                
-                header_btn = ctk.CTkButton(
-                    header_cell,
-                    text=f"{header_text}{sort_indicator}",
-                    font=("Arial", 12, "bold"),
-                    fg_color="transparent",
-                    hover_color="#4a6fa5",
-                    text_color="white",
-                    height=35,
-                    anchor="center",
-                    command=lambda col_name=column_name: self.sort_by_column(col_name)
-                )
-                header_btn.pack(fill="both", expand=True)
-            else:
-                # Non-sortable header (Actions)
-                ctk.CTkLabel(header_cell, text=header_text,
-                           font=("Arial", 12, "bold"),
-                           text_color="white").pack(expand=True)
+        def sort_header(header_text, column_name):
+            sort_indicator = ""
+            if self.current_sort_column == column_name:
+                sort_indicator = " ↑" if self.sort_directions.get(column_name, True) else " ↓"
+            return f"{header_text}{sort_indicator}"
 
-        # Add ingredient rows
-        for row_idx, (_, ingredient) in enumerate(ingredients_df.iterrows(), start=1):
-            # Alternate row colors for readability
-            row_color = "#f8f9fa" if row_idx % 2 == 0 else "white"
-            
-            # ID
-            id_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            id_cell.grid(row=row_idx, column=0, padx=1, pady=1, sticky="nsew")
-            ctk.CTkLabel(id_cell, text=ingredient['Ingredient_ID'],
-                        font=("Arial", 11), text_color="black").pack(expand=True)
-            
-            # Name
-            name_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            name_cell.grid(row=row_idx, column=1, padx=1, pady=1, sticky="nsew")
-            ctk.CTkLabel(name_cell, text=ingredient['Ingredient_Name'],
-                        font=("Arial", 11), text_color="black").pack(expand=True)
-            
-            # Category
-            category_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            category_cell.grid(row=row_idx, column=2, padx=1, pady=1, sticky="nsew")
-            category = ingredient.get('Category', 'N/A')
-            ctk.CTkLabel(category_cell, text=category,
-                        font=("Arial", 11), text_color="black").pack(expand=True)
-            
-            # Unit
-            unit_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            unit_cell.grid(row=row_idx, column=3, padx=1, pady=1, sticky="nsew")
-            unit = ingredient.get('Unit', 'N/A')
-            ctk.CTkLabel(unit_cell, text=unit,
-                        font=("Arial", 11), text_color="black").pack(expand=True)
-            
-            # Current Stock
-            stock_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            stock_cell.grid(row=row_idx, column=4, padx=1, pady=1, sticky="nsew")
-            stock = ingredient.get('Current_Stock', 0)
-            try:
-                stock_num = float(stock)
-                stock_color = "green" if stock_num > 20 else "orange" if stock_num > 0 else "red"
-                stock_text = f"{stock_num:.2f}" if stock_num % 1 else f"{int(stock_num)}"
-            except:
-                stock_color = "gray"
-                stock_text = str(stock)
-            
-            ctk.CTkLabel(stock_cell, text=stock_text,
-                        font=("Arial", 11, "bold"),
-                        text_color=stock_color).pack(expand=True)
-            
-            # Cost per Unit
-            cost_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            cost_cell.grid(row=row_idx, column=5, padx=1, pady=1, sticky="nsew")
-            cost = ingredient.get('Cost_Per_Unit', 0)
+        def stock_text(ingredient):
+            stock_num = float(ingredient.get('Current_Stock', 0))
+            return f"{stock_num:.2f}" if stock_num % 1 else f"{int(stock_num)}"
+
+        def stock_color(ingredient):
+            stock_num = float(ingredient.get('Current_Stock', 0))
+            return "green" if stock_num > 20 else "orange" if stock_num > 0 else "red"
+
+        def cost_text(ingredient):
             try:
-                cost_num = float(cost)
-                cost_text = f"{self.config['currency']}{cost_num:.2f}"
-            except:
-                cost_text = f"{self.config['currency']}0.00"
-            
-            ctk.CTkLabel(cost_cell, text=cost_text,
-                        font=("Arial", 11), text_color="black").pack(expand=True)
-            
-            # Status
-            status_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            status_cell.grid(row=row_idx, column=6, padx=1, pady=1, sticky="nsew")
-            
-            is_active = str(ingredient.get('Active', 'Yes')).upper() == 'YES'
-            status_text = "Active" if is_active else "Inactive"
-            status_bg_color = "#2ecc71" if is_active else "#e74c3c"
-            
-            status_frame = ctk.CTkFrame(status_cell, fg_color=status_bg_color,
-                                       corner_radius=10, height=25)
-            status_frame.place(relx=0.5, rely=0.5, anchor="center")
-            ctk.CTkLabel(status_frame, text=status_text,
-                        text_color="white", font=("Arial", 10, "bold")).pack(padx=10, pady=2)
-            
-            # Last Updated
-            updated_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            updated_cell.grid(row=row_idx, column=7, padx=1, pady=1, sticky="nsew")
+                return f"{currency}{float(ingredient.get('Cost_Per_Unit', 0)):.2f}"
+            except (TypeError, ValueError):
+                return f"{currency}0.00"
+
+        def is_active(ingredient):
+            return str(ingredient.get('Active', 'Yes')).upper() == 'YES'
+
+        def updated_text(ingredient):
             last_updated = ingredient.get('Last_Updated', '')
-            updated_text = str(last_updated)[:10] if last_updated else 'N/A'
-            ctk.CTkLabel(updated_cell, text=updated_text,
-                        font=("Arial", 11), text_color="black").pack(expand=True)
-            
-            # Actions
-            action_cell = ctk.CTkFrame(scroll_frame, height=35, fg_color=row_color)
-            action_cell.grid(row=row_idx, column=8, padx=1, pady=1, sticky="nsew")
-            
-            # Create action buttons frame
-            action_buttons_frame = ctk.CTkFrame(action_cell, fg_color="transparent")
-            action_buttons_frame.place(relx=0.5, rely=0.5, anchor="center")
-            
-            # View button
-            view_btn = ctk.CTkButton(
-                action_buttons_frame,
-                text="👁️",
-                width=35,
-                height=25,
-                font=("Arial", 12),
-                fg_color="#3498db",
-                hover_color="#2980b9",
-                command=lambda iid=ingredient['Ingredient_ID']: self.view_ingredient_details(iid)
-            )
-            view_btn.pack(side="left", padx=2)
-            
-            # Edit button
-            edit_btn = ctk.CTkButton(
-                action_buttons_frame,
-                text="✏️",
-                width=35,
-                height=25,
-                font=("Arial", 12),
-                fg_color="#f39c12",
-                hover_color="#e67e22",
-                command=lambda iid=ingredient['Ingredient_ID']: self.edit_ingredient_popup(iid)
-            )
-            edit_btn.pack(side="left", padx=2)
-            
-            # Stock Update button
-            stock_btn = ctk.CTkButton(
-                action_buttons_frame,
-                text="📦",
-                width=35,
-                height=25,
-                font=("Arial", 12),
-                fg_color="#2ecc71",
-                hover_color="#27ae60",
-                command=lambda iid=ingredient['Ingredient_ID']: self.update_stock_popup(iid)
-            )
-            stock_btn.pack(side="left", padx=2)
-            
-            # Delete button (only for inactive items)
-            if not is_active:
-                delete_btn = ctk.CTkButton(
-                    action_buttons_frame,
-                    text="🗑️",
-                    width=35,
-                    height=25,
-                    font=("Arial", 12),
-                    fg_color="#e74c3c",
-                    hover_color="#c0392b",
-                    command=lambda iid=ingredient['Ingredient_ID']: self.delete_ingredient_popup(iid)
-                )
-                delete_btn.pack(side="left", padx=2)
+            return str(last_updated)[:10] if last_updated else 'N/A'
+
+        columns = [
+            {'header': sort_header("ID", "Ingredient_ID"), 'width': 80, 'value': 'Ingredient_ID',
+             'text_color': "black",
+             'header_command': lambda: self.sort_by_column("Ingredient_ID")},
+            {'header': sort_header("Ingredient Name", "Ingredient_Name"), 'width': 180,
+             'value': 'Ingredient_Name', 'text_color': "black",
+             'header_command': lambda: self.sort_by_column("Ingredient_Name")},
+            {'header': sort_header("Category", "Category"), 'width': 120,
+             'value': lambda ingredient: ingredient.get('Category', 'N/A'), 'text_color': "black",
+             'header_command': lambda: self.sort_by_column("Category")},
+            {'header': sort_header("Unit", "Unit"), 'width': 80,
+             'value': lambda ingredient: ingredient.get('Unit', 'N/A'), 'text_color': "black",
+             'header_command': lambda: self.sort_by_column("Unit")},
+            {'header': sort_header("Current Stock", "Current_Stock"), 'width': 100,
+             'value': stock_text, 'text_color': stock_color, 'font': ("Arial", 11, "bold"),
+             'header_command': lambda: self.sort_by_column("Current_Stock")},
+            {'header': sort_header("Cost/Unit", "Cost_Per_Unit"), 'width': 100,
+             'value': cost_text, 'text_color': "black",
+             'header_command': lambda: self.sort_by_column("Cost_Per_Unit")},
+            {'header': sort_header("Status", "Active"), 'width': 80, 'anchor': "center",
+             'font': ("Arial", 10, "bold"),
+             'value': lambda ingredient: "Active" if is_active(ingredient) else "Inactive",
+             'badge': lambda ingredient: "#2ecc71" if is_active(ingredient) else "#e74c3c",
+             'header_command': lambda: self.sort_by_column("Active")},
+            {'header': sort_header("Last Updated", "Last_Updated"), 'width': 120,
+             'value': updated_text, 'text_color': "black",
+             'header_command': lambda: self.sort_by_column("Last_Updated")},
+            {'header': "Actions", 'width': 170, 'buttons': [
+                {'text': "👁️", 'font': ("Arial", 12), 'fg_color': "#3498db", 'hover_color': "#2980b9",
+                 'command': lambda ingredient: self.view_ingredient_details(ingredient['Ingredient_ID'])},
+                {'text': "✏️", 'font': ("Arial", 12), 'fg_color': "#f39c12", 'hover_color': "#e67e22",
+                 'command': lambda ingredient: self.edit_ingredient_popup(ingredient['Ingredient_ID'])},
+                {'text': "📦", 'font': ("Arial", 12), 'fg_color': "#2ecc71", 'hover_color': "#27ae60",
+                 'command': lambda ingredient: self.update_stock_popup(ingredient['Ingredient_ID'])},
+                # Delete button (only for inactive items)
+                {'text': "🗑️", 'font': ("Arial", 12), 'fg_color': "#e74c3c", 'hover_color': "#c0392b",
+                 'command': lambda ingredient: self.delete_ingredient_popup(ingredient['Ingredient_ID']),
+                 'visible': lambda ingredient: not is_active(ingredient)}
+            ]}
+        ]
+
+        table = VirtualTable(self.ingredients_table_frame, columns, ingredients_df,
+                             height=500, row_height=37,
+                             row_colors=("white", "#f8f9fa"),
+                             header_colors=("#2c3e50", "#34495e"))
+        table.pack(fill="both", expand=True, padx=10, pady=10)
 
     def sort_by_column(self, column_name):
         """Sort table by column"""
@@ -560,7 +437,7 @@ class IngredientsGUI:
         form_frame = ctk.CTkFrame(parent_frame)
         form_frame.pack(pady=20, padx=50, fill="both", expand=True)
 
-        # Auto-generate ID
+        # Preview the next ID (the database assigns it when the row is saved)
         new_id = self.db.generate_ingredient_id()
         ctk.CTkLabel(form_frame, text=f"Ingredient ID: {new_id}",
                     font=("Arial", 14, "bold")).pack(pady=5)
@@ -706,7 +583,6 @@ class IngredientsGUI:
         try:
             # Get form data with proper defaults for empty fields
             product_data = {
-                'Ingredient_ID': self.generated_ingredient_id,
                 'Ingredient_Name': self.ingredient_form_entries['ingredient_name'].get(),
                 'Category': self.category_dropdown_var.get(),
                 'Unit': self.unit_dropdown_var.get(),
@@ -755,23 +631,8 @@ class IngredientsGUI:
                 return
 
             # Save to database
-            success, message = self.db.add_ingredient(product_data)
-
-            if success:
-                self.ingredient_form_status.configure(text=f"✅ {message}", text_color="green")
-                # Clear form
-                self.clear_ingredient_form()
-                # Generate new ID for next ingredient
-                self.generated_ingredient_id = self.db.generate_ingredient_id()
-                
-                # Refresh table and update filters
-                if hasattr(self, 'ingredients_table_frame'):
-                    self.refresh_ingredients_table()
-                    
-                # Update filter dropdowns in the View tab
-                self.update_filter_dropdowns()
-            else:
-                self.ingredient_form_status.configure(text=f"❌ {message}", text_color="red")
+            self.ingredient_form_status.configure(text="⏳ Saving ingredient...", text_color="orange")
+            run_save(self, self.finish_add_ingredient, 'add_ingredient', product_data)
 
         except ValueError as e:
             self.ingredient_form_status.configure(text=f"Invalid number format: {str(e)}",
@@ -780,6 +641,29 @@ class IngredientsGUI:
             self.ingredient_form_status.configure(text=f"Error: {str(e)}",
                                                  text_color="red")
 
+    def finish_add_ingredient(self, result):
+        """Show the outcome of saving the ingredient form"""
+        success, message = result
+        # The screen may have been left while saving
+        if not self.ingredient_form_status.winfo_exists():
+            return
+
+        if success:
+            self.ingredient_form_status.configure(text=f"✅ {message}", text_color="green")
+            # Clear form
+            self.clear_ingredient_form()
+            # Preview the ID for the next ingredient
+            self.generated_ingredient_id = self.db.generate_ingredient_id()
+            
+            # Refresh table and update filters
+            if hasattr(self, 'ingredients_table_frame'):
+                self.refresh_ingredients_table()
+                
+            # Update filter dropdowns in the View tab
+            self.update_filter_dropdowns()
+        else:
+            self.ingredient_form_status.configure(text=f"❌ {message}", text_color="red")
+
     def clear_ingredient_form(self):
         """Clear the ingredient form"""
         # Clear text entries
@@ -806,7 +690,7 @@ class IngredientsGUI:
         # Clear description
         self.ingredient_desc_text.delete("1.0", "end")
         
-        # Generate new ID
+        # Preview the next ID
         self.generated_ingredient_id = self.db.generate_ingredient_id()
         
         # Update status
@@ -1089,15 +973,8 @@ class IngredientsGUI:
                     return
                 
                 # Update in database
-                success, message = self.db.update_ingredient(ingredient_id, updated_data)
-                
-                if success:
-                    status_label.configure(text=f"✅ {message}", text_color="green")
-                    # Refresh table and update filters
-                    self.refresh_ingredients_table()
-                    # Update filter dropdowns
-                    self.update_filter_dropdowns()
-                    popup.after(1500, popup.destroy)
+                status_label.configure(text="⏳ Saving...", text_color="orange")
+                run_save(self, finish_save, 'update_ingredient', ingredient_id, updated_data)
                     
             except ValueError as e:
                 status_label.configure(text=f"Invalid number: {str(e)}",
@@ -1106,6 +983,22 @@ class IngredientsGUI:
                 status_label.configure(text=f"Error: {str(e)}",
                                      text_color="red")
 
+        def finish_save(result):
+            success, message = result
+            if success:
+                # Refresh table and update filters
+                self.refresh_ingredients_table()
+                # Update filter dropdowns
+                self.update_filter_dropdowns()
+            # The popup may have been closed while saving
+            if not popup.winfo_exists():
+                return
+            if success:
+                status_label.configure(text=f"✅ {message}", text_color="green")
+                popup.after(1500, popup.destroy)
+            else:
+                status_label.configure(text=f"❌ {message}", text_color="red")
+
         ctk.CTkButton(button_frame, text="💾 Save Changes",
                      command=save_changes,
                      fg_color="#27ae60", hover_color="#219653",
@@ -1246,28 +1139,36 @@ class IngredientsGUI:
                     new_stock = amount
 
                 # Update in database
-                success, message = self.db.update_ingredient_stock(
-                    ingredient_id, new_stock, operation, amount, reason
-                )
-
-                if success:
-                    status_label.configure(text=f"✅ {message}", text_color="green")
-                    
-                    # Disable buttons temporarily
-                    for widget in button_frame.winfo_children():
-                        if isinstance(widget, ctk.CTkButton):
-                            widget.configure(state="disabled")
-                    
-                    # Refresh table and update filters
-                    self.refresh_ingredients_table()
-                    # Update filter dropdowns
-                    self.update_filter_dropdowns()
-                    popup.after(1500, popup.destroy)
+                status_label.configure(text="⏳ Updating stock...", text_color="orange")
+                run_save(self, finish_update, 'update_ingredient_stock',
+                         ingredient_id, new_stock, operation, amount, reason)
 
             except ValueError:
                 status_label.configure(text="Please enter a valid number",
                                      text_color="red")
 
+        def finish_update(result):
+            success, message = result
+            if success:
+                # Refresh table and update filters
+                self.refresh_ingredients_table()
+                # Update filter dropdowns
+                self.update_filter_dropdowns()
+            # The popup may have been closed while saving
+            if not popup.winfo_exists():
+                return
+            if success:
+                status_label.configure(text=f"✅ {message}", text_color="green")
+                
+                # Disable buttons temporarily
+                for widget in button_frame.winfo_children():
+                    if isinstance(widget, ctk.CTkButton):
+                        widget.configure(state="disabled")
+                
+                popup.after(1500, popup.destroy)
+            else:
+                status_label.configure(text=f"❌ {message}", text_color="red")
+
         ctk.CTkButton(button_frame, text="💾 Update Stock",
                      command=update_stock,
                      fg_color="#27ae60", hover_color="#219653",
@@ -1309,10 +1210,9 @@ class IngredientsGUI:
 
             if response:
                 # Mark as inactive
-                success, message = self.db.update_ingredient(ingredient_id, {'Active': 'No'})
-                if success:
-                    messagebox.showinfo("Success", f"'{ingredient_name}' marked as inactive.")
-                    self.refresh_ingredients_table()
+                run_save(self, lambda result: self.finish_ingredient_action(
+                             result, f"'{ingredient_name}' marked as inactive."),
+                         'update_ingredient', ingredient_id, {'Active': 'No'})
             return
 
         # Confirm deletion
@@ -1345,13 +1245,16 @@ class IngredientsGUI:
                     return
 
             # Perform deletion
-            success, message = self.db.delete_ingredient(ingredient_id)
-
-            if success:
-                messagebox.showinfo("✅ Success", message)
-                self.refresh_ingredients_table()
-            else:
-                messagebox.showerror("❌ Error", message)
+            run_save(self, self.finish_ingredient_action, 'delete_ingredient', ingredient_id)
+
+    def finish_ingredient_action(self, result, success_text=None):
+        """Show the outcome of deactivating or deleting an ingredient"""
+        success, message = result
+        if success:
+            messagebox.showinfo("✅ Success", success_text or message)
+            self.refresh_ingredients_table()
+        else:
+            messagebox.showerror("❌ Error", message)
 
     # Category popup method from ProductsGUI (reuse it)
     def show_add_category_popup(self, current_value=""):
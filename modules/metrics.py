@@ -0,0 +1,217 @@
+# modules/metrics.py - Per-method timing and I/O counters of InventoryDB
+import contextlib
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Counters collected during every instrumented call
+COUNTERS = ('read_tab_calls', 'save_tab_calls', 'storage_reads', 'storage_writes',
+            'rows_read', 'rows_written', 'bytes_read', 'bytes_written')
+
+# Number of slow operations kept for the diagnostics panel
+SLOW_LOG_SIZE = 200
+
+# Source files (as compiled) whose frames are skipped when looking for the code that called the database
+_INTERNAL_FILES = {__file__, contextlib.__file__}
+
+_process = None
+_proc_io_fd = None
+
+
+def process_io():
+    """
+    Bytes read and written by this process so far
+
+    Uses psutil where installed, else /proc/self/io (Linux).
+
+    Returns:
+        Tuple: (bytes_read, bytes_written), or None where the OS does not report them
+    """
+    global _process
+    if psutil is not None:
+        try:
+            if _process is None:
+                _process = psutil.Process()
+            counters = _process.io_counters()
+            return (getattr(counters, 'read_chars', counters.read_bytes),
+                    getattr(counters, 'write_chars', counters.write_bytes))
+        except (psutil.Error, AttributeError):
+            return None
+    global _proc_io_fd
+    try:
+        # Kept open: re-reading an open /proc file is far cheaper than opening it per call
+        if _proc_io_fd is None:
+            _proc_io_fd = os.open('/proc/self/io', os.O_RDONLY)
+        # 'rchar: <n>\nwchar: <n>\n...'
+        fields = os.pread(_proc_io_fd, 4096, 0).split()
+        return int(fields[1]), int(fields[3])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _new_stats():
+    stats = {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+    stats.update((counter, 0) for counter in COUNTERS)
+    return stats
+
+
+class MetricsRegistry:
+    """
+    In-process record of what every InventoryDB method cost
+
+    Per method: calls, wall time and the counters of COUNTERS (tab reads
+    and saves it triggered, storage round trips, rows and bytes moved).
+    Counts are inclusive: a method's numbers contain those of the methods
+    it called. Outermost calls are also totalled per caller (the GUI
+    line that called the database), and calls slower than slow_ms are
+    kept in a bounded slow-operations log.
+
+    Bytes are the process's file I/O during the call (see process_io),
+    so work done meanwhile by other threads is included.
+    """
+
+    def __init__(self, slow_ms=200.0, enabled=True):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.methods = {}
+        self.callers = {}
+        self.slow_log = deque(maxlen=SLOW_LOG_SIZE)
+        self.started = datetime.now()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def count(self, **increments):
+        """Add to the counters of the calls running in this thread (e.g. rows_read=120)"""
+        counters = self._counters()
+        for counter, amount in increments.items():
+            counters[counter] += amount
+
+    def _counters(self):
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = dict.fromkeys(COUNTERS, 0)
+            self._local.depth = 0
+        return counters
+
+    @contextmanager
+    def measure(self, name):
+        """Time a block and record it under name"""
+        counters = self._counters()
+        before = dict(counters)
+        io_before = process_io()
+        self._local.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._local.depth -= 1
+            io_after = process_io()
+            if io_before is not None and io_after is not None:
+                counters['bytes_read'] += io_after[0] - io_before[0]
+                counters['bytes_written'] += io_after[1] - io_before[1]
+            deltas = {counter: counters[counter] - before[counter] for counter in COUNTERS}
+            self._record(name, elapsed_ms, deltas, outermost=self._local.depth == 0)
+
+    def _record(self, name, elapsed_ms, deltas, outermost):
+        caller = _caller() if outermost or elapsed_ms >= self.slow_ms else None
+        with self._lock:
+            targets = [self._stats(self.methods, name)]
+            if outermost:
+                targets.append(self._stats(self.callers, caller))
+            for stats in targets:
+                stats['calls'] += 1
+                stats['total_ms'] += elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+                for counter, amount in deltas.items():
+                    stats[counter] += amount
+            if elapsed_ms >= self.slow_ms:
+                self.slow_log.appendleft({'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                          'method': name, 'ms': round(elapsed_ms, 1),
+                                          'caller': caller, **deltas})
+
+    @staticmethod
+    def _stats(table, name):
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = _new_stats()
+        return stats
+
+    def snapshot(self):
+        """
+        Copy of everything recorded so far
+
+        Returns:
+            Dictionary with 'methods' and 'callers' ({name: stats}, slowest
+            total first), 'slow_operations' (newest first), 'slow_ms',
+            'since' and 'io_available'
+        """
+        with self._lock:
+            by_total = lambda item: item[1]['total_ms']
+            return {
+                'methods': dict(sorted(((name, dict(stats)) for name, stats in self.methods.items()),
+                                       key=by_total, reverse=True)),
+                'callers': dict(sorted(((name, dict(stats)) for name, stats in self.callers.items()),
+                                       key=by_total, reverse=True)),
+                'slow_operations': list(self.slow_log),
+                'slow_ms': self.slow_ms,
+                'since': self.started.strftime("%Y-%m-%d %H:%M:%S"),
+                'io_available': process_io() is not None
+            }
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.methods.clear()
+            self.callers.clear()
+            self.slow_log.clear()
+            self.started = datetime.now()
+
+
+def _caller():
+    """'file.py:line function' of the nearest frame outside the instrumented class"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in _INTERNAL_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def instrument(cls, exclude=()):
+    """
+    Time every public method of a class with the instance's `metrics` registry
+
+    Args:
+        cls: Class whose public methods are wrapped (instances need a
+             `metrics` attribute holding a MetricsRegistry)
+        exclude: Method names to leave unwrapped
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_') or name in exclude or not inspect.isfunction(method):
+            continue
+        _INTERNAL_FILES.add(method.__code__.co_filename)
+        setattr(cls, name, _timed(name, method))
+    return cls
+
+
+def _timed(name, method):
+    @wraps(method)
+    def timed_method(self, *args, **kwargs):
+        metrics = getattr(self, 'metrics', None)
+        if metrics is None or not metrics.enabled:
+            return method(self, *args, **kwargs)
+        with metrics.measure(name):
+            return method(self, *args, **kwargs)
+    return timed_method
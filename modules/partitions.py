@@ -0,0 +1,100 @@
+# modules/partitions.py - Monthly partitioning of the dated history tabs
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Tab -> date column its rows are partitioned by
+PARTITIONED_TABS = {
+    'Sales': 'Sale_Date',
+    'Inventory_Log': 'Date',
+    'Expenses': 'Expense_Date'
+}
+
+# Partition of rows whose date cannot be read; never matches a date range
+UNDATED = ''
+
+
+def date_text(series):
+    """Dates as 'YYYY-MM-DD[ HH:MM:SS]' text, the form the app stores them in"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%d %H:%M:%S").fillna('')
+    if series.dtype == object:
+        series = series.map(lambda v: v.strftime("%Y-%m-%d %H:%M:%S") if isinstance(v, datetime) else v)
+    return series.fillna('').astype(str)
+
+
+def partition_keys(series):
+    """Month ('YYYY-MM') each date belongs to, UNDATED for unreadable dates"""
+    text = date_text(series)
+    return text.str[:7].where(text.str.match(r'\d{4}-\d{2}-\d{2}'), UNDATED)
+
+
+def to_day(value):
+    """Normalize a date, datetime or date string to a midnight Timestamp (None stays None)"""
+    return None if value is None else pd.Timestamp(value).normalize()
+
+
+def range_bounds(start=None, end=None):
+    """
+    Text bounds of a date range: dates d with lower <= d < upper are in range
+
+    Using the day after end as an exclusive bound keeps rows with a time
+    of day ('2025-12-06 14:30:00') on the last day.
+
+    Returns:
+        Tuple: ('YYYY-MM-DD' or None, 'YYYY-MM-DD' or None)
+    """
+    lower = start.strftime("%Y-%m-%d") if start is not None else None
+    upper = (end + timedelta(days=1)).strftime("%Y-%m-%d") if end is not None else None
+    return lower, upper
+
+
+def range_mask(series, start=None, end=None):
+    """
+    Boolean mask of the dates that fall within [start, end]
+
+    Args:
+        series: Date column
+        start: First day to include (Timestamp), or None for no lower bound
+        end: Last day to include (Timestamp), or None for no upper bound
+    """
+    text = date_text(series)
+    lower, upper = range_bounds(start, end)
+    mask = text.str.match(r'\d{4}-\d{2}-\d{2}')
+    if lower is not None:
+        mask &= text >= lower
+    if upper is not None:
+        mask &= text < upper
+    return mask
+
+
+def period_bounds(period, custom_from=None, custom_to=None):
+    """
+    First and last day of a report period as chosen in the GUI
+
+    Args:
+        period: "Today", "Yesterday", "Last 7 days", "Last 30 days",
+                "This Month", "Last Month", "Custom" or "All Time"
+        custom_from: First day of a "Custom" period
+        custom_to: Last day of a "Custom" period
+
+    Returns:
+        Tuple: (start, end) Timestamps; None for an open bound
+    """
+    today = pd.Timestamp.now().normalize()
+    if period == "Today":
+        return today, today
+    if period == "Yesterday":
+        return today - timedelta(days=1), today - timedelta(days=1)
+    if period == "Last 7 days":
+        return today - timedelta(days=6), None
+    if period == "Last 30 days":
+        return today - timedelta(days=29), None
+    if period == "This Month":
+        return today.replace(day=1), None
+    if period == "Last Month":
+        start_of_month = today.replace(day=1)
+        return (start_of_month - timedelta(days=1)).replace(day=1), start_of_month - timedelta(days=1)
+    if period == "Custom" and custom_from and custom_to:
+        return to_day(custom_from), to_day(custom_to)
+    return None, None
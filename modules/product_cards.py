@@ -0,0 +1,152 @@
+# modules/product_cards.py - Reusable product cards of the sales grid
+import customtkinter as ctk
+
+
+class ProductCardPool:
+    """
+    Clickable product cards in a grid, one per Product_ID, created once
+
+    The cards live in a scrollable frame owned by the window, so they
+    survive the sales screen being closed; attach() packs that frame into
+    each new sales screen (Tk cannot move widgets to another parent, but
+    it can manage them inside any descendant of it).
+
+    sync() brings the cards in line with a ProductSearchIndex: new
+    products get a card, cards of products no longer listed are
+    destroyed, and existing cards are refilled, configuring only the
+    labels whose text changed (a price update touches one label).
+    show() then places the cards of a filter result and hides the rest,
+    so filters, category switches and screen visits never create widgets.
+
+    Clicks call on_click(product) with the product's current row as a
+    dictionary; the Tk bindings are made once and read it from the card.
+    """
+
+    def __init__(self, window, currency, on_click, columns=2):
+        self.frame = ctk.CTkScrollableFrame(window, height=350)
+        self.currency = currency
+        self.on_click = on_click
+        self.columns = columns
+        # {Product_ID: {'frame', 'labels', 'product', 'state', 'position'}}
+        self._cards = {}
+        self._message_label = None
+
+        for col in range(columns):
+            self.frame.grid_columnconfigure(col, weight=1)
+
+    def __len__(self):
+        return len(self._cards)
+
+    def attach(self, container, currency):
+        """Show the card grid at the bottom of container (a frame of the current sales screen)"""
+        if currency != self.currency:
+            # Prices are relabeled by the next sync()
+            self.currency = currency
+            for card in self._cards.values():
+                card['state'].pop('price', None)
+        self.frame.pack(in_=container, fill="both", expand=True, padx=10, pady=10)
+        # Created before the screen's frames, so it would be drawn behind them
+        self.frame.lift()
+
+    # ===== CARDS =====
+    def sync(self, index):
+        """Create, refill or destroy cards to match the products of a search index"""
+        products = index.products.to_dict('records') if len(index) else []
+        listed = set(index.product_ids)
+
+        for product_id in [product_id for product_id in self._cards if product_id not in listed]:
+            self._cards.pop(product_id)['frame'].destroy()
+
+        for product_id, product in zip(index.product_ids, products):
+            card = self._cards.get(product_id)
+            if card is None:
+                card = self._cards[product_id] = self._create_card()
+            self._fill_card(card, product)
+
+    def show(self, product_ids):
+        """Place the cards of product_ids in order, hiding every other card"""
+        self.show_message(None)
+        positions = {product_id: divmod(slot, self.columns) for slot, product_id in enumerate(product_ids)}
+        for product_id, card in self._cards.items():
+            position = positions.get(product_id)
+            if position == card['position']:
+                continue
+            if position is None:
+                card['frame'].grid_remove()
+            else:
+                card['frame'].grid(row=position[0], column=position[1], padx=5, pady=5, sticky="nsew")
+            card['position'] = position
+
+    def show_message(self, text):
+        """Show a message in place of the cards (None hides it)"""
+        if text is None:
+            if self._message_label is not None:
+                self._message_label.grid_remove()
+            return
+
+        self.show([])
+        if self._message_label is None:
+            self._message_label = ctk.CTkLabel(self.frame, text="", font=("Arial", 12))
+        self._message_label.configure(text=text)
+        self._message_label.grid(row=0, column=0, columnspan=self.columns, pady=50)
+
+    def _create_card(self):
+        """Create an empty card (filled by _fill_card, placed by show)"""
+        frame = ctk.CTkFrame(self.frame,
+                             width=160, height=140,
+                             corner_radius=12,
+                             border_width=1,
+                             border_color="gray",
+                             fg_color="#f8f9fa")
+        frame.pack_propagate(False)
+        card = {'frame': frame, 'labels': {}, 'product': None, 'state': {}, 'position': None}
+
+        # Product name
+        name_label = ctk.CTkLabel(frame, text="",
+                                  font=("Arial", 12, "bold"),
+                                  wraplength=140,
+                                  text_color="black")
+        name_label.pack(pady=(15, 5), padx=10)
+
+        # Price
+        price_label = ctk.CTkLabel(frame, text="",
+                                   font=("Arial", 14, "bold"),
+                                   text_color="green")
+        price_label.pack(pady=2)
+
+        # ID
+        id_label = ctk.CTkLabel(frame, text="",
+                                font=("Arial", 9),
+                                text_color="black")
+        id_label.pack(pady=2)
+        card['labels'] = {'name': name_label, 'price': price_label, 'id': id_label}
+
+        # Make entire card clickable; the handlers read the card's current product
+        for widget in (frame, name_label, price_label):
+            widget.bind("<Button-1>", lambda e, c=card: self.on_click(c['product']))
+
+        # Hover effect
+        frame.configure(cursor="hand2")
+        frame.bind("<Enter>", lambda e, f=frame: f.configure(border_color="#3498db", border_width=2))
+        frame.bind("<Leave>", lambda e, f=frame: f.configure(border_color="gray", border_width=1))
+
+        # Double click to add multiple
+        frame.bind("<Double-Button-1>", lambda e, c=card: [self.on_click(c['product']), self.on_click(c['product'])])
+        return card
+
+    def _fill_card(self, card, product):
+        card['product'] = product
+
+        # Product name (truncated)
+        product_name = str(product['Product_Name'])
+        if len(product_name) > 20:
+            product_name = product_name[:20] + "..."
+        price = product.get('Selling_Price', 0)
+
+        texts = {'name': product_name,
+                 'price': f"{self.currency}{price:,.2f}",
+                 'id': f"ID: {product['Product_ID']}"}
+        for key, text in texts.items():
+            if card['state'].get(key) != text:
+                card['labels'][key].configure(text=text)
+                card['state'][key] = text
@@ -3,13 +3,18 @@ import customtkinter as ctk
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox, simpledialog
+from modules.virtual_table import VirtualTable
+from modules.db_worker import run_save
 
 
 class ProductsGUI:
-    def __init__(self, window, db, config):
+    def __init__(self, window, db, config, async_db=None):
         self.window = window
         self.db = db
         self.config = config
+        # Optional AsyncDB: saves run off the UI thread when available
+        self.async_db = async_db
+        self.save_in_progress = False
         self.main_content = None  # Will be set later
 
     def clear_main_content(self):
@@ -161,7 +166,7 @@ class ProductsGUI:
 
     def refresh_products_table(self):
         """Refresh the products table"""
-        if not hasattr(self, 'products_table_frame'):
+        if not hasattr(self, 'products_table_frame') or not self.products_table_frame.winfo_exists():
             return
 
         # Clear existing table
@@ -305,86 +310,42 @@ class ProductsGUI:
                     font=("Arial", 12),
                     text_color="black").pack(pady=8, padx=10)
 
-        # Create scrollable frame
-        scroll_frame = ctk.CTkScrollableFrame(self.products_table_frame, width=900, height=400)
-        scroll_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Table headers
-        headers = ["ID", "Product Name", "Category", "Selling Price", "Cost Price", "Margin %", "Status", "Actions"]
-        col_widths = [80, 200, 120, 100, 100, 80, 80, 120]
-
-        for col, (header, width) in enumerate(zip(headers, col_widths)):
-            ctk.CTkLabel(scroll_frame, text=header, font=("Arial", 12, "bold"),
-                        width=width).grid(row=0, column=col, padx=5, pady=5, sticky="w")
-
-        # Add product rows
-        for row_idx, (_, product) in enumerate(products_df.iterrows(), start=1):
-            # ID
-            ctk.CTkLabel(scroll_frame, text=product['Product_ID'],
-                        width=col_widths[0]).grid(row=row_idx, column=0, padx=5, pady=2, sticky="w")
-
-            # Name
-            ctk.CTkLabel(scroll_frame, text=product['Product_Name'],
-                        width=col_widths[1]).grid(row=row_idx, column=1, padx=5, pady=2, sticky="w")
-
-            # Category
-            category = product.get('Category', 'N/A')
-            ctk.CTkLabel(scroll_frame, text=category,
-                        width=col_widths[2]).grid(row=row_idx, column=2, padx=5, pady=2, sticky="w")
+        # Table columns (rows are rendered on demand by VirtualTable)
+        currency = self.config['currency']
 
-            # Selling Price
-            selling_price = product.get('Selling_Price', 0)
-            ctk.CTkLabel(scroll_frame, text=f"{self.config['currency']}{selling_price:,.2f}",
-                        width=col_widths[3]).grid(row=row_idx, column=3, padx=5, pady=2, sticky="w")
-
-            # Cost Price
-            cost_price = product.get('Cost_Price', 0)
-            ctk.CTkLabel(scroll_frame, text=f"{self.config['currency']}{cost_price:,.2f}",
-                        width=col_widths[4]).grid(row=row_idx, column=4, padx=5, pady=2, sticky="w")
-
-            # Margin %
+        def margin_color(product):
             margin = product.get('Margin_Percentage', 0)
-            margin_color = "green" if margin >= 30 else "orange" if margin >= 10 else "red"
-            margin_text = f"{margin:.1f}%" if pd.notna(margin) else "N/A"
-            ctk.CTkLabel(scroll_frame, text=margin_text, text_color=margin_color,
-                        width=col_widths[5]).grid(row=row_idx, column=5, padx=5, pady=2, sticky="w")
-
-            # Status
-            is_active = str(product.get('Active', 'Yes')).upper() == 'YES'
-            status_text = "Active" if is_active else "Inactive"
-            status_color = "green" if is_active else "red"
-
-            status_frame = ctk.CTkFrame(scroll_frame, width=col_widths[6]-10,
-                                       height=25, corner_radius=10,
-                                       fg_color=status_color)
-            status_frame.grid(row=row_idx, column=6, padx=5, pady=2)
-            status_frame.pack_propagate(False)
-            ctk.CTkLabel(status_frame, text=status_text,
-                        text_color="white", font=("Arial", 10)).pack(expand=True)
-
-            # Action buttons
-            action_frame = ctk.CTkFrame(scroll_frame, width=col_widths[7], fg_color="transparent")
-            action_frame.grid(row=row_idx, column=7, padx=5, pady=2)
-
-            # View Recipe button
-            ctk.CTkButton(
-                action_frame,
-                text="📝 Recipe",
-                command=lambda pid=product['Product_ID']: self.view_product_recipe(pid),
-                width=60,
-                height=25,
-                font=("Arial", 10)
-            ).pack(side="left", padx=2)
-
-            # Edit button
-            ctk.CTkButton(
-                action_frame,
-                text="✏️ Edit",
-                command=lambda pid=product['Product_ID']: self.edit_product_better_popup(pid),
-                width=60,
-                height=25,
-                font=("Arial", 10)
-            ).pack(side="left", padx=2)
+            return "green" if margin >= 30 else "orange" if margin >= 10 else "red"
+
+        def is_active(product):
+            return str(product.get('Active', 'Yes')).upper() == 'YES'
+
+        columns = [
+            {'header': "ID", 'width': 80, 'value': 'Product_ID'},
+            {'header': "Product Name", 'width': 200, 'value': 'Product_Name'},
+            {'header': "Category", 'width': 120,
+             'value': lambda product: product.get('Category', 'N/A')},
+            {'header': "Selling Price", 'width': 100,
+             'value': lambda product: f"{currency}{product.get('Selling_Price', 0):,.2f}"},
+            {'header': "Cost Price", 'width': 100,
+             'value': lambda product: f"{currency}{product.get('Cost_Price', 0):,.2f}"},
+            {'header': "Margin %", 'width': 80,
+             'value': lambda product: (f"{product.get('Margin_Percentage', 0):.1f}%"
+                                       if pd.notna(product.get('Margin_Percentage', 0)) else "N/A"),
+             'text_color': margin_color},
+            {'header': "Status", 'width': 80, 'anchor': "center", 'font': ("Arial", 10),
+             'value': lambda product: "Active" if is_active(product) else "Inactive",
+             'badge': lambda product: "green" if is_active(product) else "red"},
+            {'header': "Actions", 'width': 140, 'buttons': [
+                {'text': "📝 Recipe", 'width': 60,
+                 'command': lambda product: self.view_product_recipe(product['Product_ID'])},
+                {'text': "✏️ Edit", 'width': 60,
+                 'command': lambda product: self.edit_product_better_popup(product['Product_ID'])}
+            ]}
+        ]
+
+        table = VirtualTable(self.products_table_frame, columns, products_df, height=400)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
 
     def edit_product_better_popup(self, product_id):
         """Improved popup for editing products with delete options"""
@@ -533,6 +494,18 @@ class ProductsGUI:
         delete_buttons_frame.pack(pady=10, padx=20)
 
         # ===== BUTTON FUNCTIONS =====
+        def finish_action(result, success_title="Success", error_title="Error"):
+            """Show the outcome of a status change or deletion"""
+            success, message = result
+            if success:
+                messagebox.showinfo(success_title, message)
+                # Refresh table and close popup
+                self.refresh_products_table()
+                if popup.winfo_exists():
+                    popup.destroy()
+            else:
+                messagebox.showerror(error_title, message)
+
         def mark_inactive():
             """Mark product as inactive (soft delete)"""
             confirm = messagebox.askyesno("Mark as Inactive",
@@ -542,14 +515,7 @@ class ProductsGUI:
                                         "• Keep in database\n"
                                         "• Can be reactivated later")
             if confirm:
-                success, message = self.db.mark_product_inactive(product_id)
-                if success:
-                    messagebox.showinfo("Success", message)
-                    # Refresh table and close popup
-                    self.refresh_products_table()
-                    popup.destroy()
-                else:
-                    messagebox.showerror("Error", message)
+                run_save(self, finish_action, 'mark_product_inactive', product_id)
 
         def delete_permanently():
             """Permanently delete product from database"""
@@ -588,17 +554,8 @@ class ProductsGUI:
                         return
 
                 # Perform deletion
-                success, message = self.db.delete_product_permanently(product_id)
-
-                if success:
-                    messagebox.showinfo("✅ Success", message)
-                    # Update product costs
-                    self.db.update_all_product_costs()
-                    # Refresh table and close
-                    self.refresh_products_table()
-                    popup.destroy()
-                else:
-                    messagebox.showerror("❌ Error", message)
+                run_save(self, lambda result: finish_action(result, "✅ Success", "❌ Error"),
+                         'delete_product_permanently', product_id)
 
             except Exception as e:
                 messagebox.showerror("Error", f"Deletion failed: {str(e)}")
@@ -609,14 +566,7 @@ class ProductsGUI:
                                         f"Reactivate '{product_name}'?\n\n"
                                         "This will make it available for sale again.")
             if confirm:
-                success, message = self.db.reactivate_product(product_id)
-                if success:
-                    messagebox.showinfo("Success", message)
-                    # Refresh table and close
-                    self.refresh_products_table()
-                    popup.destroy()
-                else:
-                    messagebox.showerror("Error", message)
+                run_save(self, finish_action, 'reactivate_product', product_id)
 
         # ===== CREATE DELETE BUTTONS =====
         button_width = 140
@@ -689,24 +639,35 @@ class ProductsGUI:
                 updated_data['Notes'] = notes_text.get("1.0", "end-1c").strip()
 
                 # Update in database
-                success, message = self.db.update_product(product_id, updated_data)
+                status_label.configure(text="⏳ Saving...", text_color="orange")
+                run_save(self, finish_save, update_product, updated_data)
 
-                if success:
-                    status_label.configure(text=f"✅ {message}", text_color="green")
-
-                    # Update product costs
-                    self.db.update_all_product_costs()
+            except Exception as e:
+                status_label.configure(text=f"Error: {str(e)}", text_color="red")
 
-                    # Refresh the products table
-                    self.refresh_products_table()
+        def update_product(updated_data):
+            """Save the product and its recipe cost (runs on the database thread)"""
+            result = self.db.update_product(product_id, updated_data)
+            if result[0]:
+                # Update product costs
+                self.db.update_product_costs([product_id])
+            return result
 
-                    # Close popup after 1.5 seconds
-                    popup.after(1500, popup.destroy)
-                else:
-                    status_label.configure(text=f"❌ {message}", text_color="red")
+        def finish_save(result):
+            success, message = result
+            if success:
+                # Refresh the products table
+                self.refresh_products_table()
+            # The popup may have been closed while saving
+            if not popup.winfo_exists():
+                return
+            if success:
+                status_label.configure(text=f"✅ {message}", text_color="green")
 
-            except Exception as e:
-                status_label.configure(text=f"Error: {str(e)}", text_color="red")
+                # Close popup after 1.5 seconds
+                popup.after(1500, popup.destroy)
+            else:
+                status_label.configure(text=f"❌ {message}", text_color="red")
 
         # Top row: Save and Cancel
         top_row = ctk.CTkFrame(buttons_frame, fg_color="transparent")
@@ -893,7 +854,7 @@ class ProductsGUI:
         form_frame = ctk.CTkFrame(parent_frame)
         form_frame.pack(pady=20, padx=50, fill="x")
 
-        # Auto-generate ID
+        # Preview the next ID (the database assigns it when the row is saved)
         new_id = self.db.generate_product_id()
         ctk.CTkLabel(form_frame, text=f"Product ID: {new_id}",
                     font=("Arial", 14, "bold")).pack(pady=5)
@@ -1010,7 +971,6 @@ class ProductsGUI:
         try:
             # Get form data
             product_data = {
-                'Product_ID': self.generated_product_id,
                 'Product_Name': self.product_form_entries['product_name'].get(),
                 'Category': self.category_dropdown_var.get(),  # Changed to use dropdown value
                 'Selling_Price': float(self.product_form_entries['selling_price'].get()),
@@ -1030,25 +990,8 @@ class ProductsGUI:
                 return
 
             # Save to database
-            success, message = self.db.add_product(product_data)
-
-            if success:
-                self.product_form_status.configure(text=f"✅ {message}", text_color="green")
-                # Clear form
-                self.clear_product_form()
-                # Generate new ID for next product
-                new_id = self.db.generate_product_id()
-                self.generated_product_id = new_id
-
-                # Refresh products table if it exists
-                if hasattr(self, 'products_table_frame'):
-                    self.refresh_products_table()
-
-                # Update product costs
-                self.db.update_all_product_costs()
-
-            else:
-                self.product_form_status.configure(text=f"❌ {message}", text_color="red")
+            self.product_form_status.configure(text="⏳ Saving product...", text_color="orange")
+            run_save(self, self.finish_add_product, 'add_product', product_data)
 
         except ValueError as e:
             self.product_form_status.configure(text=f"Invalid number format: {str(e)}",
@@ -1057,6 +1000,28 @@ class ProductsGUI:
             self.product_form_status.configure(text=f"Error: {str(e)}",
                                              text_color="red")
 
+    def finish_add_product(self, result):
+        """Show the outcome of saving the product form"""
+        success, message = result
+        # The screen may have been left while saving
+        if not self.product_form_status.winfo_exists():
+            return
+
+        if success:
+            self.product_form_status.configure(text=f"✅ {message}", text_color="green")
+            # Clear form
+            self.clear_product_form()
+            # Preview the ID for the next product
+            new_id = self.db.generate_product_id()
+            self.generated_product_id = new_id
+
+            # Refresh products table if it exists
+            if hasattr(self, 'products_table_frame'):
+                self.refresh_products_table()
+
+        else:
+            self.product_form_status.configure(text=f"❌ {message}", text_color="red")
+
     def clear_product_form(self):
         """Clear the product form"""
         for entry in self.product_form_entries.values():
@@ -1070,7 +1035,7 @@ class ProductsGUI:
 
         self.product_notes_text.delete("1.0", "end")
 
-        # Generate new ID
+        # Preview the next ID
         new_id = self.db.generate_product_id()
         self.generated_product_id = new_id
 
@@ -3,12 +3,16 @@ import customtkinter as ctk
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox
+from modules.db_worker import run_save
 
 class RecipesGUI:
-    def __init__(self, window, db, config):
+    def __init__(self, window, db, config, async_db=None):
         self.window = window
         self.db = db
         self.config = config
+        # Optional AsyncDB: saves and cost updates run off the UI thread when available
+        self.async_db = async_db
+        self.save_in_progress = False
         self.main_content = None
     
     def clear_main_content(self):
@@ -16,6 +20,13 @@ class RecipesGUI:
             for widget in self.main_content.winfo_children():
                 widget.destroy()
     
+    def save_recipe_and_costs(self, product_id, recipe_items):
+        """Save a recipe and update the product's cost (runs on the database thread)"""
+        if not self.db.save_recipe(product_id, recipe_items):
+            return False, "Failed to save recipe"
+        self.db.update_product_costs([product_id])
+        return True, "Recipe saved"
+    
     def show_recipes(self, main_content_frame):
         self.main_content = main_content_frame
         self.clear_main_content()
@@ -561,26 +572,29 @@ class RecipesGUI:
                                          text_color="red")
                     return
                 
-                # Save the recipe
-                success = self.db.save_recipe(product_id, recipe_items)
-                
-                if success:
-                    status_label.configure(text="✅ Recipe updated successfully!", text_color="green")
-                    
-                    # Update product costs
-                    self.db.update_all_product_costs()
-                    
-                    # Refresh recipes view
-                    self.refresh_all_recipes()
-                    
-                    # Close popup after 2 seconds
-                    popup.after(2000, popup.destroy)
-                else:
-                    status_label.configure(text="❌ Failed to update recipe", text_color="red")
+                # Save the recipe and update product costs
+                status_label.configure(text="⏳ Saving recipe...", text_color="orange")
+                run_save(self, finish_save, self.save_recipe_and_costs, product_id, recipe_items)
                     
             except Exception as e:
                 status_label.configure(text=f"Error: {str(e)}", text_color="red")
         
+        def finish_save(result):
+            success, _ = result
+            if success:
+                # Refresh recipes view
+                self.refresh_all_recipes()
+            # The popup may have been closed while saving
+            if not popup.winfo_exists():
+                return
+            if success:
+                status_label.configure(text="✅ Recipe updated successfully!", text_color="green")
+                
+                # Close popup after 2 seconds
+                popup.after(2000, popup.destroy)
+            else:
+                status_label.configure(text="❌ Failed to update recipe", text_color="red")
+        
         # Action buttons
         action_frame = ctk.CTkFrame(main_container)
         action_frame.pack(pady=20, padx=10)
@@ -869,23 +883,28 @@ class RecipesGUI:
                     if not confirm:
                         return
                 
-                # Save recipe
-                success = self.db.save_recipe(product_id, recipe_items)
-                
-                if success:
-                    status_label.configure(text="✅ Recipe saved!", text_color="green")
-                    # Update costs
-                    self.db.update_all_product_costs()
-                    # Refresh recipes view
-                    self.refresh_all_recipes()
-                    # Close popup after 2 seconds
-                    popup.after(2000, popup.destroy)
-                else:
-                    status_label.configure(text="❌ Failed to save", text_color="red")
+                # Save recipe and update costs
+                status_label.configure(text="⏳ Saving recipe...", text_color="orange")
+                run_save(self, finish_save, self.save_recipe_and_costs, product_id, recipe_items)
                     
             except Exception as e:
                 status_label.configure(text=f"Error: {str(e)}", text_color="red")
         
+        def finish_save(result):
+            success, _ = result
+            if success:
+                # Refresh recipes view
+                self.refresh_all_recipes()
+            # The popup may have been closed while saving
+            if not popup.winfo_exists():
+                return
+            if success:
+                status_label.configure(text="✅ Recipe saved!", text_color="green")
+                # Close popup after 2 seconds
+                popup.after(2000, popup.destroy)
+            else:
+                status_label.configure(text="❌ Failed to save", text_color="red")
+        
         # Buttons
         button_frame = ctk.CTkFrame(popup)
         button_frame.pack(pady=20)
@@ -921,6 +940,8 @@ class RecipesGUI:
         if not hasattr(self, 'recipes_display_container') or self.recipes_display_container is None:
             print("⚠️ recipes_display_container not initialized yet")
             return
+        if not self.recipes_display_container.winfo_exists():
+            return
         
         # Clear existing display
         for widget in self.recipes_display_container.winfo_children():
@@ -1138,12 +1159,17 @@ class RecipesGUI:
         confirm = messagebox.askyesno("Delete Recipe", 
                                      f"Delete recipe for {product_id}?")
         if confirm:
-            success = self.db.save_recipe(product_id, [])
-            if success:
-                messagebox.showinfo("Success", "Recipe deleted")
-                self.refresh_all_recipes()
-            else:
-                messagebox.showerror("Error", "Failed to delete")
+            run_save(self, self.finish_delete_recipe,
+                     lambda: (self.db.save_recipe(product_id, []), "Recipe deleted"))
+    
+    def finish_delete_recipe(self, result):
+        """Show the outcome of deleting a recipe"""
+        success, _ = result
+        if success:
+            messagebox.showinfo("Success", "Recipe deleted")
+            self.refresh_all_recipes()
+        else:
+            messagebox.showerror("Error", "Failed to delete")
     
     def create_recipe_form(self, parent_frame):
         """Create Recipe tab form"""
@@ -1228,8 +1254,22 @@ class RecipesGUI:
                         font=("Arial", 14)).pack(pady=50)
             return
         
-        # Update costs for all products
-        products_df = self.db.update_all_product_costs()
+        if self.async_db is None:
+            self.show_costs(self.db.update_all_product_costs())
+            return
+        
+        # Update costs for all products in the background
+        ctk.CTkLabel(self.cost_analysis_frame, text="⏳ Calculating costs...",
+                    font=("Arial", 14)).pack(pady=50)
+        self.async_db.write('update_all_product_costs', on_done=self.show_costs,
+                            on_error=lambda e: self.show_costs(pd.DataFrame()))
+    
+    def show_costs(self, products_df):
+        """Show the cost analysis of products updated by update_all_product_costs"""
+        if not self.cost_analysis_frame.winfo_exists():
+            return
+        for widget in self.cost_analysis_frame.winfo_children():
+            widget.destroy()
         
         if products_df.empty:
             ctk.CTkLabel(self.cost_analysis_frame, 
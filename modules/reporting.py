@@ -0,0 +1,118 @@
+# modules/reporting.py - Report calculations shared by the GUI screens
+import pandas as pd
+
+from modules.schema import empty_tab
+
+
+def profit_loss(sales_df, product_costs):
+    """
+    Compute revenue, COGS and profit for a set of sales
+
+    Unit costs are looked up once per product and joined to the sales;
+    all totals come from column arithmetic.
+
+    Args:
+        sales_df: Sales rows (Product_ID, Quantity, Total_Amount)
+        product_costs: Series of unit cost indexed by Product_ID
+
+    Returns:
+        Dictionary with total_revenue, total_cogs, gross_profit,
+        gross_margin and by_product (DataFrame with Product_ID, Quantity,
+        Revenue, COGS and Profit, most profitable first)
+    """
+    quantity = pd.to_numeric(sales_df['Quantity'], errors='coerce').fillna(0.0)
+    revenue = pd.to_numeric(sales_df['Total_Amount'], errors='coerce').fillna(0.0)
+    unit_cost = sales_df['Product_ID'].map(product_costs).fillna(0.0).astype('float64')
+
+    lines = pd.DataFrame({
+        'Product_ID': sales_df['Product_ID'],
+        'Quantity': quantity,
+        'Revenue': revenue,
+        'COGS': unit_cost * quantity
+    })
+    lines['Profit'] = lines['Revenue'] - lines['COGS']
+
+    by_product = (lines.groupby('Product_ID', sort=False, dropna=False)
+                  [['Quantity', 'Revenue', 'COGS', 'Profit']].sum()
+                  .reset_index()
+                  .sort_values('Profit', ascending=False, kind='stable')
+                  .reset_index(drop=True))
+
+    total_revenue = float(lines['Revenue'].sum())
+    total_cogs = float(lines['COGS'].sum())
+    gross_profit = total_revenue - total_cogs
+    return {
+        'total_revenue': total_revenue,
+        'total_cogs': total_cogs,
+        'gross_profit': gross_profit,
+        'gross_margin': (gross_profit / total_revenue * 100) if total_revenue > 0 else 0,
+        'by_product': by_product
+    }
+
+
+def rollup_key(sale_date, product_id):
+    """Key of the Sales_Daily row for a date and product"""
+    return f"{sale_date}|{product_id}"
+
+
+def build_sales_rollup(sales_df):
+    """
+    Aggregate Sales rows into Sales_Daily rows
+
+    Args:
+        sales_df: Sales rows (Sale_Date, Product_ID, Quantity, Total_Amount)
+
+    Returns:
+        DataFrame with one row per (Sale_Date, Product_ID): Rollup_Key,
+        Sale_Date ('YYYY-MM-DD'), Product_ID, Quantity, Total_Amount, Transactions
+    """
+    if sales_df.empty or 'Sale_Date' not in sales_df.columns:
+        return empty_tab('Sales_Daily')
+
+    dates = pd.to_datetime(sales_df['Sale_Date'], errors='coerce').dt.strftime("%Y-%m-%d")
+    lines = pd.DataFrame({
+        # Unparseable dates keep their text so no sale drops out of the totals
+        'Sale_Date': dates.fillna(sales_df['Sale_Date'].astype(str)),
+        'Product_ID': sales_df['Product_ID'],
+        'Quantity': pd.to_numeric(sales_df['Quantity'], errors='coerce').fillna(0.0),
+        'Total_Amount': pd.to_numeric(sales_df['Total_Amount'], errors='coerce').fillna(0.0)
+    })
+    rollup = (lines.groupby(['Sale_Date', 'Product_ID'], dropna=False)
+              .agg(Quantity=('Quantity', 'sum'),
+                   Total_Amount=('Total_Amount', 'sum'),
+                   Transactions=('Quantity', 'size'))
+              .reset_index())
+    rollup['Transactions'] = rollup['Transactions'].astype('float64')
+    rollup.insert(0, 'Rollup_Key', [rollup_key(date, product_id) for date, product_id
+                                    in zip(rollup['Sale_Date'], rollup['Product_ID'])])
+    return rollup
+
+
+def sales_by_period(rollup_df, freq='D'):
+    """
+    Total Sales_Daily rows per day, week or month
+
+    Args:
+        rollup_df: Sales_Daily rows
+        freq: 'D' (YYYY-MM-DD), 'W' (Monday of the week, YYYY-MM-DD) or 'M' (YYYY-MM)
+
+    Returns:
+        DataFrame with Period, Quantity, Total_Amount and Transactions, oldest first
+    """
+    columns = ['Period', 'Quantity', 'Total_Amount', 'Transactions']
+    if rollup_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    dates = pd.to_datetime(rollup_df['Sale_Date'], errors='coerce')
+    if freq == 'W':
+        period = (dates - pd.to_timedelta(dates.dt.weekday, unit='D')).dt.strftime("%Y-%m-%d")
+    elif freq == 'M':
+        period = dates.dt.strftime("%Y-%m")
+    else:
+        period = dates.dt.strftime("%Y-%m-%d")
+
+    totals = (rollup_df.assign(Period=period)
+              .groupby('Period')[['Quantity', 'Total_Amount', 'Transactions']].sum()
+              .reset_index()
+              .sort_values('Period'))
+    return totals[columns].reset_index(drop=True)
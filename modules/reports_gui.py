@@ -4,12 +4,16 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime, timedelta
+from modules.partitions import period_bounds, range_mask
+from modules.reporting import profit_loss
 
 class ReportsGUI:
-    def __init__(self, window, db, config):
+    def __init__(self, window, db, config, async_db=None):
         self.window = window
         self.db = db
         self.config = config
+        # Optional AsyncDB: report data is loaded off the UI thread when available
+        self.async_db = async_db
         self.main_content = None
     
     def clear_main_content(self):
@@ -120,8 +124,8 @@ class ReportsGUI:
         for widget in self.sales_report_frame.winfo_children():
             widget.destroy()
         
-        # Get sales data
-        sales_df = self.db.read_tab('Sales')
+        # Daily per-product sales totals
+        sales_df = self.db.get_sales_rollup()
         
         if sales_df.empty:
             ctk.CTkLabel(self.sales_report_frame, 
@@ -152,7 +156,7 @@ class ReportsGUI:
         
         # Calculate summary statistics
         total_revenue = filtered_sales['Total_Amount'].sum()
-        total_transactions = len(filtered_sales)
+        total_transactions = int(filtered_sales['Transactions'].sum())
         total_quantity = filtered_sales['Quantity'].sum()
         avg_sale_amount = total_revenue / total_transactions if total_transactions > 0 else 0
         
@@ -221,9 +225,8 @@ class ReportsGUI:
             daily_sales = filtered_sales.groupby('Sale_Date').agg({
                 'Quantity': 'sum',
                 'Total_Amount': 'sum',
-                'Sale_ID': 'count'
+                'Transactions': 'sum'
             }).reset_index()
-            daily_sales = daily_sales.rename(columns={'Sale_ID': 'Transactions'})
             daily_sales = daily_sales.sort_values('Sale_Date')
             
             daily_frame = ctk.CTkFrame(parent_frame)
@@ -235,7 +238,7 @@ class ReportsGUI:
             if len(daily_sales) <= 10:
                 # Show full table for small number of days
                 for _, day in daily_sales.iterrows():
-                    day_text = f"{day['Sale_Date']}: {day['Transactions']} sales, {day['Quantity']} units, {self.config['currency']}{day['Total_Amount']:,.2f}"
+                    day_text = f"{day['Sale_Date']}: {day['Transactions']:.0f} sales, {day['Quantity']} units, {self.config['currency']}{day['Total_Amount']:,.2f}"
                     ctk.CTkLabel(daily_frame, text=day_text,
                                 font=("Arial", 11)).pack(anchor="w", padx=20, pady=2)
             else:
@@ -256,46 +259,11 @@ class ReportsGUI:
             return df
         
         try:
+            start, end = period_bounds(period, custom_from, custom_to)
             df['Sale_Date'] = pd.to_datetime(df['Sale_Date'])
-            
-            if period == "Today":
-                today = datetime.now().strftime("%Y-%m-%d")
-                return df[df['Sale_Date'].dt.strftime("%Y-%m-%d") == today]
-            
-            elif period == "Yesterday":
-                yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-                return df[df['Sale_Date'].dt.strftime("%Y-%m-%d") == yesterday]
-            
-            elif period == "Last 7 days":
-                cutoff = datetime.now() - timedelta(days=7)
-                return df[df['Sale_Date'] >= cutoff]
-            
-            elif period == "Last 30 days":
-                cutoff = datetime.now() - timedelta(days=30)
-                return df[df['Sale_Date'] >= cutoff]
-            
-            elif period == "This Month":
-                now = datetime.now()
-                start_of_month = datetime(now.year, now.month, 1)
-                return df[df['Sale_Date'] >= start_of_month]
-            
-            elif period == "Last Month":
-                now = datetime.now()
-                if now.month == 1:
-                    start_last = datetime(now.year - 1, 12, 1)
-                    end_last = datetime(now.year, 1, 1)
-                else:
-                    start_last = datetime(now.year, now.month - 1, 1)
-                    end_last = datetime(now.year, now.month, 1)
-                return df[(df['Sale_Date'] >= start_last) & (df['Sale_Date'] < end_last)]
-            
-            elif period == "Custom" and custom_from and custom_to:
-                from_date = pd.to_datetime(custom_from)
-                to_date = pd.to_datetime(custom_to)
-                return df[(df['Sale_Date'] >= from_date) & (df['Sale_Date'] <= to_date)]
-            
-            else:
+            if start is None and end is None:
                 return df
+            return df[range_mask(df['Sale_Date'], start, end)]
                 
         except Exception as e:
             print(f"Error filtering data: {e}")
@@ -311,8 +279,8 @@ class ReportsGUI:
     def export_sales_report_to_excel(self):
         """Export sales report to Excel"""
         try:
-            # Get sales data
-            sales_df = self.db.read_tab('Sales')
+            # Get sales data, archived rows included
+            sales_df = self.db.read_range('Sales')
             
             if sales_df.empty:
                 messagebox.showwarning("No Data", "No sales data to export.")
@@ -797,57 +765,50 @@ class ReportsGUI:
     
     def generate_profit_loss_report(self, parent_frame):
         """Generate profit and loss report"""
-        # Clear existing report
+        period = self.pl_period_var.get()
+        
+        if self.async_db is None:
+            self.show_profit_loss_statement(period, self.load_profit_loss(period))
+            return
+        
+        # Clear existing report and calculate in the background
         for widget in self.pl_report_frame.winfo_children():
             widget.destroy()
+        ctk.CTkLabel(self.pl_report_frame, text="⏳ Calculating profit & loss...",
+                    font=("Arial", 14)).pack(pady=50)
+        self.async_db.read(self.load_profit_loss, period,
+                           on_done=lambda pl: self.show_profit_loss_statement(period, pl))
+    
+    def load_profit_loss(self, period):
+        """Compute P&L figures for a period, or return a message if there is no data"""
+        # Get sales data for the period (only its monthly partitions are read)
+        start, end = period_bounds(period)
+        filtered_sales = self.db.read_range('Sales', start, end)
         
-        # Get sales data for the period
-        sales_df = self.db.read_tab('Sales')
+        if filtered_sales.empty:
+            return f"No sales data for {period.lower()}."
         
-        if sales_df.empty:
-            ctk.CTkLabel(self.pl_report_frame, 
-                        text="No sales data available for P&L calculation.",
-                        font=("Arial", 14)).pack(pady=50)
+        # Revenue, cost of goods sold (COGS) and profit from recipe unit costs
+        return profit_loss(filtered_sales, self.db.get_product_costs())
+    
+    def show_profit_loss_statement(self, period, pl):
+        """Display P&L figures computed by load_profit_loss"""
+        if not self.pl_report_frame.winfo_exists():
             return
         
-        # Filter sales by period
-        period = self.pl_period_var.get()
-        filtered_sales = self.filter_data_by_period(sales_df, period)
+        # Clear existing report
+        for widget in self.pl_report_frame.winfo_children():
+            widget.destroy()
         
-        if filtered_sales.empty:
-            ctk.CTkLabel(self.pl_report_frame, 
-                        text=f"No sales data for {period.lower()}.",
+        if isinstance(pl, str):
+            ctk.CTkLabel(self.pl_report_frame, text=pl,
                         font=("Arial", 14)).pack(pady=50)
             return
         
-        # Calculate total revenue
-        total_revenue = filtered_sales['Total_Amount'].sum()
-        
-        # Calculate cost of goods sold (COGS)
-        # For each sale, calculate the cost based on recipe
-        total_cogs = 0
-        cogs_details = []
-        
-        for _, sale in filtered_sales.iterrows():
-            product_id = sale['Product_ID']
-            quantity = sale['Quantity']
-            
-            # Get product cost
-            product_cost = self.db.calculate_product_cost(product_id)
-            sale_cogs = product_cost * quantity
-            total_cogs += sale_cogs
-            
-            cogs_details.append({
-                'product_id': product_id,
-                'quantity': quantity,
-                'revenue': sale['Total_Amount'],
-                'cogs': sale_cogs,
-                'profit': sale['Total_Amount'] - sale_cogs
-            })
-        
-        # Calculate gross profit
-        gross_profit = total_revenue - total_cogs
-        gross_margin = (gross_profit / total_revenue * 100) if total_revenue > 0 else 0
+        total_revenue = pl['total_revenue']
+        total_cogs = pl['total_cogs']
+        gross_profit = pl['gross_profit']
+        gross_margin = pl['gross_margin']
         
         # Display P&L statement
         pl_frame = ctk.CTkFrame(self.pl_report_frame, border_width=2, 
@@ -896,33 +857,14 @@ class ReportsGUI:
                     text_color=gp_color).pack(pady=2)
         
         # Product-level profitability
-        if cogs_details:
+        if not pl['by_product'].empty:
             ctk.CTkLabel(pl_frame, text="📋 Product Profitability", 
                         font=("Arial", 14, "bold")).pack(pady=(20, 10))
             
-            # Create a simple summary
-            product_summary = {}
-            for detail in cogs_details:
-                pid = detail['product_id']
-                if pid not in product_summary:
-                    product_summary[pid] = {
-                        'revenue': 0,
-                        'cogs': 0,
-                        'profit': 0,
-                        'quantity': 0
-                    }
-                product_summary[pid]['revenue'] += detail['revenue']
-                product_summary[pid]['cogs'] += detail['cogs']
-                product_summary[pid]['profit'] += detail['profit']
-                product_summary[pid]['quantity'] += detail['quantity']
-            
             # Display top 5 products by profit
-            top_products = sorted(product_summary.items(), 
-                                 key=lambda x: x[1]['profit'], reverse=True)[:5]
-            
-            for pid, data in top_products:
-                profit_color = "green" if data['profit'] >= 0 else "red"
-                product_text = f"{pid}: {data['quantity']} sold, Profit: {self.config['currency']}{data['profit']:,.2f}"
+            for _, data in pl['by_product'].head(5).iterrows():
+                profit_color = "green" if data['Profit'] >= 0 else "red"
+                product_text = f"{data['Product_ID']}: {data['Quantity']} sold, Profit: {self.config['currency']}{data['Profit']:,.2f}"
                 ctk.CTkLabel(pl_frame, text=product_text,
                             text_color=profit_color,
                             font=("Arial", 11)).pack(anchor="w", padx=30, pady=2)
@@ -983,8 +925,9 @@ class ReportsGUI:
                 'Products': self.db.read_tab('Products'),
                 'Ingredients': self.db.read_tab('Ingredients'),
                 'Recipes': self.db.read_tab('Recipes'),
-                'Sales': self.db.read_tab('Sales'),
-                'Inventory_Logs': self.db.read_tab('Inventory_Log')
+                # History tabs include their archived rows
+                'Sales': self.db.read_range('Sales'),
+                'Inventory_Logs': self.db.read_range('Inventory_Log')
             }
             
             # Check if we have any data
@@ -0,0 +1,75 @@
+# modules/row_window.py - Which rows a virtual table shows, and which pooled rows to refill (no Tk needed)
+import math
+
+
+def visible_row_count(height, row_height, scaling=1.0):
+    """Number of rows needed to fill a viewport of `height` pixels (at least 1)"""
+    return max(1, math.ceil(height / (row_height * scaling)))
+
+
+def clamp_first_row(first_row, total, visible):
+    """
+    Keep the first shown row within the data
+
+    The last page may end one row short of a full viewport, so the final
+    row is never hidden behind a partly visible bottom row.
+    """
+    last_start = max(0, total - visible + 1)
+    return min(max(0, int(first_row)), last_start)
+
+
+def plan_rows(shown_indices, first_row, total, visible, force=False):
+    """
+    Work out how to recycle pooled rows for a scroll position
+
+    Args:
+        shown_indices: Data index each pooled row holds (None when hidden);
+                       the pool grows to `visible` rows first
+        first_row: Index of the first row in view (already clamped)
+        total: Number of data rows
+        visible: Number of rows that fit in the viewport
+        force: Refill every row in view even if it already holds its index
+
+    Returns:
+        (fills, hides): fills is a list of (slot, index) for pooled rows
+        that need new data, hides a list of slots to take off screen
+    """
+    fills = []
+    hides = []
+    for slot in range(max(len(shown_indices), visible)):
+        current = shown_indices[slot] if slot < len(shown_indices) else None
+        index = first_row + slot
+        if slot >= visible or index >= total:
+            if current is not None:
+                hides.append(slot)
+        elif force or current != index:
+            fills.append((slot, index))
+    return fills, hides
+
+
+def scrollbar_range(first_row, total, visible):
+    """Scrollbar (first, last) fractions for the rows in view"""
+    if total <= visible:
+        return 0.0, 1.0
+    return first_row / total, min(1.0, (first_row + visible) / total)
+
+
+def scroll_target(first_row, total, action, value, unit=None, visible=1):
+    """Row a scrollbar command ('moveto' fraction or 'scroll' steps) asks for"""
+    if action == 'moveto':
+        return float(value) * total
+    if action == 'scroll':
+        step = visible if unit == 'pages' else 1
+        return first_row + int(value) * step
+    return first_row
+
+
+def wheel_steps(num, delta):
+    """Rows-per-notch units of a mouse wheel event (X11 buttons 4/5 or a delta)"""
+    if num == 4:
+        return -1
+    if num == 5:
+        return 1
+    if abs(delta) >= 120:
+        return -int(delta / 120)
+    return -delta
@@ -4,18 +4,31 @@ import pandas as pd
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime, timedelta
+from modules.virtual_table import VirtualTable
+from modules.reporting import sales_by_period
+from modules.product_cards import ProductCardPool
 
 class SalesGUI:
-    def __init__(self, window, db, config):
+    def __init__(self, window, db, config, async_db=None):
         self.window = window
         self.db = db
         self.config = config
+        # Optional AsyncDB: checkout runs off the UI thread when available
+        self.async_db = async_db
         self.main_content = None
         self.sale_cart = []
         self.cart_total = 0
+        self.checkout_in_progress = False
+        
+        # Pooled cards of the sale grid and the search index they were last synced with
+        self.product_cards = None
+        self.cards_index = None
+        self.search_job = None
+        self.sale_screen_frame = None
         
         # Constants
         self.VAT_RATE = 0.12  # 12% VAT
+        self.SEARCH_DEBOUNCE_MS = 150  # Wait for a pause in typing before filtering
     
     def clear_main_content(self):
         """Clear the main content area"""
@@ -98,16 +111,7 @@ class SalesGUI:
                     font=("Arial", 12)).pack(side="left", padx=5)
         
         # Get categories from products
-        products_df = self.db.get_all_products()
-        categories = ["All Categories"]
-        
-        if not products_df.empty and 'Category' in products_df.columns:
-            unique_cats = products_df['Category'].dropna().unique()
-            for cat in unique_cats:
-                if cat and str(cat).strip() and str(cat).strip().lower() != 'nan':
-                    categories.append(str(cat).strip())
-        
-        categories = sorted(list(set(categories)))
+        categories = sorted(["All Categories"] + self.db.get_product_search_index().categories())
         
         self.sale_category_var = tk.StringVar(value="All Categories")
         category_menu = ctk.CTkOptionMenu(category_row,
@@ -130,9 +134,14 @@ class SalesGUI:
                      fg_color="#95a5a6", hover_color="#7f8c8d",
                      width=120).pack(side="left", padx=5)
         
-        # Product grid frame
-        self.products_grid_frame = ctk.CTkScrollableFrame(left_frame, height=350)
-        self.products_grid_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Product grid: one card per product for the whole session, reused by
+        # every filter and visit (the grid frame outlives this screen)
+        if self.product_cards is None:
+            self.product_cards = ProductCardPool(self.window, self.config['currency'], self.add_to_cart)
+        self.product_cards.attach(left_frame, self.config['currency'])
+        self.sale_screen_frame = left_frame
+        # Sync on the first filter: refills only what changed while the screen was closed
+        self.cards_index = None
         
         # === RIGHT FRAME: Cart ===
         ctk.CTkLabel(right_frame, text="Shopping Cart", 
@@ -187,48 +196,43 @@ class SalesGUI:
         self.sale_status_label.pack(pady=5)
         
         # Bind search to filter
-        self.sale_search_var.trace('w', lambda *args: self.filter_sale_products())
+        self.sale_search_var.trace('w', lambda *args: self.schedule_sale_filter())
         self.sale_category_var.trace('w', lambda *args: self.filter_sale_products())
         
         # Initial load of products
         self.filter_sale_products()
     
+    def schedule_sale_filter(self):
+        """Filter the product grid once typing pauses for SEARCH_DEBOUNCE_MS"""
+        if self.search_job is not None:
+            self.window.after_cancel(self.search_job)
+        # Scheduled on the window, which outlives the grid when the screen changes
+        self.search_job = self.window.after(self.SEARCH_DEBOUNCE_MS, self.filter_sale_products)
+    
     def filter_sale_products(self):
         """Display products for sale selection"""
-        # Clear existing grid
-        for widget in self.products_grid_frame.winfo_children():
-            widget.destroy()
+        if self.search_job is not None:
+            self.window.after_cancel(self.search_job)
+            self.search_job = None
+        if not self.sale_screen_frame.winfo_exists():
+            return
         
-        # Get all active products
-        products_df = self.db.get_all_products()
+        # Search index of the active products (rebuilt by the database when products change)
+        index = self.db.get_product_search_index()
+        if index is not self.cards_index:
+            self.product_cards.sync(index)
+            self.cards_index = index
         
-        if products_df.empty:
-            ctk.CTkLabel(self.products_grid_frame, 
-                        text="No products available for sale.",
-                        font=("Arial", 12)).pack(pady=50)
+        if len(index) == 0:
+            self.product_cards.show_message("No products available for sale.")
             return
         
         # Apply filters
-        filtered_products = products_df.copy()
-        
-        # Search filter
         search_text = self.sale_search_var.get().lower()
-        if search_text:
-            mask = (filtered_products['Product_Name'].str.lower().str.contains(search_text) |
-                   filtered_products['Product_ID'].str.lower().str.contains(search_text))
-            filtered_products = filtered_products[mask]
-        
-        # Category filter
         selected_category = self.sale_category_var.get()
-        if selected_category != "All Categories":
-            if 'Category' in filtered_products.columns:
-                filtered_products = filtered_products.copy()
-                filtered_products['Category'] = filtered_products['Category'].fillna('')
-                filtered_products['Category'] = filtered_products['Category'].astype(str).str.strip()
-                mask = filtered_products['Category'].str.lower() == selected_category.lower().strip()
-                filtered_products = filtered_products[mask]
-        
-        if filtered_products.empty:
+        matches = index.search(search_text, selected_category)
+        
+        if not matches:
             filter_info = []
             if search_text:
                 filter_info.append(f"Search: '{search_text}'")
@@ -240,69 +244,11 @@ class SalesGUI:
                 no_results_text += f" with filters: {' • '.join(filter_info)}"
             no_results_text += "."
             
-            ctk.CTkLabel(self.products_grid_frame, 
-                        text=no_results_text,
-                        font=("Arial", 12)).pack(pady=50)
+            self.product_cards.show_message(no_results_text)
             return
         
-        # Create product cards grid (2 columns)
-        row = 0
-        col = 0
-        
-        for _, product in filtered_products.iterrows():
-            # Create clickable card frame
-            product_frame = ctk.CTkFrame(self.products_grid_frame, 
-                                        width=160, height=140,
-                                        corner_radius=12,
-                                        border_width=1,
-                                        border_color="gray",
-                                        fg_color="#f8f9fa")
-            product_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            product_frame.pack_propagate(False)
-            
-            # Make entire frame clickable
-            product_frame.bind("<Button-1>", lambda e, p=product: self.add_to_cart(p))
-            
-            # Product name (truncated)
-            product_name = product['Product_Name'][:20] + "..." if len(product['Product_Name']) > 20 else product['Product_Name']
-            name_label = ctk.CTkLabel(product_frame, text=product_name,
-                                    font=("Arial", 12, "bold"),
-                                    wraplength=140,
-                                    text_color="black")
-            name_label.pack(pady=(15, 5), padx=10)
-            name_label.bind("<Button-1>", lambda e, p=product: self.add_to_cart(p))
-            
-            # Price
-            price = product.get('Selling_Price', 0)
-            price_label = ctk.CTkLabel(product_frame, 
-                                      text=f"{self.config['currency']}{price:,.2f}",
-                                      font=("Arial", 14, "bold"),
-                                      text_color="green")
-            price_label.pack(pady=2)
-            price_label.bind("<Button-1>", lambda e, p=product: self.add_to_cart(p))
-            
-            # ID
-            ctk.CTkLabel(product_frame, 
-                        text=f"ID: {product['Product_ID']}",
-                        font=("Arial", 9),
-                        text_color="black").pack(pady=2)
-            
-            # Hover effect
-            product_frame.configure(cursor="hand2")
-            product_frame.bind("<Enter>", lambda e, f=product_frame: f.configure(border_color="#3498db", border_width=2))
-            product_frame.bind("<Leave>", lambda e, f=product_frame: f.configure(border_color="gray", border_width=1))
-            
-            # Double click to add multiple
-            product_frame.bind("<Double-Button-1>", lambda e, p=product: [self.add_to_cart(p), self.add_to_cart(p)])
-            
-            col += 1
-            if col > 1:  # 2 columns per row
-                col = 0
-                row += 1
-        
-        # Configure grid columns
-        self.products_grid_frame.grid_columnconfigure(0, weight=1)
-        self.products_grid_frame.grid_columnconfigure(1, weight=1)
+        # Show the matching cards in a 2-column grid, hide the rest
+        self.product_cards.show(matches)
     
     def clear_sale_filters(self):
         """Clear all sale filters"""
@@ -495,61 +441,80 @@ class SalesGUI:
     
     def process_sale(self):
         """Process the sale and update inventory"""
+        if self.checkout_in_progress:
+            return
         if not self.sale_cart:
             self.sale_status_label.configure(text="Cart is empty", text_color="red")
             return
         
-        success_count = 0
-        failed_items = []
-        total_vat_inclusive = sum(item['price'] * item['quantity'] for item in self.sale_cart)
+        # Items as sold; the cart may still change while the sale is written
+        sold_items = [dict(item) for item in self.sale_cart]
         
-        for item in self.sale_cart:
+        # Record the whole cart in one transaction (sales use VAT-EXCLUSIVE prices)
+        cart_lines = [
+            {
+                'product_id': item['product_id'],
+                'quantity': item['quantity'],
+                'unit_price': item['price_vat_exclusive']
+            }
+            for item in self.sale_cart
+        ]
+        
+        if self.async_db is None:
             try:
-                # Record sale with VAT-EXCLUSIVE price
-                sale_record = self.db.add_sale(
-                    product_id=item['product_id'],
-                    quantity=item['quantity'],
-                    unit_price=item['price_vat_exclusive']
-                )
-                
-                if sale_record:
-                    # Update inventory
-                    success, message = self.db.update_inventory_from_sale(
-                        product_id=item['product_id'],
-                        quantity_sold=item['quantity']
-                    )
-                    
-                    if success:
-                        success_count += 1
-                    else:
-                        failed_items.append(f"{item['name']}: {message}")
-                else:
-                    failed_items.append(f"{item['name']}: Failed to record sale")
-                    
+                result = self.db.process_checkout(cart_lines)
             except Exception as e:
-                failed_items.append(f"{item['name']}: {str(e)}")
+                result = (False, str(e), [])
+            self.finish_sale(result, sold_items)
+            return
+        
+        # Keep the window responsive while the sale is written
+        self.checkout_in_progress = True
+        self.sale_status_label.configure(text="⏳ Processing sale...", text_color="orange")
+        self.async_db.write(
+            'process_checkout', cart_lines,
+            on_done=lambda result: self.finish_sale(result, sold_items),
+            on_error=lambda e: self.finish_sale((False, str(e), []), sold_items)
+        )
+    
+    def finish_sale(self, result, sold_items):
+        """Show the outcome of a checkout"""
+        # Settle the cart before touching any widget: the sales screen may be
+        # gone by now, and sold items left in the cart could be sold twice
+        self.checkout_in_progress = False
+        success, message, _ = result
+        if success:
+            self.remove_sold_items(sold_items)
+        screen_open = self.sale_status_label.winfo_exists()
         
         # Show result
-        if success_count == len(self.sale_cart):
-            receipt_text = f"✅ Sale successful!\nTotal: {self.config['currency']}{total_vat_inclusive:,.2f}"
-            self.sale_status_label.configure(text=receipt_text, text_color="green")
-            
-            # Clear cart after successful sale
-            self.clear_sale_cart()
+        if success:
+            total_vat_inclusive = sum(item['price'] * item['quantity'] for item in sold_items)
+            if screen_open:
+                receipt_text = f"✅ Sale successful!\nTotal: {self.config['currency']}{total_vat_inclusive:,.2f}"
+                self.sale_status_label.configure(text=receipt_text, text_color="green")
+                self.update_cart_display()
             
             # Ask for receipt
             if messagebox.askyesno("Print Receipt", "Print receipt for this sale?"):
-                self.generate_receipt()
-                
-        elif failed_items:
-            error_text = f"⚠️ {success_count}/{len(self.sale_cart)} items processed\n"
-            error_text += "Failed items:\n" + "\n".join(failed_items[:3])
+                self.generate_receipt(sold_items)
+        elif screen_open:
+            error_text = "⚠️ Sale not processed - nothing was recorded\n"
+            error_text += "\n".join(message.splitlines()[:3])
             self.sale_status_label.configure(text=error_text, text_color="red")
-        else:
-            self.sale_status_label.configure(text="No items processed", text_color="orange")
     
-    def generate_receipt(self):
-        """Generate a receipt with proper VAT breakdown"""
+    def remove_sold_items(self, sold_items):
+        """Take the quantities of a completed sale out of the cart (items added meanwhile stay)"""
+        sold = {item['product_id']: item['quantity'] for item in sold_items}
+        remaining = []
+        for item in self.sale_cart:
+            quantity = item['quantity'] - sold.pop(item['product_id'], 0)
+            if quantity > 0:
+                remaining.append(dict(item, quantity=quantity))
+        self.sale_cart = remaining
+    
+    def generate_receipt(self, items=None):
+        """Generate a receipt with proper VAT breakdown (of the cart unless items are given)"""
         try:
             total_vat_inclusive = 0
             total_vat_exclusive = 0
@@ -562,7 +527,7 @@ Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
 {'='*40}
 """
             
-            for item in self.sale_cart:
+            for item in self.sale_cart if items is None else items:
                 item_vat_inclusive = item['price'] * item['quantity']
                 item_vat_exclusive = item['price_vat_exclusive'] * item['quantity']
                 
@@ -648,25 +613,17 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
         for widget in self.sales_history_frame.winfo_children():
             widget.destroy()
         
-        # Get sales data
-        sales_df = self.db.read_tab('Sales')
-        
-        if sales_df.empty:
-            ctk.CTkLabel(self.sales_history_frame, 
-                        text="No sales records found.",
-                        font=("Arial", 14)).pack(pady=50)
-            return
-        
-        # Apply date filter
+        # Get sales data, reading only the partitions of the date filter
         try:
             from_date = self.from_date_var.get()
             to_date = self.to_date_var.get()
             
             if from_date and to_date:
-                mask = (sales_df['Sale_Date'] >= from_date) & (sales_df['Sale_Date'] <= to_date)
-                sales_df = sales_df[mask]
+                sales_df = self.db.read_range('Sales', from_date, to_date)
+            else:
+                sales_df = self.db.read_range('Sales')
         except:
-            pass  # If date filter fails, show all
+            sales_df = self.db.read_range('Sales')  # If date filter fails, show all
         
         if sales_df.empty:
             ctk.CTkLabel(self.sales_history_frame, 
@@ -685,49 +642,29 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
         # Sort by date (newest first)
         sales_df = sales_df.sort_values(['Sale_Date', 'Sale_Time'], ascending=False)
         
-        # Create scrollable table
-        scroll_frame = ctk.CTkScrollableFrame(self.sales_history_frame, 
-                                             width=900, height=400)
-        scroll_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Table headers
-        headers = ["Date", "Time", "Product", "Quantity", "Unit Price", "Total Amount"]
-        col_widths = [100, 80, 200, 80, 100, 120]
-        
-        for col, (header, width) in enumerate(zip(headers, col_widths)):
-            ctk.CTkLabel(scroll_frame, text=header, font=("Arial", 12, "bold"),
-                        width=width).grid(row=0, column=col, padx=5, pady=5, sticky="w")
-        
-        # Add sales rows
-        total_sales = 0
-        for row_idx, (_, sale) in enumerate(sales_df.iterrows(), start=1):
-            # Date
-            ctk.CTkLabel(scroll_frame, text=sale['Sale_Date'], 
-                        width=col_widths[0]).grid(row=row_idx, column=0, padx=5, pady=2, sticky="w")
-            
-            # Time
-            ctk.CTkLabel(scroll_frame, text=sale.get('Sale_Time', ''), 
-                        width=col_widths[1]).grid(row=row_idx, column=1, padx=5, pady=2, sticky="w")
-            
-            # Product
-            product_name = sale.get('Product_Name', sale['Product_ID'])
-            ctk.CTkLabel(scroll_frame, text=product_name[:30], 
-                        width=col_widths[2]).grid(row=row_idx, column=2, padx=5, pady=2, sticky="w")
-            
-            # Quantity
-            ctk.CTkLabel(scroll_frame, text=f"{sale['Quantity']:,.0f}", 
-                        width=col_widths[3]).grid(row=row_idx, column=3, padx=5, pady=2)
-            
-            # Unit Price
-            unit_price = sale['Total_Amount'] / sale['Quantity'] if sale['Quantity'] > 0 else 0
-            ctk.CTkLabel(scroll_frame, text=f"{self.config['currency']}{unit_price:,.2f}", 
-                        width=col_widths[4]).grid(row=row_idx, column=4, padx=5, pady=2)
-            
-            # Total Amount
-            ctk.CTkLabel(scroll_frame, text=f"{self.config['currency']}{sale['Total_Amount']:,.2f}", 
-                        width=col_widths[5]).grid(row=row_idx, column=5, padx=5, pady=2)
-            
-            total_sales += sale['Total_Amount']
+        # Table columns (rows are rendered on demand by VirtualTable)
+        currency = self.config['currency']
+        
+        def unit_price(sale):
+            price = sale['Total_Amount'] / sale['Quantity'] if sale['Quantity'] > 0 else 0
+            return f"{currency}{price:,.2f}"
+        
+        columns = [
+            {'header': "Date", 'width': 100, 'value': 'Sale_Date'},
+            {'header': "Time", 'width': 80, 'value': 'Sale_Time'},
+            {'header': "Product", 'width': 200, 'max_chars': 30,
+             'value': lambda sale: sale.get('Product_Name', sale['Product_ID'])},
+            {'header': "Quantity", 'width': 80, 'anchor': "center",
+             'value': lambda sale: f"{sale['Quantity']:,.0f}"},
+            {'header': "Unit Price", 'width': 100, 'anchor': "center", 'value': unit_price},
+            {'header': "Total Amount", 'width': 120, 'anchor': "center",
+             'value': lambda sale: f"{currency}{sale['Total_Amount']:,.2f}"}
+        ]
+        
+        table = VirtualTable(self.sales_history_frame, columns, sales_df, height=400)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        total_sales = sales_df['Total_Amount'].sum()
         
         # Summary
         summary_frame = ctk.CTkFrame(parent_frame)
@@ -740,8 +677,8 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
     def export_sales_report(self):
         """Export sales report to Excel"""
         try:
-            # Get sales data
-            sales_df = self.db.read_tab('Sales')
+            # Get sales data, archived rows included
+            sales_df = self.db.read_range('Sales')
             
             if sales_df.empty:
                 messagebox.showwarning("No Data", "No sales data to export.")
@@ -788,8 +725,8 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
         ctk.CTkLabel(parent_frame, text="Sales Analytics", 
                     font=("Arial", 22, "bold")).pack(pady=10)
         
-        # Get sales data
-        sales_df = self.db.read_tab('Sales')
+        # Daily per-product totals; every report below is derived from them
+        sales_df = self.db.get_sales_rollup()
         
         if sales_df.empty:
             ctk.CTkLabel(parent_frame, 
@@ -820,10 +757,8 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
     def show_daily_sales_chart(self, parent_frame, sales_df):
         """Show daily sales chart"""
         try:
-            # Convert to datetime and group by date
-            sales_df['Sale_Date'] = pd.to_datetime(sales_df['Sale_Date'])
-            daily_sales = sales_df.groupby('Sale_Date')['Total_Amount'].sum().reset_index()
-            daily_sales = daily_sales.sort_values('Sale_Date')
+            # Total the daily rollup rows per date
+            daily_sales = sales_by_period(sales_df, 'D')
             
             # Get last 30 days
             last_30_days = daily_sales.tail(30)
@@ -857,8 +792,7 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
                 row_frame = ctk.CTkFrame(scroll_frame, fg_color="transparent")
                 row_frame.pack(fill="x", pady=2)
                 
-                date_str = row['Sale_Date'].strftime("%Y-%m-%d")
-                ctk.CTkLabel(row_frame, text=date_str, 
+                ctk.CTkLabel(row_frame, text=row['Period'], 
                             width=120).pack(side="left", padx=10)
                 ctk.CTkLabel(row_frame, 
                             text=f"{self.config['currency']}{row['Total_Amount']:,.2f}",
@@ -944,13 +878,8 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
     def show_monthly_trends_chart(self, parent_frame, sales_df):
         """Show monthly sales trends"""
         try:
-            # Convert to datetime and extract month
-            sales_df['Sale_Date'] = pd.to_datetime(sales_df['Sale_Date'])
-            sales_df['YearMonth'] = sales_df['Sale_Date'].dt.strftime('%Y-%m')
-            
-            # Group by month
-            monthly_sales = sales_df.groupby('YearMonth')['Total_Amount'].sum().reset_index()
-            monthly_sales = monthly_sales.sort_values('YearMonth')
+            # Total the daily rollup rows per month
+            monthly_sales = sales_by_period(sales_df, 'M')
             
             ctk.CTkLabel(parent_frame, text="Monthly Sales Trends", 
                         font=("Arial", 16, "bold")).pack(pady=10)
@@ -986,7 +915,7 @@ TOTAL (incl. VAT): {self.config['currency']}{total_vat_inclusive:,.2f}
                 row_frame.pack(fill="x", pady=2)
                 
                 # Month
-                ctk.CTkLabel(row_frame, text=row['YearMonth'], 
+                ctk.CTkLabel(row_frame, text=row['Period'], 
                             width=100).pack(side="left", padx=10)
                 
                 # Sales amount
@@ -0,0 +1,145 @@
+# modules/schema.py - Column layout, types and defaults of every tab
+import pandas as pd
+
+# Column types
+TEXT = 'text'       # str; missing cells become the default
+NUMBER = 'number'   # float64; missing or unparseable cells become the default
+RAW = 'raw'         # IDs, dates and times, kept as stored
+
+# Tab -> [(column, type, default)], in sheet order
+SCHEMA = {
+    'Products': [
+        ('Product_ID', RAW, None),
+        ('Product_Name', TEXT, ''),
+        ('Category', TEXT, ''),
+        ('Selling_Price', NUMBER, 0.0),
+        ('Active', TEXT, ''),
+        ('Cost_Price', NUMBER, 0.0),
+        ('Profit_Margin', NUMBER, 0.0),
+        ('Margin_Percentage', NUMBER, 0.0),
+        ('Notes', TEXT, '')
+    ],
+    'Ingredients': [
+        ('Ingredient_ID', RAW, None),
+        ('Ingredient_Name', TEXT, ''),
+        ('Unit', TEXT, ''),
+        ('Category', TEXT, ''),
+        ('Current_Stock', NUMBER, 0.0),
+        ('Min_Stock_Level', NUMBER, 0.0),
+        ('Cost_Per_Unit', NUMBER, 0.0),
+        ('Supplier', TEXT, ''),
+        ('Description', TEXT, ''),
+        ('Active', TEXT, ''),
+        ('Last_Updated', RAW, None)
+    ],
+    'Recipes': [
+        ('Recipe_ID', RAW, None),
+        ('Product_ID', RAW, None),
+        ('Ingredient_ID', RAW, None),
+        ('Quantity_Required', NUMBER, 0.0)
+    ],
+    'Sales': [
+        ('Sale_ID', RAW, None),
+        ('Product_ID', RAW, None),
+        ('Quantity', NUMBER, 0.0),
+        ('Sale_Date', RAW, None),
+        ('Sale_Time', RAW, None),
+        ('Total_Amount', NUMBER, 0.0)
+    ],
+    # Daily totals per product, maintained with every sale ('<date>|<Product_ID>' keys)
+    'Sales_Daily': [
+        ('Rollup_Key', RAW, None),
+        ('Sale_Date', RAW, None),
+        ('Product_ID', RAW, None),
+        ('Quantity', NUMBER, 0.0),
+        ('Total_Amount', NUMBER, 0.0),
+        ('Transactions', NUMBER, 0.0)
+    ],
+    'Inventory_Log': [
+        ('Log_ID', RAW, None),
+        ('Ingredient_ID', RAW, None),
+        ('Change_Type', TEXT, ''),
+        ('Quantity', NUMBER, 0.0),
+        ('Date', RAW, None),
+        ('Notes', TEXT, '')
+    ],
+    'Expenses': [
+        ('Expense_ID', RAW, None),
+        ('Expense_Date', RAW, None),
+        ('Expense_Type', TEXT, ''),
+        ('Description', TEXT, ''),
+        ('Amount', NUMBER, 0.0),
+        ('Category', TEXT, ''),
+        ('Payment_Method', TEXT, ''),
+        ('Notes', TEXT, '')
+    ]
+}
+
+# Precomputed lookups: {tab_name: {column: (type, default)}}
+COLUMN_TYPES = {tab_name: {col: (col_type, default) for col, col_type, default in columns}
+                for tab_name, columns in SCHEMA.items()}
+
+NUMBER_COLUMNS = {col for columns in SCHEMA.values()
+                  for col, col_type, _ in columns if col_type == NUMBER}
+
+
+def tab_columns(tab_name):
+    """Column names of a tab in sheet order"""
+    return [col for col, _, _ in SCHEMA[tab_name]]
+
+
+def empty_tab(tab_name):
+    """Empty DataFrame with the columns and dtypes of a tab"""
+    return pd.DataFrame({col: pd.Series(dtype='float64' if col_type == NUMBER else 'object')
+                         for col, col_type, _ in SCHEMA[tab_name]})
+
+
+def empty_tabs():
+    """Empty DataFrames for every tab: {tab_name: DataFrame}"""
+    return {tab_name: empty_tab(tab_name) for tab_name in SCHEMA}
+
+
+def read_dtypes(tab_name):
+    """
+    dtype argument for pd.read_excel, so TEXT columns are parsed as strings
+
+    NUMBER columns are not forced at parse time (a stray text cell would
+    abort the read); coerce_tab converts them only if they did not come
+    out as float64.
+    """
+    return {col: str for col, (col_type, _) in COLUMN_TYPES.get(tab_name, {}).items()
+            if col_type == TEXT}
+
+
+def coerce_tab(tab_name, df):
+    """
+    Bring the TEXT and NUMBER columns of a frame to their schema types
+
+    Columns that already have the right dtype and no missing values are left
+    alone, so a frame typed at parse time costs one check per column.
+
+    Args:
+        tab_name: Tab the rows belong to
+        df: DataFrame to coerce (modified in place)
+
+    Returns:
+        df
+    """
+    for col, (col_type, default) in COLUMN_TYPES.get(tab_name, {}).items():
+        if col not in df.columns or col_type == RAW:
+            continue
+        series = df[col]
+        original = series
+        if col_type == NUMBER:
+            if series.dtype != 'float64':
+                series = pd.to_numeric(series, errors='coerce').astype('float64')
+            if series.hasnans:
+                series = series.fillna(default)
+        else:
+            if series.hasnans:
+                series = series.fillna(default)
+            if series.dtype == object:
+                series = series.astype(str)
+        if series is not original:
+            df[col] = series
+    return df
@@ -0,0 +1,104 @@
+# modules/search_index.py - In-memory search over the active products for the sales grid
+import re
+
+import pandas as pd
+
+# Length of the substrings indexed; shorter queries scan the precomputed texts
+NGRAM = 3
+
+_TERM_SPLIT = re.compile(r"\s+")
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class ProductSearchIndex:
+    """
+    Search index over a frame of products, built once per Products frame
+
+    Every product is reduced to one lowercase text (name and ID), and
+    every NGRAM-character substring of it maps to the products containing
+    it. A query term of NGRAM characters or more only checks the products
+    holding all of the term's n-grams; shorter terms scan the texts. A
+    product matches when every whitespace-separated term of the query is
+    found in its name or ID, so "cake choc" finds "Chocolate Cake".
+    """
+
+    def __init__(self, products_df):
+        products = products_df.reset_index(drop=True) if not products_df.empty else pd.DataFrame()
+        self.products = products
+        self.product_ids = products['Product_ID'].astype(str).tolist() if not products.empty else []
+        self.rows = {product_id: position for position, product_id in enumerate(self.product_ids)}
+
+        if not products.empty:
+            names = products['Product_Name'].fillna('').astype(str).str.lower()
+            # Newline keeps a term from matching across the name and the ID
+            self._texts = (names + "\n" + pd.Series(self.product_ids).str.lower()).tolist()
+        else:
+            self._texts = []
+
+        # Category of every product as shown in the filter menu, matched case-insensitively
+        self._categories = []
+        self._category_keys = []
+        if 'Category' in products.columns:
+            self._categories = products['Category'].fillna('').astype(str).str.strip().tolist()
+            self._category_keys = [category.lower() for category in self._categories]
+
+        self._postings = {}
+        for position, text in enumerate(self._texts):
+            for gram in _ngrams(text):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = set()
+                postings.add(position)
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def categories(self):
+        """Distinct non-empty categories, as written in the Products tab"""
+        return sorted({category for category in self._categories if category and category.lower() != 'nan'})
+
+    def product(self, product_id):
+        """Row of a product as a Series"""
+        return self.products.iloc[self.rows[product_id]]
+
+    def search(self, text="", category=None):
+        """
+        Find the products matching a search text and category
+
+        Args:
+            text: Search text; empty matches every product
+            category: Category name, or None / "All Categories" for any
+
+        Returns:
+            List of Product_IDs in the order of the Products tab
+        """
+        positions = None
+        for term in _TERM_SPLIT.split(text.strip().lower()):
+            if term:
+                positions = self._match_term(term, positions)
+
+        if category and category != "All Categories" and self._category_keys:
+            category_key = category.strip().lower()
+            candidates = range(len(self.product_ids)) if positions is None else positions
+            positions = [position for position in candidates if self._category_keys[position] == category_key]
+
+        if positions is None:
+            return list(self.product_ids)
+        return [self.product_ids[position] for position in sorted(positions)]
+
+    def _match_term(self, term, positions):
+        """Positions (out of `positions`, or all) whose text contains term"""
+        if len(term) >= NGRAM:
+            candidates = None
+            for postings in sorted((self._postings.get(gram, set()) for gram in _ngrams(term)), key=len):
+                candidates = set(postings) if candidates is None else candidates & postings
+                if not candidates:
+                    return []
+            if positions is not None:
+                candidates &= set(positions)
+        else:
+            candidates = range(len(self._texts)) if positions is None else positions
+        return [position for position in candidates if term in self._texts[position]]
@@ -0,0 +1,27 @@
+# modules/sequences.py - ID prefixes and their persisted counters
+import pandas as pd
+
+# Prefix -> (tab, ID column, minimum digits)
+SEQUENCES = {
+    'PROD': ('Products', 'Product_ID', 3),
+    'ING': ('Ingredients', 'Ingredient_ID', 3),
+    'EXP': ('Expenses', 'Expense_ID', 4),
+    'SALE': ('Sales', 'Sale_ID', 4),
+    'LOG': ('Inventory_Log', 'Log_ID', 6),
+    # Recipe lines are stored as '<Product_ID>-REC<n>'
+    'REC': ('Recipes', 'Recipe_ID', 3)
+}
+
+
+def format_id(prefix, number):
+    """Format a sequence number as an ID (e.g. 'PROD', 7 -> 'PROD007')"""
+    digits = SEQUENCES[prefix][2]
+    return f"{prefix}{number:0{digits}d}"
+
+
+def max_id_number(ids, prefix):
+    """Largest number used by IDs with the given prefix (0 if none)"""
+    numbers = pd.Series(ids, dtype='object').dropna().astype(str).str.extract(
+        rf'(?:^|-){prefix}(\d+)$', expand=False)
+    numbers = pd.to_numeric(numbers, errors='coerce').dropna()
+    return int(numbers.max()) if not numbers.empty else 0
@@ -6,6 +6,7 @@ from tkinter import messagebox
 from datetime import datetime
 import os
 import shutil
+from modules.archive import ARCHIVED_TABS, DEFAULT_ARCHIVE_MONTHS, archive_cutoff
 
 class SettingsGUI:
     def __init__(self, window, db, config):
@@ -56,12 +57,14 @@ class SettingsGUI:
         settings_tabs.add("Business Info")
         settings_tabs.add("Preferences")
         settings_tabs.add("Data Management")
+        settings_tabs.add("Diagnostics")
         settings_tabs.add("About")
         
         # Fill each tab
         self.show_business_settings(settings_tabs.tab("Business Info"))
         self.show_preferences_settings(settings_tabs.tab("Preferences"))
         self.show_data_management(settings_tabs.tab("Data Management"))
+        self.show_diagnostics(settings_tabs.tab("Diagnostics"))
         self.show_about_info(settings_tabs.tab("About"))
     
     def show_business_settings(self, parent_frame):
@@ -88,7 +91,9 @@ class SettingsGUI:
             ("Business Name:", "business_name", self.config['business_name']),
             ("Currency Symbol:", "currency", self.config['currency']),
             ("Date Format:", "date_format", self.config['date_format']),
-            ("Low Stock Warning Level:", "low_stock_warning", str(self.config['low_stock_warning']))
+            ("Low Stock Warning Level:", "low_stock_warning", str(self.config['low_stock_warning'])),
+            ("Archive After (months):", "archive_after_months",
+             str(self.config.get('archive_after_months', DEFAULT_ARCHIVE_MONTHS)))
         ]
         
         self.settings_entries = {}
@@ -172,6 +177,15 @@ class SettingsGUI:
                             text_color="red"
                         )
                         return
+                elif field_name == 'archive_after_months':
+                    try:
+                        new_settings[field_name] = int(value)
+                    except ValueError:
+                        self.settings_status_label.configure(
+                            text="Archive After must be a number of months",
+                            text_color="red"
+                        )
+                        return
                 else:
                     new_settings[field_name] = value
             
@@ -489,6 +503,8 @@ class SettingsGUI:
             ("💾 Backup All Data", self.export_all_data, "#3498db"),
             ("🗑️ Clear All Data (Safe)", self.clear_all_data_with_backup, "#e74c3c"),
             ("🔄 Recalculate All Costs", self.recalculate_costs, "#9b59b6"),
+            ("📊 Rebuild Sales Rollup", self.rebuild_sales_rollup, "#16a085"),
+            ("🗄️ Archive Old Records", self.archive_old_records, "#7f8c8d"),
             ("🔍 Check File Status", self.check_file_status, "#f39c12")
         ]
         
@@ -501,6 +517,114 @@ class SettingsGUI:
                                font=("Arial", 13))
             btn.pack(pady=10, fill="x")
 
+    def show_diagnostics(self, parent_frame):
+        """Show per-method timings and the slow operations log of the database"""
+        title_label = ctk.CTkLabel(parent_frame, text="Diagnostics", 
+                                  font=("Arial", 22, "bold"))
+        title_label.configure(text_color=("#2c2c2c", "#f0f0f0"))
+        title_label.pack(pady=10)
+        
+        # Slow operation threshold
+        threshold_frame = ctk.CTkFrame(parent_frame)
+        threshold_frame.pack(pady=5, padx=20, fill="x")
+        
+        threshold_label = ctk.CTkLabel(threshold_frame, text="Log operations slower than (ms):")
+        threshold_label.configure(text_color=("#2c2c2c", "#f0f0f0"))
+        threshold_label.pack(side="left", padx=10, pady=10)
+        
+        self.slow_ms_entry = ctk.CTkEntry(threshold_frame, width=100)
+        self.slow_ms_entry.insert(0, f"{self.db.metrics.slow_ms:g}")
+        self.slow_ms_entry.pack(side="left", padx=5)
+        
+        buttons = [
+            ("💾 Save", self.save_slow_threshold, "#27ae60"),
+            ("🔄 Refresh", self.refresh_diagnostics, "#3498db"),
+            ("🗑️ Reset", self.reset_diagnostics, "#e74c3c")
+        ]
+        for btn_text, command, color in buttons:
+            btn = ctk.CTkButton(threshold_frame, text=btn_text,
+                               command=command,
+                               fg_color=color,
+                               hover_color=self.darken_color(color),
+                               width=100)
+            btn.pack(side="left", padx=5)
+        
+        # Report
+        self.diagnostics_text = ctk.CTkTextbox(parent_frame, font=("Courier New", 12), wrap="none")
+        self.diagnostics_text.pack(pady=10, padx=20, fill="both", expand=True)
+        
+        self.refresh_diagnostics()
+    
+    def refresh_diagnostics(self):
+        """Fill the diagnostics panel with the current metrics"""
+        if not hasattr(self, 'diagnostics_text') or not self.diagnostics_text.winfo_exists():
+            return
+        
+        metrics = self.db.get_metrics()
+        cache, writes, locks = metrics['cache'], metrics['writes'], metrics['locks']
+        
+        def kb(value):
+            return f"{value / 1024:,.0f}" if metrics['io_available'] else "-"
+        
+        lines = [f"Collected since {metrics['since']}",
+                 f"Cache: {cache['hits']:,} hits, {cache['misses']:,} misses ({cache['hit_rate']:.1f}% hit rate)",
+                 f"Writes: {writes['tab_saves']:,} tab saves, {writes['storage_writes']:,} storage writes "
+                 f"({writes['write_mode']} mode)",
+                 f"Locks: {locks['shared'] + locks['exclusive']:,} taken, {locks['contended']:,} contended, "
+                 f"{locks['timeouts']:,} timeouts, max wait {locks['max_wait_seconds'] * 1000:.0f} ms",
+                 ""]
+        
+        header = (f"{'':<32}{'Calls':>8}{'Total ms':>11}{'Max ms':>9}{'Reads':>7}{'Writes':>7}"
+                  f"{'read_tab':>9}{'save_tab':>9}{'Rows R':>9}{'Rows W':>9}{'KB R':>9}{'KB W':>9}")
+        
+        def table(title, rows):
+            lines.append(title)
+            lines.append(header)
+            for name, stats in rows:
+                lines.append(f"{name[:31]:<32}{stats['calls']:>8,}{stats['total_ms']:>11,.0f}"
+                             f"{stats['max_ms']:>9,.0f}{stats['storage_reads']:>7,}{stats['storage_writes']:>7,}"
+                             f"{stats['read_tab_calls']:>9,}{stats['save_tab_calls']:>9,}"
+                             f"{stats['rows_read']:>9,}{stats['rows_written']:>9,}"
+                             f"{kb(stats['bytes_read']):>9}{kb(stats['bytes_written']):>9}")
+            if not rows:
+                lines.append("  (nothing recorded yet)")
+            lines.append("")
+        
+        table("Methods (counts include the methods they call)", list(metrics['methods'].items()))
+        table("Top callers", list(metrics['callers'].items())[:15])
+        
+        lines.append(f"Slow operations (over {metrics['slow_ms']:g} ms, newest first)")
+        for entry in metrics['slow_operations']:
+            lines.append(f"  {entry['time']}  {entry['method']:<28}{entry['ms']:>9,.0f} ms  "
+                         f"reads {entry['storage_reads']}, writes {entry['storage_writes']}  <- {entry['caller']}")
+        if not metrics['slow_operations']:
+            lines.append("  (none)")
+        
+        self.diagnostics_text.configure(state="normal")
+        self.diagnostics_text.delete("1.0", "end")
+        self.diagnostics_text.insert("1.0", "\n".join(lines))
+        self.diagnostics_text.configure(state="disabled")
+    
+    def save_slow_threshold(self):
+        """Apply and save the slow operation threshold"""
+        try:
+            slow_ms = float(self.slow_ms_entry.get())
+            if slow_ms <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Threshold must be a positive number of milliseconds")
+            return
+        
+        self.db.metrics.slow_ms = slow_ms
+        self.config.update({'slow_operation_ms': slow_ms})
+        self.refresh_diagnostics()
+        messagebox.showinfo("Saved", f"Operations slower than {slow_ms:g} ms will be logged")
+    
+    def reset_diagnostics(self):
+        """Clear all collected timings"""
+        self.db.reset_metrics()
+        self.refresh_diagnostics()
+
     def darken_color(self, hex_color):
         """Darken a hex color for hover effect"""
         # Remove # if present
@@ -523,8 +647,9 @@ class SettingsGUI:
                 'Products': self.db.read_tab('Products'),
                 'Ingredients': self.db.read_tab('Ingredients'),
                 'Recipes': self.db.read_tab('Recipes'),
-                'Sales': self.db.read_tab('Sales'),
-                'Inventory_Logs': self.db.read_tab('Inventory_Log')
+                # History tabs include their archived rows
+                'Sales': self.db.read_range('Sales'),
+                'Inventory_Logs': self.db.read_range('Inventory_Log')
             }
             
             # Check if we have any data
@@ -592,7 +717,10 @@ class SettingsGUI:
     def export_single_tab(self, tab_name, file_prefix):
         """Export a single tab to Excel"""
         try:
-            df = self.db.read_tab(tab_name)
+            if tab_name in ARCHIVED_TABS:
+                df = self.db.read_range(tab_name)  # Archived rows included
+            else:
+                df = self.db.read_tab(tab_name)
             
             if df.empty:
                 messagebox.showwarning("No Data", f"No {file_prefix} data available to export.")
@@ -726,35 +854,18 @@ class SettingsGUI:
             # Update progress
             progress_window.update()
             
-            # Define the exact column structure for each tab
-            tab_structures = {
-                'Products': ['Product_ID', 'Product_Name', 'Category', 
-                            'Selling_Price', 'Active', 'Cost_Price',
-                            'Profit_Margin', 'Margin_Percentage', 'Notes'],
-                
-                'Ingredients': ['Ingredient_ID', 'Ingredient_Name', 'Unit', 
-                               'Category', 'Current_Stock', 'Min_Stock', 
-                               'Cost_Per_Unit', 'Notes'],
-                
-                'Recipes': ['Recipe_ID', 'Product_ID', 'Ingredient_ID', 'Quantity_Required'],
-                
-                'Sales': ['Sale_ID', 'Product_ID', 'Quantity', 
-                         'Sale_Date', 'Sale_Time', 'Total_Amount'],
-                
-                'Inventory_Log': ['Log_ID', 'Ingredient_ID', 'Change_Type', 
-                                 'Quantity', 'Date', 'Notes']
-            }
+            # Tabs to clear (columns come from the schema registry)
+            cleared_tabs = ['Products', 'Ingredients', 'Recipes', 'Sales', 'Inventory_Log']
             
             # Clear each tab
-            for i, (tab_name, columns) in enumerate(tab_structures.items(), 1):
+            for i, tab_name in enumerate(cleared_tabs, 1):
                 progress_label2.configure(text=f"Clearing {tab_name}... ({i}/5)")
                 progress_window.update()
                 
-                # Create empty DataFrame with correct columns
-                empty_df = pd.DataFrame(columns=columns)
-                
-                # Save to database
-                self.db.save_tab(tab_name, empty_df)
+                # Empty the tab and its archived rows
+                success, message = self.db.clear_tabs([tab_name])
+                if not success:
+                    raise Exception(message)
                 
                 # Small delay to show progress
                 progress_window.after(100)
@@ -763,7 +874,7 @@ class SettingsGUI:
             progress_window.destroy()
             
             # Force reload the database
-            self.db.__init__(self.db.excel_file)
+            self.db.reload()
             
             # Show success message
             messagebox.showinfo("✅ Success", 
@@ -794,14 +905,52 @@ class SettingsGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to recalculate costs: {str(e)}")
 
+    def rebuild_sales_rollup(self):
+        """Regenerate the daily sales totals from the full sales history"""
+        try:
+            rows = self.db.rebuild_sales_rollup()
+            if rows is None:
+                messagebox.showerror("Error", "Failed to save the rebuilt sales rollup.")
+                return
+            messagebox.showinfo("Sales Rollup Rebuilt",
+                              f"Rebuilt {rows} daily sales rows from the sales history.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to rebuild sales rollup: {str(e)}")
+
+    def archive_old_records(self):
+        """Move sales, inventory log and expense rows of closed months to the archive"""
+        try:
+            months = int(self.config.get('archive_after_months', DEFAULT_ARCHIVE_MONTHS))
+        except (TypeError, ValueError):
+            months = DEFAULT_ARCHIVE_MONTHS
+        cutoff = archive_cutoff(months)
+        
+        confirm = messagebox.askyesno("Archive Old Records",
+                                     f"Move sales, inventory log and expense records dated before "
+                                     f"{cutoff:%Y-%m-%d} to compressed archive files?\n\n"
+                                     "Reports still include archived records, and daily sales "
+                                     "totals stay in the database.")
+        if not confirm:
+            return
+        
+        try:
+            archived = self.db.archive_history(cutoff)
+            if archived is None:
+                messagebox.showerror("Error", "Failed to save the database after archiving.")
+                return
+            details = "\n".join(f"{tab_name}: {count} rows" for tab_name, count in archived.items())
+            messagebox.showinfo("Records Archived",
+                              f"Archived records dated before {cutoff:%Y-%m-%d}:\n\n{details}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to archive records: {str(e)}")
+
     def clear_all_data_with_backup(self):
         """Clear all data with automatic backup"""
-        import shutil
         from datetime import datetime
         
         # Check if file is locked first
         if hasattr(self.db, 'is_file_locked'):
-            if self.db.is_file_locked(self.db.excel_file):
+            if self.db.is_file_locked(self.db.storage.path):
                 messagebox.showerror("File Locked", 
                                    "❌ Cannot clear data!\n\n"
                                    "The Excel file is locked by another program.\n"
@@ -822,33 +971,19 @@ class SettingsGUI:
             # Create backup
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = f"data/backup_{timestamp}.xlsx"
-            shutil.copy2(self.db.excel_file, backup_file)
+            success, message = self.db.backup(backup_file)
+            if not success:
+                raise Exception(message)
             
             print(f"📦 Backup created: {backup_file}")
             
             # Now clear the data
-            tab_structures = {
-                'Products': ['Product_ID', 'Product_Name', 'Category', 
-                            'Selling_Price', 'Active', 'Cost_Price',
-                            'Profit_Margin', 'Margin_Percentage', 'Notes'],
-                
-                'Ingredients': ['Ingredient_ID', 'Ingredient_Name', 'Unit', 
-                               'Category', 'Current_Stock', 'Min_Stock', 
-                               'Cost_Per_Unit', 'Notes'],
-                
-                'Recipes': ['Recipe_ID', 'Product_ID', 'Ingredient_ID', 'Quantity_Required'],
-                
-                'Sales': ['Sale_ID', 'Product_ID', 'Quantity', 
-                         'Sale_Date', 'Sale_Time', 'Total_Amount'],
-                
-                'Inventory_Log': ['Log_ID', 'Ingredient_ID', 'Change_Type', 
-                                 'Quantity', 'Date', 'Notes']
-            }
+            cleared_tabs = ['Products', 'Ingredients', 'Recipes', 'Sales', 'Inventory_Log']
             
-            # Clear each tab
-            for tab_name, columns in tab_structures.items():
-                empty_df = pd.DataFrame(columns=columns)
-                self.db.save_tab(tab_name, empty_df)
+            # Empty each tab and its archived rows
+            success, message = self.db.clear_tabs(cleared_tabs)
+            if not success:
+                raise Exception(message)
             
             messagebox.showinfo("✅ Success", 
                               f"All data cleared successfully!\n\n"
@@ -0,0 +1,253 @@
+# modules/snapshot.py - Columnar per-tab snapshots of the workbook for fast loads
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from modules.partitions import PARTITIONED_TABS, UNDATED, partition_keys
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Optional: without pyarrow snapshots are stored as pickles
+    feather = None
+
+
+# Position of each row in its sheet, stored with partitioned tabs to restore row order
+ROW_COLUMN = '__row'
+
+
+def snapshot_dir(excel_file):
+    """Snapshot folder kept next to the workbook (data/inventory.snapshot/)"""
+    return os.path.splitext(excel_file)[0] + '.snapshot'
+
+
+class TabSnapshots:
+    """
+    Parsed copies of the workbook sheets in a format that loads without parsing
+
+    Tabs are stored as uncompressed Arrow IPC (Feather) files, memory-mapped
+    on load, or as pickles when pyarrow is not installed. A manifest records
+    the (mtime, size) of the workbook the snapshots belong to; once the
+    workbook changes outside our own writes, every snapshot is stale and
+    tabs are parsed from the workbook again.
+
+    Tabs listed in PARTITIONED_TABS are stored as one file per month
+    (Sales.2025-12.arrow), so a date-range read only loads the months it
+    covers.
+    """
+
+    def __init__(self, excel_file):
+        self.excel_file = excel_file
+        self.folder = snapshot_dir(excel_file)
+        self.manifest_file = os.path.join(self.folder, 'manifest.json')
+        self.format = 'arrow' if feather is not None else 'pickle'
+
+    # ===== LOADING =====
+    def load(self, tab_name):
+        """Return the snapshot of a tab, or None if it is missing or stale"""
+        entry = self._current_entry(tab_name)
+        if entry is None:
+            return None
+        try:
+            if isinstance(entry, dict):
+                return self._read_partitions(entry, entry['months'].values())
+            return self._read_frame(os.path.join(self.folder, entry))
+        except Exception as e:
+            print(f"⚠️ Could not load snapshot of '{tab_name}': {e}")
+            return None
+
+    def load_months(self, tab_name, first_month=None, last_month=None):
+        """
+        Return the rows of a partitioned tab dated within a range of months
+
+        Args:
+            tab_name: Tab listed in PARTITIONED_TABS
+            first_month: First 'YYYY-MM' to include, or None for no lower bound
+            last_month: Last 'YYYY-MM' to include, or None for no upper bound
+
+        Returns:
+            DataFrame in sheet row order, or None if the snapshot is missing or stale
+        """
+        entry = self._current_entry(tab_name)
+        if not isinstance(entry, dict):
+            return None
+        files = [file_name for month, file_name in entry['months'].items()
+                 if month != UNDATED
+                 and (first_month is None or month >= first_month)
+                 and (last_month is None or month <= last_month)]
+        try:
+            return self._read_partitions(entry, files)
+        except Exception as e:
+            print(f"⚠️ Could not load snapshot of '{tab_name}': {e}")
+            return None
+
+    def _current_entry(self, tab_name):
+        """Manifest entry of a tab if its snapshot belongs to the current workbook"""
+        manifest = self._read_manifest()
+        entry = manifest.get('tabs', {}).get(tab_name)
+        if entry is None or manifest.get('workbook') != self.workbook_stamp():
+            return None
+        return entry
+
+    def _read_partitions(self, entry, files):
+        """Concatenate monthly files and restore the sheet row order"""
+        parts = [self._read_frame(os.path.join(self.folder, file_name)) for file_name in files]
+        if not parts:
+            return pd.DataFrame(columns=entry['columns'])
+        df = pd.concat(parts, ignore_index=True)
+        if len(parts) > 1:
+            df = df.sort_values(ROW_COLUMN, kind='stable')
+        return df.drop(columns=ROW_COLUMN).reset_index(drop=True)
+
+    def _read_frame(self, path):
+        if self.format == 'arrow':
+            return feather.read_table(path, memory_map=True).to_pandas()
+        return pd.read_pickle(path)
+
+    # ===== SAVING =====
+    def store(self, tab_name, df):
+        """Snapshot a tab just parsed from the current workbook"""
+        manifest = self._read_manifest()
+        stamp = self.workbook_stamp()
+        if manifest.get('workbook') != stamp:
+            manifest = {'workbook': stamp, 'tabs': {}}
+        self._write_tabs(manifest, {tab_name: df})
+
+    def refresh(self, tabs, stamp_before):
+        """
+        Update snapshots after we rewrote sheets of the workbook
+
+        Args:
+            tabs: {tab_name: DataFrame} as written to the workbook
+            stamp_before: Workbook stamp taken before the write; snapshots of
+                          other tabs stay valid only if they matched it
+        """
+        manifest = self._read_manifest()
+        if manifest.get('workbook') != stamp_before:
+            manifest = {'tabs': {}}
+        manifest['workbook'] = self.workbook_stamp()
+        self._write_tabs(manifest, {tab_name: _as_stored(df) for tab_name, df in tabs.items()})
+
+    def _write_tabs(self, manifest, tabs):
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+        except OSError as e:
+            print(f"⚠️ Could not create snapshot folder: {e}")
+            return
+        manifest['format'] = self.format
+        replaced = []
+        for tab_name, df in tabs.items():
+            replaced.append(manifest['tabs'].get(tab_name))
+            try:
+                if tab_name in PARTITIONED_TABS and PARTITIONED_TABS[tab_name] in df.columns:
+                    manifest['tabs'][tab_name] = self._write_partitions(tab_name, df)
+                else:
+                    manifest['tabs'][tab_name] = self._write_file(tab_name, df.reset_index(drop=True))
+            except Exception as e:
+                # e.g. mixed-type object columns Arrow cannot store
+                print(f"⚠️ Could not snapshot '{tab_name}': {e}")
+                manifest['tabs'].pop(tab_name, None)
+        self._write_manifest(manifest)
+
+        # Monthly files of months that no longer have rows
+        current = {file_name for entry in manifest['tabs'].values() for file_name in _entry_files(entry)}
+        for entry in replaced:
+            for file_name in _entry_files(entry):
+                if file_name not in current:
+                    try:
+                        os.remove(os.path.join(self.folder, file_name))
+                    except OSError:
+                        pass
+
+    def _write_partitions(self, tab_name, df):
+        """Write one file per month of a partitioned tab; returns its manifest entry"""
+        df = df.reset_index(drop=True)
+        df[ROW_COLUMN] = range(len(df))
+        months = {}
+        for month, part in df.groupby(partition_keys(df[PARTITIONED_TABS[tab_name]]), sort=True):
+            label = month if month != UNDATED else 'undated'
+            months[month] = self._write_file(f"{tab_name}.{label}", part.reset_index(drop=True))
+        return {'columns': [str(col) for col in df.columns if col != ROW_COLUMN], 'months': months}
+
+    def _write_file(self, name, df):
+        """Write a frame to <name>.<extension> atomically; returns the file name"""
+        file_name = f"{name}.{'arrow' if self.format == 'arrow' else 'pkl'}"
+        path = os.path.join(self.folder, file_name)
+        # Per-process temp name: terminals sharing the store may refresh the same snapshot
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._write_frame(df, tmp_path)
+        os.replace(tmp_path, path)
+        return file_name
+
+    def _write_frame(self, df, path):
+        if self.format == 'arrow':
+            feather.write_feather(df, path, compression='uncompressed')
+        else:
+            df.to_pickle(path)
+
+    def clear(self):
+        """Invalidate every snapshot (e.g. after the workbook was recreated)"""
+        if os.path.exists(self.manifest_file):
+            os.remove(self.manifest_file)
+
+    # ===== MANIFEST =====
+    def workbook_stamp(self):
+        """(mtime, size) of the workbook, or None if it is missing"""
+        try:
+            stat = os.stat(self.excel_file)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {'tabs': {}}
+        # Snapshots written by the other format cannot be read
+        if manifest.get('format') != self.format:
+            return {'tabs': {}}
+        return manifest
+
+    def _write_manifest(self, manifest):
+        tmp_path = f"{self.manifest_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+            os.replace(tmp_path, self.manifest_file)
+        except OSError as e:
+            print(f"⚠️ Could not save snapshot manifest: {e}")
+
+
+def _entry_files(entry):
+    """Files behind a manifest entry (a file name, or a partitioned tab's months)"""
+    if entry is None:
+        return []
+    if isinstance(entry, dict):
+        return list(entry['months'].values())
+    return [entry]
+
+
+def _as_stored(df):
+    """Convert date/time values to the text the workbook writer stores for them"""
+    converted = None
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            text = series.dt.strftime("%Y-%m-%d %H:%M:%S").str.replace(" 00:00:00", "", regex=False)
+        elif series.dtype == object and series.map(lambda v: isinstance(v, datetime)).any():
+            text = series.map(lambda v: _datetime_text(v) if isinstance(v, datetime) else v)
+        else:
+            continue
+        if converted is None:
+            converted = df.copy()
+        converted[col] = text
+    return df if converted is None else converted
+
+
+def _datetime_text(value):
+    if value.hour == value.minute == value.second == 0 and value.microsecond == 0:
+        return value.strftime("%Y-%m-%d")
+    return value.strftime("%Y-%m-%d %H:%M:%S")
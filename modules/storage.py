@@ -0,0 +1,703 @@
+# modules/storage.py - Storage backends behind InventoryDB
+import json
+import math
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from modules.atomic_file import atomic_write
+from modules.partitions import PARTITIONED_TABS, range_bounds, range_mask
+from modules.schema import NUMBER_COLUMNS, read_dtypes
+from modules.snapshot import TabSnapshots
+from modules.xlsx_writer import replace_sheets
+
+# Primary key column of each tab
+TAB_KEYS = {
+    'Products': 'Product_ID',
+    'Ingredients': 'Ingredient_ID',
+    'Recipes': 'Recipe_ID',
+    'Sales': 'Sale_ID',
+    'Sales_Daily': 'Rollup_Key',
+    'Inventory_Log': 'Log_ID',
+    'Expenses': 'Expense_ID'
+}
+
+# Secondary indexes created by the SQLite backend
+TAB_INDEXES = {
+    'Recipes': ['Product_ID', 'Ingredient_ID'],
+    'Sales': ['Product_ID', 'Sale_Date'],
+    'Sales_Daily': ['Sale_Date'],
+    'Inventory_Log': ['Ingredient_ID', 'Date'],
+    'Expenses': ['Expense_Date']
+}
+
+# Append-only tabs whose single-row appends go to the journal file on the Excel backend
+JOURNALED_TABS = ('Sales', 'Inventory_Log')
+
+# Journal size at which InventoryDB folds it back into the workbook
+JOURNAL_COMPACT_ROWS = 1000
+
+# Columns stored as REAL in SQLite (everything else is TEXT); Min_Stock is a legacy name
+REAL_COLUMNS = NUMBER_COLUMNS | {'Min_Stock'}
+
+
+def journal_path(excel_file):
+    """Journal file kept next to the workbook (data/inventory.journal.jsonl)"""
+    return os.path.splitext(excel_file)[0] + '.journal.jsonl'
+
+
+def sequences_path(excel_file):
+    """ID counters kept next to the workbook (data/inventory.sequences.json)"""
+    return os.path.splitext(excel_file)[0] + '.sequences.json'
+
+
+def create_storage(backend, excel_file, sqlite_file=None):
+    """Create the storage backend selected in config ('excel' or 'sqlite')"""
+    backend = (backend or 'excel').lower()
+    if backend == 'excel':
+        return ExcelStorage(excel_file)
+    if backend == 'sqlite':
+        if not sqlite_file:
+            sqlite_file = os.path.splitext(excel_file)[0] + '.db'
+        return SQLiteStorage(sqlite_file)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+class ExcelStorage:
+    """
+    One workbook, one sheet per tab, plus a journal of pending row changes
+
+    Parsed sheets are kept as columnar snapshots (see modules/snapshot.py),
+    so a tab is only parsed from the workbook after the file changed
+    behind our back.
+    """
+    name = 'excel'
+    # Row changes are applied by rewriting the tab
+    row_level_writes = False
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_file = journal_path(path)
+        self.sequence_file = sequences_path(path)
+        self.snapshots = TabSnapshots(path)
+        self._journal_rows = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def stamp(self):
+        """Return (mtime, size) of the workbook and journal, or None if the workbook is missing"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        try:
+            journal = os.stat(self.journal_file)
+            journal_stamp = (journal.st_mtime_ns, journal.st_size)
+        except OSError:
+            journal_stamp = None
+        return (stat.st_mtime_ns, stat.st_size, journal_stamp)
+
+    def tab_names(self):
+        with pd.ExcelFile(self.path) as excel_file:
+            return excel_file.sheet_names
+
+    def create(self, tabs):
+        """Create a new workbook with the given {tab_name: DataFrame}"""
+        with atomic_write(self.path, keep_backup=True) as tmp_path:
+            with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
+                for tab_name, df in tabs.items():
+                    df.to_excel(writer, sheet_name=tab_name, index=False)
+        # A journal, counters or snapshots left behind by a deleted workbook must not leak into the new one
+        self._remove_journal()
+        self.reset_sequences()
+        self.snapshots.clear()
+
+    def add_tabs(self, tabs):
+        """Add new sheets to the existing workbook"""
+        with atomic_write(self.path, keep_backup=True) as tmp_path:
+            # Append to a copy, so a failed write leaves the workbook as it was
+            shutil.copyfile(self.path, tmp_path)
+            with pd.ExcelWriter(tmp_path, engine='openpyxl', mode='a',
+                                if_sheet_exists='overlay') as writer:
+                for tab_name, df in tabs.items():
+                    df.to_excel(writer, sheet_name=tab_name, index=False)
+
+    def read(self, tab_name):
+        df = self.snapshots.load(tab_name)
+        if df is None:
+            df = pd.read_excel(self.path, sheet_name=tab_name, dtype=read_dtypes(tab_name))
+            self.snapshots.store(tab_name, df)
+        return self._merge_journal(tab_name, df)
+
+    def read_range(self, tab_name, start=None, end=None):
+        """
+        Read the rows of a partitioned tab dated within [start, end]
+
+        Only the monthly snapshots the range covers are loaded, plus the
+        journal; without a current snapshot the sheet is parsed (and
+        snapshotted) once.
+
+        Args:
+            tab_name: Tab listed in PARTITIONED_TABS
+            start: First day (Timestamp), or None for no lower bound
+            end: Last day (Timestamp), or None for no upper bound
+        """
+        df = self.snapshots.load_months(tab_name,
+                                        start.strftime("%Y-%m") if start is not None else None,
+                                        end.strftime("%Y-%m") if end is not None else None)
+        if df is None:
+            df = self.read(tab_name)
+        else:
+            df = self._merge_journal(tab_name, df)
+        return _rows_in_range(tab_name, df, start, end)
+
+    def write(self, tab_name, df):
+        self.write_tabs({tab_name: df})
+
+    def write_tabs(self, tabs):
+        """Replace several tabs ({tab_name: DataFrame}) in one workbook write"""
+        self._replace_sheets(tabs)
+        # The written frames already contain any journaled changes of their tabs
+        self._drop_journal_entries(set(tabs))
+
+    def _replace_sheets(self, tabs):
+        """Write {tab_name: DataFrame} to the workbook and refresh their snapshots"""
+        stamp_before = self.snapshots.workbook_stamp()
+        # Only the target sheets are serialized; other sheets are copied as-is
+        if replace_sheets(self.path, tabs):
+            self.snapshots.refresh(tabs, stamp_before)
+        else:
+            self._rewrite_workbook(tabs)
+            self.snapshots.clear()
+
+    def _rewrite_workbook(self, changed_tabs):
+        """Rewrite the whole workbook (used when a sheet has to be added)"""
+        # Read all existing tabs
+        all_tabs = {}
+        try:
+            excel_file = pd.ExcelFile(self.path)
+            for sheet in excel_file.sheet_names:
+                if sheet not in changed_tabs:
+                    all_tabs[sheet] = pd.read_excel(self.path, sheet_name=sheet)
+        except:
+            pass
+
+        # Add/update changed tabs
+        all_tabs.update(changed_tabs)
+
+        # Write all tabs to a new workbook that replaces the old one when complete
+        with atomic_write(self.path, keep_backup=True) as tmp_path:
+            with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
+                for sheet_name, sheet_data in all_tabs.items():
+                    sheet_data.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    # ----- Journal -----
+    def supports_append(self, tab_name):
+        """Whether rows can be appended without rewriting the tab"""
+        return tab_name in JOURNALED_TABS
+
+    def append(self, tab_name, rows_df):
+        """Append rows to the journal in O(1); returns the number of rows added"""
+        ops = [{'tab': tab_name, 'row': _plain_record(row)}
+               for row in rows_df.to_dict('records')]
+        self._write_journal_line(ops)
+        return len(ops)
+
+    def commit(self, appends=None, updates=None):
+        """
+        Apply appends and keyed updates to several tabs as one transaction
+
+        All changes are written as a single journal line, so an interrupted
+        commit leaves a torn line that is skipped on read and nothing applies.
+
+        Args:
+            appends: Dictionary of {tab_name: DataFrame of new rows}
+            updates: Dictionary of {tab_name: {key: {column: value}}}
+        """
+        ops = []
+        for tab_name, rows_df in (appends or {}).items():
+            ops.extend({'tab': tab_name, 'row': _plain_record(row)}
+                       for row in rows_df.to_dict('records'))
+        for tab_name, tab_updates in (updates or {}).items():
+            ops.extend({'tab': tab_name, 'key': _plain_value(key), 'values': _plain_record(values)}
+                       for key, values in tab_updates.items())
+        if ops:
+            self._write_journal_line(ops)
+
+    def _write_journal_line(self, ops):
+        """Durably append one transaction (a list of operations) to the journal"""
+        pending = self.journal_size()
+        line = json.dumps({'ops': ops}, ensure_ascii=False) + '\n'
+        with open(self.journal_file, 'a+b') as journal:
+            # Terminate a torn line so it does not swallow this transaction
+            if journal.tell() > 0:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b'\n':
+                    line = '\n' + line
+            journal.write(line.encode('utf-8'))
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._journal_rows = pending + len(ops)
+
+    def _journal_transactions(self):
+        """Return the complete journal lines as lists of operations"""
+        transactions = []
+        if not os.path.exists(self.journal_file):
+            return transactions
+        with open(self.journal_file, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    transactions.append(json.loads(line)['ops'])
+                except (ValueError, KeyError, TypeError):
+                    # Torn line from an interrupted write
+                    continue
+        return transactions
+
+    def _read_journal(self):
+        """Return journaled operations grouped by tab: {tab_name: [op, ...]}"""
+        entries = {}
+        for ops in self._journal_transactions():
+            for op in ops:
+                entries.setdefault(op['tab'], []).append(op)
+        return entries
+
+    def journal_size(self):
+        """Number of operations waiting in the journal"""
+        if self._journal_rows is None:
+            self._journal_rows = sum(len(ops) for ops in self._journal_transactions())
+        return self._journal_rows
+
+    def needs_compaction(self):
+        return self.journal_size() >= JOURNAL_COMPACT_ROWS
+
+    def _merge_journal(self, tab_name, base_df):
+        """Apply the journaled appends and updates of a tab to its base sheet"""
+        ops = self._read_journal().get(tab_name)
+        if not ops:
+            return base_df
+
+        df = base_df
+        key = TAB_KEYS.get(tab_name)
+        rows = [op['row'] for op in ops if 'row' in op]
+        if rows:
+            journal_df = pd.DataFrame(rows)
+            # Rows already folded into the sheet by an interrupted compaction
+            if key in base_df.columns and key in journal_df.columns:
+                journal_df = journal_df[~journal_df[key].isin(base_df[key])]
+            df = pd.concat([base_df, journal_df], ignore_index=True)
+
+        updates = {}
+        for op in ops:
+            if 'values' in op:
+                updates.setdefault(op['key'], {}).update(op['values'])
+        return apply_updates(df, key, updates)
+
+    def compact(self):
+        """Fold the journal into the base sheets; returns the number of operations folded"""
+        entries = self._read_journal()
+        if not entries:
+            self._remove_journal()
+            return 0
+
+        tabs = {tab_name: self.read(tab_name) for tab_name in entries}
+        self._replace_sheets(tabs)
+        self._remove_journal()
+        return sum(len(ops) for ops in entries.values())
+
+    def _drop_journal_entries(self, tab_names):
+        """Remove the journaled operations of the given tabs"""
+        transactions = self._journal_transactions()
+        if not any(op['tab'] in tab_names for ops in transactions for op in ops):
+            return
+        remaining = [[op for op in ops if op['tab'] not in tab_names] for ops in transactions]
+        remaining = [json.dumps({'ops': ops}, ensure_ascii=False) for ops in remaining if ops]
+        if not remaining:
+            self._remove_journal()
+            return
+        with atomic_write(self.journal_file) as tmp_path:
+            with open(tmp_path, 'w', encoding='utf-8') as journal:
+                journal.write('\n'.join(remaining) + '\n')
+        self._journal_rows = None
+
+    def _remove_journal(self):
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._journal_rows = 0
+
+    # ----- ID sequences -----
+    def sequence_value(self, name):
+        """Last number handed out for a sequence, or None if it was never used"""
+        return self._read_sequences().get(name)
+
+    def reserve_sequence(self, name, count=1, floor=0):
+        """
+        Reserve count numbers of a sequence
+
+        The sidecar file is read, bumped and replaced, so callers must hold
+        the store lock exclusively (InventoryDB.reserve_ids does).
+
+        Args:
+            name: Sequence name (ID prefix)
+            count: How many consecutive numbers to reserve
+            floor: Numbers up to floor are treated as used (seeds new counters)
+
+        Returns:
+            First reserved number
+        """
+        counters = self._read_sequences()
+        first = max(counters.get(name, 0), floor) + 1
+        counters[name] = first + count - 1
+
+        with atomic_write(self.sequence_file) as tmp_path:
+            with open(tmp_path, 'w', encoding='utf-8') as sequence_file:
+                json.dump(counters, sequence_file, indent=2)
+        return first
+
+    def _read_sequences(self):
+        try:
+            with open(self.sequence_file, 'r', encoding='utf-8') as sequence_file:
+                return json.load(sequence_file)
+        except (OSError, ValueError):
+            return {}
+
+    def reset_sequences(self):
+        """Forget all counters; they are re-seeded from the data on next use"""
+        if os.path.exists(self.sequence_file):
+            os.remove(self.sequence_file)
+
+    def close(self):
+        pass
+
+
+def _quote(identifier):
+    """Quote a table/column name for SQL"""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def apply_updates(df, key_column, updates, key_index=None):
+    """
+    Apply keyed updates to a DataFrame
+
+    Args:
+        df: DataFrame to update (not modified)
+        key_column: Column holding the row keys
+        updates: Dictionary of {key: {column: value}}
+        key_index: Optional {str(key): row position} index of df with unique
+                   keys; rows are then located without scanning key_column
+
+    Returns:
+        Updated copy of df (df itself if nothing matches)
+    """
+    if not updates or key_column not in df.columns:
+        return df
+
+    # Row position -> values to set there
+    if key_index is not None:
+        located = {key_index[str(key)]: values for key, values in updates.items()
+                   if str(key) in key_index}
+    else:
+        keys = df[key_column].astype(str)
+        wanted = {str(key): values for key, values in updates.items()}
+        positions = np.flatnonzero(keys.isin(list(wanted)).to_numpy())
+        located = {pos: wanted[keys.iat[pos]] for pos in positions}
+    if not located:
+        return df
+
+    updated = df.copy()
+    for col in {col for values in located.values() for col in values}:
+        # Rebuild the column from Python values so its dtype can widen (int -> float)
+        column = updated[col].tolist() if col in updated.columns else [None] * len(updated)
+        for pos, values in located.items():
+            if col in values:
+                column[pos] = values[col]
+        updated[col] = column
+    return updated
+
+
+def _rows_in_range(tab_name, df, start, end):
+    """Rows of a partitioned tab whose date falls within [start, end]"""
+    date_column = PARTITIONED_TABS[tab_name]
+    if date_column not in df.columns:
+        return df.iloc[0:0]
+    return df[range_mask(df[date_column], start, end).to_numpy()].reset_index(drop=True)
+
+
+def _plain_record(record):
+    """Convert a {column: value} mapping to plain Python values"""
+    return {str(col): _plain_value(value) for col, value in record.items()}
+
+
+def _plain_value(value):
+    """Convert a pandas/numpy cell value to a plain Python value (for SQLite/JSON)"""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return None if math.isnan(value) else value
+    if isinstance(value, (pd.Timestamp, datetime)):
+        if value.hour == value.minute == value.second == 0:
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, (int, str, bytes)):
+        return value
+    return str(value)
+
+
+class SQLiteStorage:
+    """Local SQLite file with one table per tab"""
+    name = 'sqlite'
+    # Appends, point updates and deletes run as single SQL statements
+    row_level_writes = True
+
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+
+    def exists(self):
+        return bool(self.tab_names())
+
+    def stamp(self):
+        """Changes whenever another connection commits to the database"""
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def tab_names(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY rowid").fetchall()
+        # Internal tables (e.g. _sequences) are not tabs
+        return [row[0] for row in rows if not row[0].startswith('_')]
+
+    def create(self, tabs):
+        self.add_tabs(tabs)
+        self.reset_sequences()
+
+    def add_tabs(self, tabs):
+        with self._lock, self._conn:
+            for tab_name, df in tabs.items():
+                self._create_table(tab_name, list(df.columns))
+
+    def _create_table(self, tab_name, columns):
+        key = TAB_KEYS.get(tab_name)
+        column_defs = []
+        for col in columns:
+            col_type = 'REAL' if col in REAL_COLUMNS else 'TEXT'
+            primary = ' PRIMARY KEY' if col == key else ''
+            column_defs.append(f"{_quote(col)} {col_type}{primary}")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {_quote(tab_name)} ({', '.join(column_defs)})")
+        for col in TAB_INDEXES.get(tab_name, []):
+            if col in columns:
+                index_name = f"idx_{tab_name}_{col}".lower()
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(index_name)} "
+                    f"ON {_quote(tab_name)} ({_quote(col)})")
+
+    def _columns(self, tab_name):
+        rows = self._conn.execute(f"PRAGMA table_info({_quote(tab_name)})").fetchall()
+        return [row[1] for row in rows]
+
+    def _prepare_table(self, tab_name, columns):
+        """Create the table or add columns that are new to it"""
+        existing = self._columns(tab_name)
+        if not existing:
+            self._create_table(tab_name, columns)
+            return
+        for col in columns:
+            if col not in existing:
+                col_type = 'REAL' if col in REAL_COLUMNS else 'TEXT'
+                self._conn.execute(
+                    f"ALTER TABLE {_quote(tab_name)} ADD COLUMN {_quote(col)} {col_type}")
+
+    def _insert(self, tab_name, df):
+        if df.empty:
+            return
+        columns = [str(col) for col in df.columns]
+        placeholders = ', '.join('?' for _ in columns)
+        sql = (f"INSERT INTO {_quote(tab_name)} ({', '.join(_quote(c) for c in columns)}) "
+               f"VALUES ({placeholders})")
+        rows = [tuple(_plain_value(v) for v in row)
+                for row in df.itertuples(index=False, name=None)]
+        self._conn.executemany(sql, rows)
+
+    def read(self, tab_name):
+        with self._lock:
+            if not self._columns(tab_name):
+                raise ValueError(f"Worksheet named '{tab_name}' not found")
+            return pd.read_sql_query(
+                f"SELECT * FROM {_quote(tab_name)} ORDER BY rowid", self._conn)
+
+    def read_range(self, tab_name, start=None, end=None):
+        """Read the rows of a partitioned tab dated within [start, end] (uses the date index)"""
+        date_column = _quote(PARTITIONED_TABS[tab_name])
+        lower, upper = range_bounds(start, end)
+        conditions, params = [], []
+        if lower is not None:
+            conditions.append(f"{date_column} >= ?")
+            params.append(lower)
+        if upper is not None:
+            conditions.append(f"{date_column} < ?")
+            params.append(upper)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ''
+        with self._lock:
+            if not self._columns(tab_name):
+                raise ValueError(f"Worksheet named '{tab_name}' not found")
+            df = pd.read_sql_query(
+                f"SELECT * FROM {_quote(tab_name)} {where}ORDER BY rowid", self._conn, params=params)
+        return _rows_in_range(tab_name, df, start, end)
+
+    def write(self, tab_name, df):
+        """Replace all rows of a tab"""
+        self.write_tabs({tab_name: df})
+
+    def write_tabs(self, tabs):
+        """Replace all rows of several tabs ({tab_name: DataFrame}) in one transaction"""
+        with self._lock, self._conn:
+            for tab_name, df in tabs.items():
+                self._prepare_table(tab_name, [str(col) for col in df.columns])
+                self._conn.execute(f"DELETE FROM {_quote(tab_name)}")
+                self._insert(tab_name, df)
+
+    def supports_append(self, tab_name):
+        return True
+
+    def needs_compaction(self):
+        return False
+
+    def compact(self):
+        return 0
+
+    def append(self, tab_name, rows_df):
+        """Insert rows; returns the number of rows added"""
+        with self._lock, self._conn:
+            self._prepare_table(tab_name, [str(col) for col in rows_df.columns])
+            self._insert(tab_name, rows_df)
+        return len(rows_df)
+
+    def find(self, tab_name, key_column, key):
+        """Return the rows whose key_column equals key"""
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT * FROM {_quote(tab_name)} WHERE {_quote(key_column)} = ? ORDER BY rowid",
+                self._conn, params=(_plain_value(key),))
+
+    def update(self, tab_name, key_column, updates):
+        """
+        Update rows by key in one transaction
+
+        Args:
+            updates: Dictionary of {key: {column: value}}
+
+        Returns:
+            Number of rows updated
+        """
+        with self._lock, self._conn:
+            return self._update(tab_name, key_column, updates)
+
+    def _update(self, tab_name, key_column, updates):
+        updated = 0
+        columns = {col for values in updates.values() for col in values}
+        self._prepare_table(tab_name, sorted(columns))
+        for key, values in updates.items():
+            if not values:
+                continue
+            assignments = ', '.join(f"{_quote(col)} = ?" for col in values)
+            cursor = self._conn.execute(
+                f"UPDATE {_quote(tab_name)} SET {assignments} WHERE {_quote(key_column)} = ?",
+                [_plain_value(v) for v in values.values()] + [_plain_value(key)])
+            updated += cursor.rowcount
+        return updated
+
+    def commit(self, appends=None, updates=None):
+        """
+        Apply appends and keyed updates to several tabs in one SQL transaction
+
+        Args:
+            appends: Dictionary of {tab_name: DataFrame of new rows}
+            updates: Dictionary of {tab_name: {key: {column: value}}}
+        """
+        with self._lock, self._conn:
+            for tab_name, rows_df in (appends or {}).items():
+                self._prepare_table(tab_name, [str(col) for col in rows_df.columns])
+                self._insert(tab_name, rows_df)
+            for tab_name, tab_updates in (updates or {}).items():
+                self._update(tab_name, TAB_KEYS[tab_name], tab_updates)
+
+    def delete(self, tab_name, key_column, key):
+        """Delete the rows matching key; returns the row count"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM {_quote(tab_name)} WHERE {_quote(key_column)} = ?",
+                (_plain_value(key),))
+            return cursor.rowcount
+
+    def replace_rows(self, tab_name, key_column, key, rows_df):
+        """Swap the rows matching key for rows_df in one transaction"""
+        with self._lock, self._conn:
+            self._prepare_table(tab_name, [str(col) for col in rows_df.columns])
+            self._conn.execute(
+                f"DELETE FROM {_quote(tab_name)} WHERE {_quote(key_column)} = ?",
+                (_plain_value(key),))
+            self._insert(tab_name, rows_df)
+        return len(rows_df)
+
+    def count(self, tab_name):
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {_quote(tab_name)}").fetchone()[0]
+
+    # ----- ID sequences -----
+    def _ensure_sequence_table(self):
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS _sequences (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def sequence_value(self, name):
+        """Last number handed out for a sequence, or None if it was never used"""
+        with self._lock:
+            self._ensure_sequence_table()
+            row = self._conn.execute(
+                "SELECT value FROM _sequences WHERE name = ?", (name,)).fetchone()
+            self._conn.commit()
+        return row[0] if row else None
+
+    def reserve_sequence(self, name, count=1, floor=0):
+        """Atomically reserve count numbers of a sequence; returns the first one"""
+        with self._lock:
+            self._ensure_sequence_table()
+            self._conn.commit()
+            # IMMEDIATE takes the write lock up front, so other processes wait
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM _sequences WHERE name = ?", (name,)).fetchone()
+                first = max(row[0] if row else 0, floor) + 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO _sequences (name, value) VALUES (?, ?)",
+                    (name, first + count - 1))
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return first
+
+    def reset_sequences(self):
+        """Forget all counters; they are re-seeded from the data on next use"""
+        with self._lock, self._conn:
+            self._conn.execute("DROP TABLE IF EXISTS _sequences")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -8,7 +8,9 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
+from modules.partitions import period_bounds, range_mask
+from modules.virtual_table import VirtualTable
 
 class AppTemplates:
     """Collection of reusable GUI templates"""
@@ -200,34 +202,20 @@ class AppTemplates:
         """
         Create a scrollable data table
         
+        Only the rows in view get widgets (see VirtualTable), so large
+        tables render as fast as small ones.
+        
         Args:
             headers: List of column headers
             column_widths: List of column widths
             data: List of dictionaries or pandas DataFrame
             height: Table height
         """
-        scroll_frame = ctk.CTkScrollableFrame(parent, height=height)
-        scroll_frame.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Table headers
-        for col, (header, width) in enumerate(zip(headers, column_widths)):
-            ctk.CTkLabel(scroll_frame, text=header, 
-                        font=("Arial", 12, "bold"),
-                        width=width).grid(row=0, column=col, padx=5, pady=5, sticky="w")
-        
-        # If data is pandas DataFrame, convert to list of dicts
-        if isinstance(data, pd.DataFrame):
-            data = data.to_dict('records')
-        
-        # Add data rows
-        for row_idx, row_data in enumerate(data, start=1):
-            for col_idx, header in enumerate(headers):
-                value = row_data.get(header, "")
-                ctk.CTkLabel(scroll_frame, text=str(value)[:50], 
-                            width=column_widths[col_idx]).grid(
-                            row=row_idx, column=col_idx, padx=5, pady=2, sticky="w")
-        
-        return scroll_frame
+        columns = [{'header': header, 'width': width, 'value': header, 'max_chars': 50}
+                   for header, width in zip(headers, column_widths)]
+        table = VirtualTable(parent, columns, data, height=height)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+        return table
     
     @staticmethod
     def create_status_label(parent, initial_text="", font_size=12):
@@ -296,25 +284,6 @@ class AppTemplates:
 class DatabaseTemplates:
     """Templates for database operations"""
     
-    @staticmethod
-    def generate_id(prefix, existing_ids, digits=4):
-        """Generate a sequential ID"""
-        numbers = []
-        for existing_id in existing_ids:
-            if isinstance(existing_id, str) and existing_id.startswith(prefix):
-                try:
-                    num = int(existing_id[len(prefix):])
-                    numbers.append(num)
-                except:
-                    pass
-        
-        if numbers:
-            next_num = max(numbers) + 1
-        else:
-            next_num = 1
-        
-        return f"{prefix}{next_num:0{digits}d}"
-    
     @staticmethod
     def filter_by_date(df, date_column, period, custom_from=None, custom_to=None):
         """Filter dataframe by time period"""
@@ -322,41 +291,11 @@ class DatabaseTemplates:
             return df
         
         try:
+            start, end = period_bounds(period, custom_from, custom_to)
             df[date_column] = pd.to_datetime(df[date_column])
-            
-            if period == "All Time":
-                return df
-            elif period == "Today":
-                today = datetime.now().strftime("%Y-%m-%d")
-                return df[df[date_column].dt.strftime("%Y-%m-%d") == today]
-            elif period == "Yesterday":
-                yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-                return df[df[date_column].dt.strftime("%Y-%m-%d") == yesterday]
-            elif period == "Last 7 days":
-                cutoff = datetime.now() - timedelta(days=7)
-                return df[df[date_column] >= cutoff]
-            elif period == "Last 30 days":
-                cutoff = datetime.now() - timedelta(days=30)
-                return df[df[date_column] >= cutoff]
-            elif period == "This Month":
-                now = datetime.now()
-                start_of_month = datetime(now.year, now.month, 1)
-                return df[df[date_column] >= start_of_month]
-            elif period == "Last Month":
-                now = datetime.now()
-                if now.month == 1:
-                    start_last = datetime(now.year - 1, 12, 1)
-                    end_last = datetime(now.year, 1, 1)
-                else:
-                    start_last = datetime(now.year, now.month - 1, 1)
-                    end_last = datetime(now.year, now.month, 1)
-                return df[(df[date_column] >= start_last) & (df[date_column] < end_last)]
-            elif period == "Custom" and custom_from and custom_to:
-                from_date = pd.to_datetime(custom_from)
-                to_date = pd.to_datetime(custom_to)
-                return df[(df[date_column] >= from_date) & (df[date_column] <= to_date)]
-            else:
+            if start is None and end is None:
                 return df
+            return df[range_mask(df[date_column], start, end)]
                 
         except Exception as e:
             print(f"Error filtering by date: {e}")
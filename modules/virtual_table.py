@@ -0,0 +1,248 @@
+# modules/virtual_table.py - Scrollable table that only builds widgets for visible rows
+import customtkinter as ctk
+import pandas as pd
+
+from modules.row_window import (clamp_first_row, plan_rows, scroll_target, scrollbar_range,
+                                visible_row_count, wheel_steps)
+
+
+class VirtualTable(ctk.CTkFrame):
+    """
+    Data table bound to a DataFrame by row position
+
+    Only enough row widgets to fill the viewport are created. Scrolling
+    re-fills the same widgets with other rows, so memory and render time
+    depend on the table height, not on the number of rows. The windowing
+    arithmetic lives in modules.row_window.
+
+    Each column is a dictionary:
+        header: Header text
+        width: Column width in pixels
+        value: Column name, or callable(row) -> text
+        text_color: Color, or callable(row) -> color
+        badge: Optional callable(row) -> background color (rounded label)
+        font: Optional font tuple
+        anchor: 'w' (default) or 'center'
+        buttons: Optional list of button dictionaries (text, command(row),
+                 width, fg_color, hover_color, font, visible(row))
+        header_command: Optional callback when the header is clicked
+    """
+
+    def __init__(self, parent, columns, data=None, height=400, row_height=32,
+                 row_colors=None, header_colors=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columns = columns
+        self.row_height = row_height
+        self.row_colors = row_colors
+        self.data = pd.DataFrame()
+        self.first_row = 0
+
+        # Pooled row widgets: [{'frame', 'cells', 'index', 'shown'}]
+        self._pool = []
+        self._visible_rows = visible_row_count(height, row_height)
+
+        self._build_header(header_colors)
+
+        body_container = ctk.CTkFrame(self, fg_color="transparent")
+        body_container.pack(fill="both", expand=True)
+
+        self.scrollbar = ctk.CTkScrollbar(body_container, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body = ctk.CTkFrame(body_container, height=height, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_mouse_wheel(self.body)
+
+        self.set_data(data if data is not None else pd.DataFrame())
+
+    # ===== DATA =====
+    def set_data(self, data):
+        """Bind the table to a new DataFrame (list of dicts is accepted too)"""
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(data)
+        self.data = data.reset_index(drop=True)
+        self.first_row = 0
+        self._render(force=True)
+
+    def row_count(self):
+        return len(self.data)
+
+    def scroll_to(self, index):
+        """Scroll so that the given row is the first visible one"""
+        self.first_row = clamp_first_row(index, len(self.data), self._visible_rows)
+        self._render()
+
+    # ===== LAYOUT =====
+    def _build_header(self, header_colors):
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x")
+
+        for col, column in enumerate(self.columns):
+            header.grid_columnconfigure(col, minsize=column['width'])
+            color = header_colors[col % len(header_colors)] if header_colors else "transparent"
+            text_color = "white" if header_colors else None
+
+            if column.get('header_command'):
+                widget = ctk.CTkButton(header, text=column['header'],
+                                       font=("Arial", 12, "bold"),
+                                       fg_color=color if header_colors else "transparent",
+                                       hover_color="#4a6fa5",
+                                       text_color=text_color or ("black", "white"),
+                                       width=column['width'], height=35,
+                                       command=column['header_command'])
+            else:
+                widget = ctk.CTkLabel(header, text=column['header'],
+                                      font=("Arial", 12, "bold"),
+                                      fg_color=color, width=column['width'], height=35,
+                                      anchor=column.get('anchor', 'w'))
+                if text_color:
+                    widget.configure(text_color=text_color)
+            widget.grid(row=0, column=col, padx=1, pady=1, sticky="nsew")
+
+    def _create_row(self):
+        """Create one reusable row of cell widgets"""
+        frame = ctk.CTkFrame(self.body, height=self.row_height, corner_radius=0,
+                             fg_color="transparent")
+        cells = []
+        for col, column in enumerate(self.columns):
+            frame.grid_columnconfigure(col, minsize=column['width'])
+            if column.get('buttons'):
+                cell = ctk.CTkFrame(frame, fg_color="transparent", width=column['width'])
+                buttons = []
+                for spec in column['buttons']:
+                    button = ctk.CTkButton(cell, text=spec['text'],
+                                           width=spec.get('width', 35), height=25,
+                                           font=spec.get('font', ("Arial", 10)))
+                    for option in ('fg_color', 'hover_color'):
+                        if option in spec:
+                            button.configure(**{option: spec[option]})
+                    self._bind_mouse_wheel(button)
+                    buttons.append(button)
+                cell.buttons = buttons
+            else:
+                cell = ctk.CTkLabel(frame, text="", width=column['width'],
+                                    height=self.row_height - 6,
+                                    font=column.get('font', ("Arial", 11)),
+                                    anchor=column.get('anchor', 'w'))
+            cell.grid(row=0, column=col, padx=1, pady=1,
+                      sticky="w" if column.get('anchor', 'w') == 'w' else "")
+            self._bind_mouse_wheel(cell)
+            cells.append(cell)
+
+        self._bind_mouse_wheel(frame)
+        return {'frame': frame, 'cells': cells, 'index': None, 'shown': False, 'state': {}}
+
+    def _on_resize(self, event):
+        scaling = ctk.ScalingTracker.get_widget_scaling(self)
+        visible = visible_row_count(event.height, self.row_height, scaling)
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._render()
+
+    # ===== RENDERING =====
+    def _render(self, force=False):
+        """Fill the pooled rows with the rows currently in view"""
+        self.first_row = clamp_first_row(self.first_row, len(self.data), self._visible_rows)
+
+        while len(self._pool) < self._visible_rows:
+            self._pool.append(self._create_row())
+
+        fills, hides = plan_rows([pooled['index'] for pooled in self._pool], self.first_row,
+                                 len(self.data), self._visible_rows, force)
+        for slot in hides:
+            pooled = self._pool[slot]
+            pooled['frame'].place_forget()
+            pooled['shown'] = False
+            pooled['index'] = None
+
+        for slot, index in fills:
+            pooled = self._pool[slot]
+            self._fill_row(pooled, index)
+            if not pooled['shown']:
+                pooled['frame'].place(x=0, y=slot * self.row_height, relwidth=1)
+                pooled['shown'] = True
+
+        self._update_scrollbar()
+
+    def _fill_row(self, pooled, index):
+        row = self.data.iloc[index]
+        pooled['index'] = index
+
+        if self.row_colors:
+            self._configure(pooled, 'frame', pooled['frame'],
+                            fg_color=self.row_colors[index % len(self.row_colors)])
+
+        for col, (column, cell) in enumerate(zip(self.columns, pooled['cells'])):
+            if column.get('buttons'):
+                self._fill_buttons(column, cell, row)
+                continue
+
+            options = {'text': self._cell_text(column, row)}
+            text_color = column.get('text_color')
+            if callable(text_color):
+                text_color = _safe_call(text_color, row, None)
+            if column.get('badge'):
+                options['fg_color'] = _safe_call(column['badge'], row, "gray")
+                options['corner_radius'] = 10
+                text_color = text_color or "white"
+            if text_color:
+                options['text_color'] = text_color
+            self._configure(pooled, col, cell, **options)
+
+    def _fill_buttons(self, column, cell, row):
+        """Point the recycled buttons of a row at its data"""
+        for button in cell.buttons:
+            button.pack_forget()
+        for spec, button in zip(column['buttons'], cell.buttons):
+            visible = spec.get('visible')
+            if visible is not None and not _safe_call(visible, row, False):
+                continue
+            button.configure(command=lambda cb=spec['command'], r=row: cb(r))
+            button.pack(side="left", padx=2)
+
+    def _configure(self, pooled, key, widget, **options):
+        """Configure a widget only with options that changed since the last fill"""
+        state = pooled['state'].setdefault(key, {})
+        changed = {name: value for name, value in options.items() if state.get(name) != value}
+        if changed:
+            widget.configure(**changed)
+            state.update(changed)
+
+    def _cell_text(self, column, row):
+        value = column.get('value', column['header'])
+        if callable(value):
+            text = _safe_call(value, row, "")
+        else:
+            text = row.get(value, "")
+            if text is None or (not isinstance(text, str) and pd.isna(text)):
+                text = ""
+        text = str(text)
+        # Keep long values inside the column width
+        max_chars = column.get('max_chars', max(4, column['width'] // 7))
+        return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+    # ===== SCROLLING =====
+    def _update_scrollbar(self):
+        self.scrollbar.set(*scrollbar_range(self.first_row, len(self.data), self._visible_rows))
+
+    def _on_scrollbar(self, action, value, unit=None):
+        self.scroll_to(scroll_target(self.first_row, len(self.data), action, value, unit,
+                                     self._visible_rows))
+
+    def _on_mouse_wheel(self, event):
+        self.scroll_to(self.first_row + wheel_steps(event.num, event.delta) * 3)
+        return "break"
+
+    def _bind_mouse_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mouse_wheel)
+        widget.bind("<Button-4>", self._on_mouse_wheel)
+        widget.bind("<Button-5>", self._on_mouse_wheel)
+
+
+def _safe_call(func, row, default):
+    """Call a cell callback, falling back to a default on bad data"""
+    try:
+        return func(row)
+    except Exception:
+        return default
@@ -0,0 +1,231 @@
+# modules/xlsx_writer.py - Replace individual sheets inside an existing .xlsx
+import math
+import os
+import re
+import struct
+import zipfile
+import zlib
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, time as dt_time
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from modules.atomic_file import atomic_write
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+# Characters that are not allowed in XML 1.0 text
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def column_letter(index):
+    """Convert a 0-based column index to an Excel column name (0 -> A)"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _text_cell(ref, text, style=''):
+    text = _ILLEGAL_XML_CHARS.sub('', text)
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _value_cell(ref, value):
+    """Serialize one cell, returning '' for empty values"""
+    if value is None:
+        return ''
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}" t="n"><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value) or math.isinf(value):
+            return ''
+        return f'<c r="{ref}" t="n"><v>{float(value)!r}</v></c>'
+    if isinstance(value, (pd.Timestamp, datetime)):
+        if pd.isna(value):
+            return ''
+        if value.hour == value.minute == value.second == 0 and value.microsecond == 0:
+            return _text_cell(ref, value.strftime("%Y-%m-%d"))
+        return _text_cell(ref, value.strftime("%Y-%m-%d %H:%M:%S"))
+    if isinstance(value, (date, dt_time)):
+        return _text_cell(ref, value.isoformat())
+    if value is pd.NaT or value is pd.NA:
+        return ''
+    return _text_cell(ref, str(value))
+
+
+def build_sheet_xml(df, header_style=None):
+    """Build worksheet XML for a DataFrame (header row + data rows)"""
+    columns = [column_letter(i) for i in range(max(len(df.columns), 1))]
+    style = f' s="{header_style}"' if header_style is not None else ''
+
+    rows = []
+    header_cells = ''.join(_text_cell(f"{columns[i]}1", str(name), style)
+                           for i, name in enumerate(df.columns))
+    rows.append(f'<row r="1">{header_cells}</row>')
+
+    for row_num, values in enumerate(df.itertuples(index=False, name=None), start=2):
+        cells = ''.join(_value_cell(f"{columns[i]}{row_num}", value)
+                        for i, value in enumerate(values))
+        rows.append(f'<row r="{row_num}">{cells}</row>')
+
+    dimension = f"A1:{columns[len(df.columns) - 1] if len(df.columns) else 'A'}{len(df) + 1}"
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<worksheet xmlns="{MAIN_NS}"><dimension ref="{dimension}"/>'
+        f'<sheetData>{"".join(rows)}</sheetData></worksheet>'
+    ).encode('utf-8')
+
+
+def _sheet_parts(zf):
+    """Map sheet names to their worksheet part names inside the zip"""
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+
+    targets = {}
+    for rel in rels.findall(f'{{{PKG_REL_NS}}}Relationship'):
+        target = rel.get('Target', '')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = 'xl/' + target
+        targets[rel.get('Id')] = target
+
+    parts = {}
+    for sheet in workbook.iter(f'{{{MAIN_NS}}}sheet'):
+        part = targets.get(sheet.get(f'{{{REL_NS}}}id'))
+        if part:
+            parts[sheet.get('name')] = part
+    return parts
+
+
+def _header_style(zf):
+    """Reuse the bold header style pandas writes as cellXfs index 1, if present"""
+    try:
+        styles = ET.fromstring(zf.read('xl/styles.xml'))
+        cell_xfs = styles.find(f'{{{MAIN_NS}}}cellXfs')
+        if cell_xfs is not None and len(cell_xfs) > 1:
+            return 1
+    except (KeyError, ET.ParseError):
+        pass
+    return None
+
+
+def replace_sheets(path, sheets):
+    """
+    Replace the data of existing sheets without touching the others
+
+    Args:
+        path: Path to an existing .xlsx workbook
+        sheets: Dictionary of {sheet_name: DataFrame}
+
+    Returns:
+        True if the sheets were replaced, False if the workbook layout
+        requires a full rewrite (missing file/sheet, formula chain, ...)
+    """
+    if not os.path.exists(path):
+        return False
+
+    try:
+        with zipfile.ZipFile(path) as zf:
+            names = set(zf.namelist())
+            if 'xl/calcChain.xml' in names:
+                return False
+
+            parts = _sheet_parts(zf)
+            if any(name not in parts or parts[name] not in names for name in sheets):
+                return False
+
+            header_style = _header_style(zf)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        return False
+
+    new_parts = {parts[name]: build_sheet_xml(df, header_style)
+                 for name, df in sheets.items()}
+
+    # Written next to the workbook and renamed over it; the old version stays as .bak
+    try:
+        with open(path, 'rb') as source:
+            infos = zipfile.ZipFile(source).infolist()
+            if not all(info.filename in new_parts or _copyable(info) for info in infos):
+                return False
+            with atomic_write(path, keep_backup=True) as tmp_path, open(tmp_path, 'wb') as out:
+                members = []
+                for info in infos:
+                    if info.filename in new_parts:
+                        data = new_parts[info.filename]
+                        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+                        raw = compressor.compress(data) + compressor.flush()
+                        members.append(_write_member(out, info, zipfile.ZIP_DEFLATED,
+                                                     zlib.crc32(data), len(raw), len(data), raw))
+                    else:
+                        members.append(_write_member(out, info, info.compress_type, info.CRC,
+                                                     info.compress_size, info.file_size,
+                                                     _raw_member(source, info)))
+                _write_central_directory(out, members)
+    except zipfile.BadZipFile:
+        return False
+    return True
+
+
+# ===== RAW ZIP COPY =====
+# Unchanged members are copied as their stored compressed bytes, so a save
+# costs the size of the replaced sheets, not of the whole workbook.
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_CENTRAL_HEADER = struct.Struct('<4s4B4HL2L5H2L')
+_END_RECORD = struct.Struct('<4s4H2LH')
+_ZIP64_LIMIT = 0xFFFFFFFF
+
+
+def _copyable(info):
+    """Whether a member can be copied raw (not encrypted, no ZIP64 fields)"""
+    return not info.flag_bits & 0x1 and max(info.compress_size, info.file_size,
+                                            info.header_offset) < _ZIP64_LIMIT
+
+
+def _raw_member(source, info):
+    """Compressed bytes of a zip member as stored"""
+    source.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(source.read(_LOCAL_HEADER.size))
+    if header[0] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"Bad local header of {info.filename}")
+    source.seek(header[10] + header[11], os.SEEK_CUR)
+    return source.read(info.compress_size)
+
+
+def _dos_time(info):
+    year, month, day, hour, minute, second = info.date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def _write_member(out, info, method, crc, compress_size, file_size, raw):
+    """Write a local header and raw data; returns what the central directory needs"""
+    offset = out.tell()
+    name = info.filename.encode('utf-8')
+    # CRC and sizes go in the header, so no trailing data descriptor (bit 3)
+    flags = (info.flag_bits & ~0x08) | (0x800 if not info.filename.isascii() else 0)
+    dos_time, dos_date = _dos_time(info)
+    out.write(_LOCAL_HEADER.pack(b'PK\x03\x04', 20, 0, flags, method, dos_time, dos_date,
+                                 crc, compress_size, file_size, len(name), 0))
+    out.write(name)
+    out.write(raw)
+    return info, name, flags, method, dos_time, dos_date, crc, compress_size, file_size, offset
+
+
+def _write_central_directory(out, members):
+    start = out.tell()
+    for info, name, flags, method, dos_time, dos_date, crc, compress_size, file_size, offset in members:
+        out.write(_CENTRAL_HEADER.pack(b'PK\x01\x02', 20, info.create_system, 20, 0, flags, method,
+                                       dos_time, dos_date, crc, compress_size, file_size,
+                                       len(name), 0, 0, 0, info.internal_attr, info.external_attr, offset))
+        out.write(name)
+    size = out.tell() - start
+    out.write(_END_RECORD.pack(b'PK\x05\x06', 0, 0, len(members), len(members), size, start, 0))
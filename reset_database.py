@@ -118,6 +118,20 @@ def add_sample_data(excel_file):
         sales_df.to_excel(writer, sheet_name='Sales', index=False)
         print(f"✅ Added {len(sales_df)} sample sales")
 
+def move_sidecars_aside(excel_file, backup_file):
+    """Rename the files and folders kept next to a workbook to match its backup name"""
+    from modules.archive import archive_dir
+    from modules.atomic_file import backup_path
+    from modules.snapshot import snapshot_dir
+    from modules.storage import journal_path, sequences_path
+    
+    for path_of in (journal_path, sequences_path, snapshot_dir, archive_dir, backup_path):
+        old_path = path_of(excel_file)
+        if os.path.exists(old_path):
+            new_path = path_of(backup_file)
+            os.rename(old_path, new_path)
+            print(f"📦 Moved {old_path} to {new_path}")
+
 if __name__ == "__main__":
     print("=" * 50)
     print("DATABASE RESET TOOL")
@@ -128,11 +142,16 @@ if __name__ == "__main__":
     
     if response.lower() == 'y':
         # Backup old file if exists
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         if os.path.exists("data/inventory.xlsx"):
-            backup_name = f"data/inventory_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+            backup_name = f"data/inventory_backup_{stamp}.xlsx"
             os.rename("data/inventory.xlsx", backup_name)
             print(f"📦 Old database backed up as: {backup_name}")
         
+        # Files kept next to the workbook belong to the old database too:
+        # unsaved sales/log rows, ID counters, snapshots, archived history
+        move_sidecars_aside("data/inventory.xlsx", f"data/inventory_backup_{stamp}.xlsx")
+        
         recreate_database()
         
         print("\n" + "=" * 50)
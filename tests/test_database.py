@@ -0,0 +1,262 @@
+# tests/test_database.py - InventoryDB on both storage backends: checkout, journal, sequences, archive, write-behind
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from modules.database import InventoryDB
+from modules.storage import journal_path
+
+BACKENDS = ['excel', 'sqlite']
+
+INGREDIENT = {'Ingredient_Name': 'Flour', 'Unit': 'kg', 'Cost_Per_Unit': 2.0,
+              'Current_Stock': 10.0, 'Min_Stock_Level': 1.0}
+
+
+def open_db(tmp_path, backend, **options):
+    return InventoryDB(str(tmp_path / 'inventory.xlsx'), storage=backend, **options)
+
+
+def stock_of(db, ingredient_id):
+    ingredients = db.read_tab('Ingredients')
+    return float(ingredients.loc[ingredients['Ingredient_ID'] == ingredient_id, 'Current_Stock'].iloc[0])
+
+
+def add_product_with_recipe(db, name, ingredient_id, quantity, price=10.0):
+    success, message = db.add_product({'Product_Name': name, 'Selling_Price': price, 'Active': 'Yes'})
+    assert success, message
+    product_id = db.read_tab('Products')['Product_ID'].iloc[-1]
+    assert db.save_recipe(product_id, [{'ingredient_id': ingredient_id, 'quantity': quantity}])
+    return product_id
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def bakery(tmp_path, backend):
+    """Store with one ingredient (10 kg flour) and a product using 2 kg of it"""
+    db = open_db(tmp_path, backend)
+    assert db.add_ingredient(dict(INGREDIENT))[0]
+    add_product_with_recipe(db, 'Bread', 'ING001', 2.0)
+    yield db
+    db.close()
+
+
+# ===== CHECKOUT =====
+def test_checkout_records_sales_logs_and_stock_together(tmp_path, backend, bakery):
+    success, message, sales = bakery.process_checkout(
+        [{'product_id': 'PROD001', 'quantity': 3, 'unit_price': 10.0}])
+    assert success, message
+    assert [sale['Sale_ID'] for sale in sales] == ['SALE0001']
+
+    fresh = open_db(tmp_path, backend)
+    assert stock_of(fresh, 'ING001') == 4.0
+    assert fresh.read_tab('Sales')['Total_Amount'].tolist() == [30.0]
+    assert fresh.read_tab('Inventory_Log')['Quantity'].tolist() == [-6.0]
+    fresh.close()
+
+
+def test_checkout_with_insufficient_stock_writes_nothing(tmp_path, backend, bakery):
+    add_product_with_recipe(bakery, 'Cake', 'ING001', 5.0)
+    # Each line fits on its own; together they need 4 + 10 kg of the 10 kg in stock
+    cart = [{'product_id': 'PROD001', 'quantity': 2, 'unit_price': 10.0},
+            {'product_id': 'PROD002', 'quantity': 2, 'unit_price': 20.0}]
+    success, message, sales = bakery.process_checkout(cart)
+    assert not success
+    assert 'Flour' in message
+    assert sales == []
+
+    for db in (bakery, open_db(tmp_path, backend)):
+        assert stock_of(db, 'ING001') == 10.0
+        assert db.read_tab('Sales').empty
+        assert db.read_tab('Inventory_Log').empty
+        assert db.read_tab('Sales_Daily').empty
+
+
+def test_failed_checkout_commit_leaves_cache_and_store_unchanged(tmp_path, backend, bakery, monkeypatch):
+    def failing_commit(appends=None, updates=None):
+        raise OSError("disk full")
+    monkeypatch.setattr(bakery.storage, 'commit', failing_commit)
+
+    success, _, _ = bakery.process_checkout([{'product_id': 'PROD001', 'quantity': 1, 'unit_price': 10.0}])
+    assert not success
+    assert stock_of(bakery, 'ING001') == 10.0
+    assert bakery.read_tab('Sales').empty
+    monkeypatch.undo()
+
+    fresh = open_db(tmp_path, backend)
+    assert fresh.read_tab('Sales').empty
+    fresh.close()
+
+
+# ===== EXCEL JOURNAL =====
+def test_journal_rows_are_merged_on_read_and_replayed_by_a_new_instance(tmp_path):
+    db = open_db(tmp_path, 'excel')
+    assert db.add_ingredient(dict(INGREDIENT))[0]
+    add_product_with_recipe(db, 'Bread', 'ING001', 2.0)
+    assert db.process_checkout([{'product_id': 'PROD001', 'quantity': 1, 'unit_price': 10.0}])[0]
+
+    # The sale and the stock change sit in the journal, not the workbook
+    workbook = str(tmp_path / 'inventory.xlsx')
+    assert os.path.exists(journal_path(workbook))
+    assert pd.read_excel(workbook, 'Sales').empty
+    assert pd.read_excel(workbook, 'Ingredients')['Current_Stock'].tolist() == [10.0]
+
+    fresh = open_db(tmp_path, 'excel')
+    assert len(fresh.read_tab('Sales')) == 1
+    assert stock_of(fresh, 'ING001') == 8.0
+    fresh.close()
+    db.close()
+
+
+def test_journal_skips_a_torn_transaction(tmp_path):
+    db = open_db(tmp_path, 'excel')
+    assert db.add_ingredient(dict(INGREDIENT))[0]
+    add_product_with_recipe(db, 'Bread', 'ING001', 2.0)
+    assert db.process_checkout([{'product_id': 'PROD001', 'quantity': 1, 'unit_price': 10.0}])[0]
+    # A write interrupted halfway through its line
+    torn = json.dumps({'ops': [{'tab': 'Sales', 'row': {'Sale_ID': 'SALE999'}}]})
+    with open(journal_path(str(tmp_path / 'inventory.xlsx')), 'a', encoding='utf-8') as journal:
+        journal.write(torn[:len(torn) // 2])
+
+    fresh = open_db(tmp_path, 'excel')
+    assert fresh.read_tab('Sales')['Sale_ID'].tolist() == ['SALE0001']
+    assert fresh.process_checkout([{'product_id': 'PROD001', 'quantity': 1, 'unit_price': 10.0}])[0]
+    assert len(open_db(tmp_path, 'excel').read_tab('Sales')) == 2
+    fresh.close()
+    db.close()
+
+
+def test_compaction_folds_the_journal_into_the_workbook(tmp_path):
+    db = open_db(tmp_path, 'excel')
+    assert db.add_ingredient(dict(INGREDIENT))[0]
+    add_product_with_recipe(db, 'Bread', 'ING001', 2.0)
+    for _ in range(2):
+        assert db.process_checkout([{'product_id': 'PROD001', 'quantity': 1, 'unit_price': 10.0}])[0]
+    sales_before = db.read_tab('Sales')
+
+    assert db.compact_journal() > 0
+    workbook = str(tmp_path / 'inventory.xlsx')
+    assert not os.path.exists(journal_path(workbook))
+    assert len(pd.read_excel(workbook, 'Sales')) == 2
+    assert pd.read_excel(workbook, 'Ingredients')['Current_Stock'].tolist() == [6.0]
+    # Compaction only moves rows: the cached frame stays valid
+    assert db.read_tab('Sales').equals(sales_before)
+    assert db.compact_journal() == 0
+    db.close()
+
+
+# ===== ID SEQUENCES =====
+def test_ids_reserved_by_two_instances_never_overlap(tmp_path, backend):
+    first = open_db(tmp_path, backend)
+    second = open_db(tmp_path, backend)
+    reserved = first.reserve_ids('SALE', 3) + second.reserve_ids('SALE', 2) + [first.next_id('SALE')]
+    assert reserved == ['SALE0001', 'SALE0002', 'SALE0003', 'SALE0004', 'SALE0005', 'SALE0006']
+    first.close()
+    second.close()
+
+
+def test_peeking_an_id_does_not_reserve_it(tmp_path, backend):
+    db = open_db(tmp_path, backend)
+    assert db.generate_product_id() == db.generate_product_id() == 'PROD001'
+    for name in ('Bread', 'Cake', 'Scone'):
+        assert db.add_product({'Product_Name': name, 'Selling_Price': 5.0, 'Active': 'Yes'})[0]
+    assert db.read_tab('Products')['Product_ID'].tolist() == ['PROD001', 'PROD002', 'PROD003']
+    db.close()
+
+
+def test_counter_is_seeded_from_existing_rows(tmp_path, backend):
+    db = open_db(tmp_path, backend)
+    products = pd.DataFrame([{'Product_ID': 'PROD041', 'Product_Name': 'Old',
+                              'Selling_Price': 1.0, 'Active': 'Yes'}])
+    assert db.save_tab('Products', products)
+    assert db.next_id('PROD') == 'PROD042'
+    db.close()
+
+
+# ===== ARCHIVE =====
+def test_archived_rows_come_back_through_read_range(tmp_path, backend):
+    db = open_db(tmp_path, backend)
+    for day in ('2025-11-03', '2025-12-20', '2026-02-01'):
+        assert db.add_expense({'Expense_Date': day, 'Category': 'Rent',
+                               'Description': day, 'Amount': 100.0})[0]
+
+    archived = db.archive_history('2026-01-01')
+    assert archived['Expenses'] == 2
+    assert db.archive.months('Expenses') == ['2025-11', '2025-12']
+    assert db.read_tab('Expenses')['Expense_Date'].tolist() == ['2026-02-01']
+
+    fresh = open_db(tmp_path, backend)
+    assert fresh.read_range('Expenses')['Expense_Date'].tolist() == ['2025-11-03', '2025-12-20', '2026-02-01']
+    assert fresh.read_range('Expenses', '2025-12-01', '2025-12-31')['Description'].tolist() == ['2025-12-20']
+    # Archived IDs are never handed out again
+    assert fresh.add_expense({'Expense_Date': '2026-02-02', 'Category': 'Rent',
+                              'Description': 'new', 'Amount': 1.0})[0]
+    assert fresh.read_range('Expenses')['Expense_ID'].is_unique
+    fresh.close()
+    db.close()
+
+
+# ===== WRITE-BEHIND =====
+def test_write_behind_serves_pending_saves_until_flushed(tmp_path, backend):
+    db = open_db(tmp_path, backend, write_mode='behind', flush_interval=60)
+    products = pd.DataFrame([{'Product_ID': 'PROD001', 'Product_Name': 'Bread',
+                              'Selling_Price': 5.0, 'Active': 'Yes'}])
+    assert db.save_tab('Products', products)
+    assert db.read_tab('Products')['Product_Name'].tolist() == ['Bread']
+
+    other = open_db(tmp_path, backend)
+    assert other.read_tab('Products').empty
+
+    assert db.flush()
+    assert db.get_write_stats()['pending_tabs'] == []
+    assert other.read_tab('Products')['Product_Name'].tolist() == ['Bread']
+    other.close()
+    db.close()
+
+
+def test_commit_flushes_a_pending_save_of_its_tabs_first(tmp_path, backend):
+    db = open_db(tmp_path, backend, write_mode='behind', flush_interval=60)
+    assert db.add_ingredient(dict(INGREDIENT))[0]
+    add_product_with_recipe(db, 'Bread', 'ING001', 2.0)
+    ingredients = db.read_tab('Ingredients')
+    ingredients['Supplier'] = 'Mill'
+    assert db.save_tab('Ingredients', ingredients)
+    assert 'Ingredients' in db.get_write_stats()['pending_tabs']
+
+    assert db.process_checkout([{'product_id': 'PROD001', 'quantity': 1, 'unit_price': 10.0}])[0]
+    assert 'Ingredients' not in db.get_write_stats()['pending_tabs']
+    fresh = open_db(tmp_path, backend)
+    assert fresh.read_tab('Ingredients')[['Supplier', 'Current_Stock']].values.tolist() == [['Mill', 8.0]]
+    fresh.close()
+    db.close()
+
+
+# ===== CACHE COHERENCE =====
+def test_appended_rows_read_like_a_fresh_load(tmp_path, backend):
+    db = open_db(tmp_path, backend)
+    db.read_tab('Ingredients')
+    assert db.add_ingredient(dict(INGREDIENT))[0]
+
+    cached = db.read_tab('Ingredients')
+    assert cached[['Description', 'Supplier', 'Category']].values.tolist() == [['', '', '']]
+    fresh = open_db(tmp_path, backend)
+    assert cached.astype(str).equals(fresh.read_tab('Ingredients').astype(str))
+    fresh.close()
+    db.close()
+
+
+def test_ingredient_price_reaches_recipes_saved_by_another_instance(tmp_path, backend, bakery):
+    bakery.get_products_using_ingredient('ING001')
+    other = open_db(tmp_path, backend)
+    add_product_with_recipe(other, 'Cake', 'ING001', 2.0, price=100.0)
+    other.close()
+
+    assert bakery.update_ingredient('ING001', {'Cost_Per_Unit': 20.0})[0]
+    assert bakery.get_products_using_ingredient('ING001') == ['PROD001', 'PROD002']
+    costs = bakery.read_tab('Products').set_index('Product_ID')['Cost_Price']
+    assert costs.to_dict() == {'PROD001': 40.0, 'PROD002': 40.0}
@@ -0,0 +1,105 @@
+# tests/test_file_lock.py - StoreLock: shared readers, exclusive writers, bounded waits
+import threading
+
+import pytest
+
+from modules.file_lock import StoreLock, lock_path
+
+
+@pytest.fixture
+def path(tmp_path):
+    return lock_path(str(tmp_path / 'inventory.xlsx'))
+
+
+@pytest.fixture
+def locks(path):
+    """Two locks on the same file: each opens its own handle, like two processes"""
+    first, second = StoreLock(path, timeout=0.2), StoreLock(path, timeout=0.2)
+    yield first, second
+    first.close()
+    second.close()
+
+
+# ===== SHARED / EXCLUSIVE =====
+def test_lock_file_sits_next_to_the_data_file(tmp_path):
+    assert lock_path(str(tmp_path / 'inventory.xlsx')) == str(tmp_path / 'inventory.lock')
+
+
+def test_readers_share_the_lock(locks):
+    first, second = locks
+    with first.shared(), second.shared():
+        pass
+    assert first.get_stats()['timeouts'] == second.get_stats()['timeouts'] == 0
+
+
+def test_writer_waits_for_readers_and_times_out(locks):
+    first, second = locks
+    with first.shared():
+        with pytest.raises(TimeoutError):
+            with second.exclusive():
+                pass
+    assert second.get_stats()['timeouts'] == 1
+    with second.exclusive():
+        pass
+
+
+def test_readers_wait_for_a_writer(locks):
+    first, second = locks
+    with first.exclusive():
+        with pytest.raises(TimeoutError):
+            with second.shared():
+                pass
+    with second.shared():
+        pass
+
+
+def test_waiter_gets_the_lock_once_it_is_released(path):
+    holder, waiter = StoreLock(path, timeout=5.0), StoreLock(path, timeout=5.0)
+    acquired = threading.Event()
+    released = threading.Event()
+
+    def hold():
+        with holder.exclusive():
+            acquired.set()
+            released.wait(5.0)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    acquired.wait(5.0)
+    timer = threading.Timer(0.1, released.set)
+    timer.start()
+    with waiter.exclusive():
+        assert released.is_set()
+    thread.join()
+    stats = waiter.get_stats()
+    assert stats['contended'] == 1
+    assert stats['max_wait_seconds'] > 0
+    holder.close()
+    waiter.close()
+
+
+# ===== NESTING WITHIN ONE PROCESS =====
+def test_nested_acquisitions_are_counted(locks):
+    first, second = locks
+    with first.exclusive():
+        with first.shared(), first.exclusive():
+            pass
+        # Still held after the inner blocks leave
+        with pytest.raises(TimeoutError):
+            with second.shared():
+                pass
+    with second.exclusive():
+        pass
+
+
+def test_releasing_a_write_inside_a_read_keeps_the_read(locks):
+    first, second = locks
+    with first.shared():
+        with first.exclusive():
+            pass
+        # Downgraded: other readers may enter, writers may not
+        with second.shared():
+            pass
+        with pytest.raises(TimeoutError):
+            with second.exclusive():
+                pass
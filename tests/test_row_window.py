@@ -0,0 +1,116 @@
+# tests/test_row_window.py - Windowing of VirtualTable: visible range and row recycling
+from modules.row_window import (clamp_first_row, plan_rows, scroll_target, scrollbar_range,
+                                visible_row_count, wheel_steps)
+
+
+# ===== VISIBLE RANGE =====
+def test_visible_row_count_rounds_up_partial_rows():
+    assert visible_row_count(400, 32) == 13
+    assert visible_row_count(384, 32) == 12
+
+
+def test_visible_row_count_applies_widget_scaling():
+    assert visible_row_count(400, 32, scaling=2.0) == 7
+
+
+def test_visible_row_count_is_at_least_one():
+    assert visible_row_count(0, 32) == 1
+
+
+def test_clamp_first_row_stays_within_data():
+    assert clamp_first_row(-5, 100, 10) == 0
+    assert clamp_first_row(50, 100, 10) == 50
+    # Last page ends one row short of a full viewport
+    assert clamp_first_row(500, 100, 10) == 91
+
+
+def test_clamp_first_row_with_fewer_rows_than_viewport():
+    assert clamp_first_row(3, 5, 10) == 0
+    assert clamp_first_row(3, 0, 10) == 0
+
+
+def test_clamp_first_row_truncates_fractions():
+    assert clamp_first_row(12.7, 100, 10) == 12
+
+
+# ===== ROW RECYCLING =====
+def test_plan_rows_fills_new_pool():
+    fills, hides = plan_rows([None] * 4, 0, 100, 4)
+    assert fills == [(0, 0), (1, 1), (2, 2), (3, 3)]
+    assert hides == []
+
+
+def test_plan_rows_scrolling_refills_every_slot_in_view():
+    fills, hides = plan_rows([0, 1, 2, 3], 2, 100, 4)
+    assert fills == [(0, 2), (1, 3), (2, 4), (3, 5)]
+    assert hides == []
+
+
+def test_plan_rows_unchanged_position_refills_nothing():
+    assert plan_rows([5, 6, 7], 5, 100, 3) == ([], [])
+
+
+def test_plan_rows_force_refills_rows_in_view():
+    fills, hides = plan_rows([5, 6, 7], 5, 100, 3, force=True)
+    assert fills == [(0, 5), (1, 6), (2, 7)]
+    assert hides == []
+
+
+def test_plan_rows_hides_slots_past_the_data():
+    fills, hides = plan_rows([0, 1, 2, 3], 0, 2, 4)
+    assert fills == []
+    assert hides == [2, 3]
+
+
+def test_plan_rows_hides_slots_past_a_shrunk_viewport():
+    fills, hides = plan_rows([0, 1, 2, 3, 4], 0, 100, 3)
+    assert fills == []
+    assert hides == [3, 4]
+
+
+def test_plan_rows_leaves_hidden_slots_alone():
+    assert plan_rows([0, None, None], 0, 1, 3) == ([], [])
+
+
+def test_plan_rows_covers_grown_viewport():
+    fills, hides = plan_rows([0, 1], 0, 100, 4)
+    assert fills == [(2, 2), (3, 3)]
+    assert hides == []
+
+
+def test_plan_rows_empty_data_hides_everything_shown():
+    assert plan_rows([0, 1, None], 0, 0, 3) == ([], [0, 1])
+
+
+# ===== SCROLLING =====
+def test_scrollbar_range_without_overflow():
+    assert scrollbar_range(0, 5, 10) == (0.0, 1.0)
+
+
+def test_scrollbar_range_in_the_middle_and_at_the_end():
+    assert scrollbar_range(25, 100, 10) == (0.25, 0.35)
+    assert scrollbar_range(95, 100, 10) == (0.95, 1.0)
+
+
+def test_scroll_target_moveto_is_a_fraction_of_the_rows():
+    assert scroll_target(0, 200, 'moveto', '0.5') == 100.0
+
+
+def test_scroll_target_steps_by_units_and_pages():
+    assert scroll_target(20, 200, 'scroll', '1', 'units', visible=10) == 21
+    assert scroll_target(20, 200, 'scroll', '-1', 'pages', visible=10) == 10
+
+
+def test_scroll_target_ignores_unknown_actions():
+    assert scroll_target(20, 200, 'other', '1') == 20
+
+
+def test_wheel_steps_x11_buttons():
+    assert wheel_steps(4, 0) == -1
+    assert wheel_steps(5, 0) == 1
+
+
+def test_wheel_steps_windows_and_macos_deltas():
+    assert wheel_steps('??', 240) == -2
+    assert wheel_steps('??', -120) == 1
+    assert wheel_steps('??', -3) == 3
@@ -0,0 +1,56 @@
+# tests/test_virtual_table.py - VirtualTable on a real Tk window (skipped without customtkinter or a display)
+import tkinter
+
+import pandas as pd
+import pytest
+
+ctk = pytest.importorskip("customtkinter")
+
+from modules.virtual_table import VirtualTable
+
+
+@pytest.fixture
+def window():
+    try:
+        window = ctk.CTk()
+    except tkinter.TclError as e:
+        pytest.skip(f"No display: {e}")
+    yield window
+    window.destroy()
+
+
+def make_table(window, rows, height=320, row_height=32):
+    columns = [{'header': 'ID', 'width': 80, 'value': 'ID'},
+               {'header': 'Name', 'width': 160, 'value': 'Name'}]
+    data = pd.DataFrame({'ID': [f"R{i:04d}" for i in range(rows)],
+                         'Name': [f"Row {i}" for i in range(rows)]})
+    table = VirtualTable(window, columns, data, height=height, row_height=row_height)
+    table.pack(fill="both", expand=True)
+    window.update()
+    return table
+
+
+def shown_rows(table):
+    return sorted(pooled['index'] for pooled in table._pool if pooled['shown'])
+
+
+def test_builds_rows_for_the_viewport_only(window):
+    table = make_table(window, 10_000)
+    assert len(table._pool) <= table._visible_rows + 1
+    assert shown_rows(table) == list(range(table._visible_rows))
+
+
+def test_scrolling_recycles_the_same_rows(window):
+    table = make_table(window, 10_000)
+    pool = list(table._pool)
+    table.scroll_to(5_000)
+    assert table._pool == pool
+    assert shown_rows(table)[0] == 5_000
+    assert table._pool[0]['cells'][0].cget("text") == "R5000"
+
+
+def test_short_data_hides_unused_rows(window):
+    table = make_table(window, 3)
+    assert shown_rows(table) == [0, 1, 2]
+    table.set_data(pd.DataFrame({'ID': [], 'Name': []}))
+    assert shown_rows(table) == []